@@ -1,17 +1,28 @@
+import hashlib
 import os
+import time
 
 from loguru import logger
 
 from ai_assistant_manager.chats.chat import Chat
+from ai_assistant_manager.chats.response_cache import ResponseCache, config_hash
+from ai_assistant_manager.chats.run_monitor import RunMonitor
+from ai_assistant_manager.chats.run_options import RunOptions
+from ai_assistant_manager.chats.thread_pool import PrewarmedThreadPool
+from ai_assistant_manager.chats.transcript_store import TranscriptStore
 from ai_assistant_manager.named_bytes import NamedBytesIO
 
 from ..clients.openai_api import OpenAIClient
-from ..env_variables import ENV_VARIABLES
+from ..clients.resilience import RetryPolicy, decorrelated_jitter
+from ..concurrency.singleflight import SingleFlight, shared_flights
+from ..env_variables import Config, get_config
 
 RETRIEVAL_TOOLS = [
     {"type": "file_search"},
 ]
 
+VALIDATION_POLICY = RetryPolicy(max_attempts=5, base_delay_in_seconds=1.0, max_delay_in_seconds=30.0)
+
 
 class AssistantService:
     """
@@ -28,14 +39,37 @@ class AssistantService:
         assistant_name: str | None = None,
         data_file_prefix: str | None = None,
         tools: list[dict] = RETRIEVAL_TOOLS,
+        validation_policy: RetryPolicy = VALIDATION_POLICY,
+        config: Config | None = None,
+        single_flight: SingleFlight = shared_flights,
+        thread_pool: PrewarmedThreadPool | None = None,
+        response_cache: ResponseCache | None = None,
+        run_options: RunOptions | None = None,
+        run_monitor: RunMonitor | None = None,
+        transcript_store: TranscriptStore | None = None,
     ):
         self.client = client
+        self.thread_pool = thread_pool
+        self.response_cache = response_cache
+        self.run_options = run_options
+        self.run_monitor = run_monitor
+        self.transcript_store = transcript_store
+        self.single_flight = single_flight
+        self.config = config or get_config()
         self.prompt = prompt
-        self.assistant_name = assistant_name if assistant_name else ENV_VARIABLES.assistant_name
+        self.assistant_name = assistant_name if assistant_name else self.config.assistant_name
         self.data_file_prefix = data_file_prefix if data_file_prefix else self.assistant_name
         self.tools = tools
+        self.validation_policy = validation_policy
 
     def get_assistant_id(self) -> str | None:
+        """
+        Concurrent calls for the same assistant share one lookup, so only one of
+        them can create it.
+        """
+        return self.single_flight.do((self.client, "assistant", self.assistant_name), self._find_or_create_assistant)
+
+    def _find_or_create_assistant(self) -> str | None:
         assistant_id = self._find_existing_assistant(self.assistant_name)
         if assistant_id:
             return assistant_id
@@ -57,15 +91,42 @@ class AssistantService:
         ).id
 
     def start_chat(self, assistant_id: str, thread_id: str | None) -> Chat:
+        if not thread_id and self.thread_pool:
+            thread_id = self.thread_pool.acquire()
+
         chat = Chat(
             self.client,
             assistant_id,
             thread_id=thread_id,
+            response_cache=self.response_cache,
+            config_hash=self.config_hash(),
+            run_options=self.run_options,
+            run_monitor=self.run_monitor,
+            transcript_store=self.transcript_store,
         )
         chat.start()
 
         return chat
 
+    def config_hash(self) -> str:
+        return config_hash(
+            assistant_name=self.assistant_name,
+            prompt=self.prompt,
+            tools=self.tools,
+            model=self.config.openai_model,
+        )
+
+    def _invalidate_responses(self, assistant_id: str | None = None):
+        """
+        Cached answers were grounded in the old vector store, so they are dropped
+        whenever it is recreated, repaired or deleted.
+        """
+        if self.response_cache is None:
+            return
+        assistant_id = assistant_id or self._find_existing_assistant(self.assistant_name)
+        if assistant_id:
+            self.response_cache.invalidate(assistant_id)
+
     def add_file_contents_to_files(self, file_contents: NamedBytesIO):
         return self.client.files_create(file_contents, "assistants").id
 
@@ -103,36 +164,73 @@ class AssistantService:
     def create_vector_stores(self, *, vector_store_name: str = None, file_ids: list[str] = None):
         logger.info("Creating new vector stores")
 
-        retrieval_file_ids = file_ids or self.get_retrieval_file_ids()
         vector_store_name = vector_store_name or f"{self.data_file_prefix} vector store"
 
-        return [self._validate_vector_stores(self.client.vector_stores_create(vector_store_name, retrieval_file_ids))]
+        files_digest = hashlib.sha256("\n".join(sorted(file_ids or [])).encode()).hexdigest()[:16]
+        return self.single_flight.do(
+            (self.client, "vector_store", vector_store_name, files_digest),
+            self._create_vector_store,
+            vector_store_name,
+            file_ids,
+        )
 
-    def _validate_vector_stores(self, vector_store_id: str):
-        try:
-            vector_store_files = self.client.vector_stores_files(vector_store_id)
-            failed_files = [file.id for file in vector_store_files if file.status == "failed"]
+    def _create_vector_store(self, vector_store_name: str, file_ids: list[str] | None):
+        retrieval_file_ids = file_ids or self.get_retrieval_file_ids()
+        vector_store_ids = [
+            self._validate_vector_stores(self.client.vector_stores_create(vector_store_name, retrieval_file_ids))
+        ]
+        self._invalidate_responses()
+        return vector_store_ids
 
-            if not failed_files:
-                return vector_store_id
+    def _validate_vector_stores(self, vector_store_id: str):
+        from openai import APIError
+
+        delay = None
+        recreated = False
+
+        for attempt in range(1, self.validation_policy.max_attempts + 1):
+            recreated = False
+            try:
+                failed_files = self._failed_files(vector_store_id)
+
+                if not failed_files:
+                    return vector_store_id
+
+                logger.warning(
+                    f"Vector store {vector_store_id} has {len(failed_files)} failed files "
+                    f"(attempt {attempt}/{self.validation_policy.max_attempts})"
+                )
+                self._recreate_failed_files(vector_store_id, failed_files)
+                recreated = True
+            except (APIError, OSError) as e:
+                logger.error(f"Error validating vector store {vector_store_id}: {e}")
+                delay = decorrelated_jitter(delay, self.validation_policy)
+                time.sleep(delay)
+
+        if recreated and not self._failed_files(vector_store_id):
+            return vector_store_id
+
+        raise RuntimeError(
+            f"Vector store {vector_store_id} not valid after {self.validation_policy.max_attempts} attempts"
+        )
 
-            failed_retrieval_files = [self.client.files_get(file) for file in failed_files if file]
-            failed_retrieval_file_names = [self._get_file_name(file.filename) for file in failed_retrieval_files]
-            failed_file_paths = [
-                file_path
-                for file_path in self._get_file_paths()
-                if self._get_file_name(file_path) in failed_retrieval_file_names
-            ]
+    def _failed_files(self, vector_store_id: str) -> list[str]:
+        return [file.id for file in self.client.vector_stores_files(vector_store_id) if file.status == "failed"]
 
-            [self.client.vector_stores_file_delete(vector_store_id, file_id) for file_id in failed_files]
+    def _recreate_failed_files(self, vector_store_id: str, failed_files: list[str]):
+        failed_retrieval_files = [self.client.files_get(file) for file in failed_files if file]
+        failed_retrieval_file_names = [self._get_file_name(file.filename) for file in failed_retrieval_files]
+        failed_file_paths = [
+            file_path
+            for file_path in self._get_file_paths()
+            if self._get_file_name(file_path) in failed_retrieval_file_names
+        ]
 
-            recreated_files = self._create_files(failed_file_paths)
-            self.client.vector_stores_update(vector_store_id, recreated_files)
+        [self.client.vector_stores_file_delete(vector_store_id, file_id) for file_id in failed_files]
 
-            return self._validate_vector_stores(vector_store_id)
-        except Exception as e:
-            logger.error(f"Error validating vector store {vector_store_id}: {e}")
-            return self._validate_vector_stores(vector_store_id)
+        recreated_files = self._create_files(failed_file_paths)
+        self.client.vector_stores_update(vector_store_id, recreated_files)
+        self._invalidate_responses()
 
     def _get_file_name(self, file_path: str) -> str:
         return os.path.basename(file_path)
@@ -152,7 +250,7 @@ class AssistantService:
     def _get_file_paths(self):
         return [
             os.path.join(root, file)
-            for (root, _, files) in os.walk("bin")
+            for (root, _, files) in os.walk(self.config.bin_dir)
             for file in files
             if not file.endswith(".DS_Store")
         ]
@@ -169,6 +267,7 @@ class AssistantService:
 
         if assistant_id := self._find_existing_assistant(self.assistant_name):
             self.client.assistants_delete(assistant_id)
+            self._invalidate_responses(assistant_id)
         if vector_store_ids := self._find_existing_vector_stores():
             for vector_store_id in vector_store_ids:
                 self.client.vector_stores_delete(vector_store_id)
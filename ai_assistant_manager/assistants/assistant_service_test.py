@@ -1,9 +1,15 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase, mock
 from unittest.mock import MagicMock, mock_open, patch
 
+import pytest
+from openai import APIConnectionError
+
 from ai_assistant_manager.named_bytes import NamedBytesIO
 
-from ..env_variables import ENV_VARIABLES
+from ..clients.resilience import RetryPolicy
+from ..env_variables import ENV_VARIABLES, get_config
 from .assistant_service import AssistantService
 
 
@@ -132,7 +138,7 @@ class TestAssistantService(TestCase):
         self.mock_client.vector_stores_create.return_value = expected_vector_store_id
         self.mock_client.vector_stores_files.side_effect = [
             [MagicMock(status="failed", id="abc")],
-            lambda: Exception("Failed to create vector store"),
+            APIConnectionError(request=MagicMock()),
             [MagicMock(status="completed", id="def")],
         ]
         self.mock_client.files_get.return_value = MagicMock(filename="file_name")
@@ -140,14 +146,36 @@ class TestAssistantService(TestCase):
 
         mock_os_walk = [("root", None, ["file_name"])]
 
-        with patch("os.walk", return_value=mock_os_walk), patch("builtins.open", mock_open(read_data="data")):
+        with (
+            patch("os.walk", return_value=mock_os_walk),
+            patch("builtins.open", mock_open(read_data="data")),
+            patch("ai_assistant_manager.assistants.assistant_service.time.sleep") as mock_sleep,
+        ):
             vector_store_ids = self.service.create_vector_stores()
 
         assert vector_store_ids == [expected_vector_store_id]
+        mock_sleep.assert_called_once()
         self.mock_client.vector_stores_file_delete.assert_called_with(expected_vector_store_id, "abc")
         self.mock_client.vector_stores_create.assert_called_with(mock.ANY, expected_file_ids)
         self.mock_client.vector_stores_files.assert_called_with(expected_vector_store_id)
 
+    def test_concurrent_vector_store_creates_with_different_files_are_not_coalesced(self):
+        both_creating = threading.Barrier(2, timeout=5)
+
+        def create(_name, file_ids):
+            both_creating.wait()
+            return f"vector_store_{file_ids[0]}"
+
+        self.mock_client.vector_stores_create.side_effect = create
+        self.mock_client.vector_stores_files.return_value = []
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(
+                executor.map(lambda file_ids: self.service.create_vector_stores(file_ids=file_ids), [["a"], ["b"]])
+            )
+
+        assert results == [["vector_store_a"], ["vector_store_b"]]
+
     def test_validate_vector_stores(self):
         expected_vector_store_id = "vector_store_id"
         self.mock_client.vector_stores_files.return_value = [MagicMock(status="completed")]
@@ -156,6 +184,38 @@ class TestAssistantService(TestCase):
 
         assert vector_store_id == expected_vector_store_id
 
+    @patch("ai_assistant_manager.assistants.assistant_service.time.sleep")
+    def test_validate_vector_stores_gives_up(self, mock_sleep):
+        self.service.validation_policy = RetryPolicy(max_attempts=3)
+        self.mock_client.vector_stores_files.side_effect = APIConnectionError(request=MagicMock())
+
+        with pytest.raises(RuntimeError, match="Vector store vector_store_id not valid after 3 attempts"):
+            self.service._validate_vector_stores("vector_store_id")  # pylint: disable=protected-access
+
+        assert self.mock_client.vector_stores_files.call_count == 3
+        assert mock_sleep.call_count == 3
+
+    @patch("ai_assistant_manager.assistants.assistant_service.time.sleep")
+    def test_validate_vector_stores_checks_last_recreation(self, _mock_sleep):
+        self.service.validation_policy = RetryPolicy(max_attempts=2)
+        self.service._recreate_failed_files = MagicMock()  # pylint: disable=protected-access
+        self.mock_client.vector_stores_files.side_effect = [
+            [MagicMock(status="failed", id="abc")],
+            [MagicMock(status="failed", id="def")],
+            [MagicMock(status="completed", id="ghi")],
+        ]
+
+        vector_store_id = self.service._validate_vector_stores("vector_store_id")  # pylint: disable=protected-access
+
+        assert vector_store_id == "vector_store_id"
+        assert self.service._recreate_failed_files.call_count == 2  # pylint: disable=protected-access
+
+    def test_validate_vector_stores_does_not_swallow_programming_errors(self):
+        self.mock_client.vector_stores_files.side_effect = TypeError("unexpected")
+
+        with pytest.raises(TypeError):
+            self.service._validate_vector_stores("vector_store_id")  # pylint: disable=protected-access
+
     def test_get_retrieval_file_ids_exists(self):
         self.mock_client.files_list = MagicMock(
             return_value=[MagicMock(filename=f"{ENV_VARIABLES.assistant_name} blogs.json", id="456")]
@@ -179,6 +239,17 @@ class TestAssistantService(TestCase):
         assert actual_file_ids == expected_file_ids
         self.mock_client.files_create.assert_called_with(mock.ANY, "assistants")
 
+    def test_config_sets_defaults_and_retrieval_directory(self):
+        config = get_config().replace(assistant_name="Tenant", bin_dir="tenant_bin")
+        service = AssistantService(self.mock_client, prompt="prompt", config=config)
+
+        with patch("os.walk", return_value=[]) as mock_walk:
+            service.create_retrieval_files()
+
+        assert service.assistant_name == "Tenant"
+        assert service.data_file_prefix == "Tenant"
+        mock_walk.assert_called_once_with("tenant_bin")
+
     # pylint: disable=protected-access
     def test_delete_assistant_with_existing_assistant_and_files(self):
         self.service._find_existing_assistant = MagicMock(return_value="assistant_id")
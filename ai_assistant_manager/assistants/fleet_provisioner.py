@@ -0,0 +1,293 @@
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from ai_assistant_manager.named_bytes import NamedBytesIO
+
+from ..clients.openai_api import OpenAIClient
+from .assistant_service import RETRIEVAL_TOOLS
+
+FLEET_PREFIX = "Fleet"
+DIGEST_LENGTH = 16
+REPAIR_ATTEMPTS = 3
+
+
+@dataclass
+class AssistantSpec:
+    name: str
+    prompt: str
+    file_paths: list[str]
+    tools: list[dict] = field(default_factory=lambda: list(RETRIEVAL_TOOLS))
+
+
+@dataclass
+class FleetResult:
+    assistant_ids: dict[str, str]
+    uploaded_files: int = 0
+    reused_files: int = 0
+    created_vector_stores: int = 0
+    reused_vector_stores: int = 0
+    repaired_files: int = 0
+    updated_assistants: int = 0
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:DIGEST_LENGTH]
+
+
+def file_digest(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:DIGEST_LENGTH]
+
+
+class FleetProvisioner:
+    """
+    Provisions many assistants that share documents. Each distinct document is
+    uploaded once (keyed by content hash), assistants with the same document set
+    share one vector store, and uploads, stores and assistants are created
+    concurrently. Existing uploads, stores and assistants are reused, so a rerun
+    only creates what is missing; an existing assistant whose prompt, tools or
+    documents no longer match its spec is updated in place.
+    """
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        *,
+        concurrency: int = 8,
+        prefix: str = FLEET_PREFIX,
+        repair_attempts: int = REPAIR_ATTEMPTS,
+    ):
+        self.client = client
+        self.concurrency = concurrency
+        self.prefix = prefix
+        self.repair_attempts = repair_attempts
+
+    def provision(self, specs: Iterable[AssistantSpec]) -> FleetResult:
+        specs = list(specs)
+        result = FleetResult(assistant_ids={})
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fleet") as executor:
+            paths = sorted({file_path for spec in specs for file_path in spec.file_paths})
+            digests = dict(zip(paths, executor.map(file_digest, paths)))
+            paths_by_digest = {digest: file_path for file_path, digest in digests.items()}
+
+            documents = {spec.name: tuple(sorted({digests[path] for path in spec.file_paths})) for spec in specs}
+            needed_digests = sorted({digest for spec_documents in documents.values() for digest in spec_documents})
+            file_ids = self._upload_files(executor, needed_digests, paths_by_digest, result)
+
+            store_documents = {self._store_key(spec_documents): spec_documents for spec_documents in documents.values()}
+            vector_store_ids = self._create_vector_stores(executor, store_documents, file_ids, paths_by_digest, result)
+            store_ids = {spec.name: vector_store_ids[self._store_key(documents[spec.name])] for spec in specs}
+
+            existing_assistants = {assistant.name: assistant for assistant in self.client.assistants_list()}
+            pending = [spec for spec in specs if spec.name not in existing_assistants]
+            changed = [
+                spec
+                for spec in specs
+                if spec.name in existing_assistants
+                and self._differs(existing_assistants[spec.name], spec, store_ids[spec.name])
+            ]
+            result.assistant_ids.update(
+                {spec.name: existing_assistants[spec.name].id for spec in specs if spec.name in existing_assistants}
+            )
+
+            created = executor.map(self._create_assistant, pending, [store_ids[spec.name] for spec in pending])
+            result.assistant_ids.update(zip([spec.name for spec in pending], created))
+            list(
+                executor.map(
+                    self._update_assistant,
+                    [result.assistant_ids[spec.name] for spec in changed],
+                    changed,
+                    [store_ids[spec.name] for spec in changed],
+                )
+            )
+            result.updated_assistants = len(changed)
+
+        logger.info(
+            f"Provisioned {len(result.assistant_ids)} assistants: {result.uploaded_files} files uploaded, "
+            f"{result.reused_files} reused, {result.created_vector_stores} vector stores created, "
+            f"{result.updated_assistants} assistants updated"
+        )
+        return result
+
+    def delete_fleet(self, specs: Iterable[AssistantSpec]):
+        """
+        Deletes the named assistants, the fleet vector stores attached to them and
+        the files in those stores. Stores and files still used by any other
+        assistant, such as another fleet under the same prefix, are kept.
+        """
+        names = {spec.name for spec in specs}
+        assistants = list(self.client.assistants_list())
+        fleet_store_ids = {
+            vector_store.id
+            for vector_store in self.client.vector_stores_list()
+            if vector_store.name and vector_store.name.startswith(f"{self.prefix} ")
+        }
+
+        deleted_store_ids, kept_store_ids = set(), set()
+        for assistant in assistants:
+            store_ids = set(attached_vector_store_ids(assistant)) & fleet_store_ids
+            (deleted_store_ids if assistant.name in names else kept_store_ids).update(store_ids)
+        deleted_store_ids -= kept_store_ids
+
+        kept_file_ids = {file.id for store_id in kept_store_ids for file in self.client.vector_stores_files(store_id)}
+        deleted_file_ids = {
+            file.id for store_id in deleted_store_ids for file in self.client.vector_stores_files(store_id)
+        } - kept_file_ids
+
+        for assistant in assistants:
+            if assistant.name in names:
+                self.client.assistants_delete(assistant.id)
+        for store_id in deleted_store_ids:
+            self.client.vector_stores_delete(store_id)
+        for file_id in deleted_file_ids:
+            self.client.files_delete(file_id)
+
+    def _create_assistant(self, spec: AssistantSpec, vector_store_id: str) -> str:
+        logger.info(f"Creating new assistant {spec.name}")
+        return self.client.assistants_create(spec.name, spec.prompt, [vector_store_id], tools=spec.tools).id
+
+    def _update_assistant(self, assistant_id: str, spec: AssistantSpec, vector_store_id: str):
+        logger.info(f"Updating assistant {spec.name} to match its spec")
+        self.client.assistants_update(assistant_id, spec.prompt, [vector_store_id], tools=spec.tools)
+
+    def _differs(self, assistant, spec: AssistantSpec, vector_store_id: str) -> bool:
+        return (
+            assistant.instructions != spec.prompt
+            or attached_vector_store_ids(assistant) != [vector_store_id]
+            or tool_keys(assistant.tools) != tool_keys(spec.tools)
+        )
+
+    def _upload_files(
+        self, executor: ThreadPoolExecutor, digests: list[str], paths_by_digest: dict[str, str], result: FleetResult
+    ) -> dict[str, str]:
+        file_ids = self._existing_files()
+        missing = [digest for digest in digests if digest not in file_ids]
+
+        result.reused_files = len(digests) - len(missing)
+        result.uploaded_files = len(missing)
+        uploaded = executor.map(lambda digest: self._upload(paths_by_digest[digest], digest), missing)
+        file_ids.update(zip(missing, uploaded))
+
+        return file_ids
+
+    def _existing_files(self) -> dict[str, str]:
+        file_ids = {}
+        for file in self.client.files_list():
+            prefix, _, rest = file.filename.partition(" ")
+            digest = rest.split(" - ", 1)[0]
+            if prefix == self.prefix and len(digest) == DIGEST_LENGTH:
+                file_ids[digest] = file.id
+        return file_ids
+
+    def _upload(self, file_path: str, digest: str) -> str:
+        with open(file_path, "rb") as file:
+            named_file = NamedBytesIO(file.read(), f"{self.prefix} {digest} - {os.path.basename(file_path)}")
+        return self.client.files_create(named_file, "assistants").id
+
+    def _store_key(self, documents: tuple[str, ...]) -> str:
+        return content_digest("\n".join(documents).encode())
+
+    def _store_name(self, store_key: str) -> str:
+        return f"{self.prefix} {store_key} vector store"
+
+    def _create_vector_stores(
+        self,
+        executor: ThreadPoolExecutor,
+        store_documents: dict[str, tuple[str, ...]],
+        file_ids: dict[str, str],
+        paths_by_digest: dict[str, str],
+        result: FleetResult,
+    ) -> dict[str, str]:
+        existing = {vector_store.name: vector_store.id for vector_store in self.client.vector_stores_list()}
+        vector_store_ids = {
+            key: existing[self._store_name(key)] for key in store_documents if self._store_name(key) in existing
+        }
+        missing = [key for key in store_documents if key not in vector_store_ids]
+
+        def create(key: str) -> tuple[str, int]:
+            vector_store_id = self.client.vector_stores_create(
+                self._store_name(key), [file_ids[digest] for digest in store_documents[key]]
+            )
+            return vector_store_id, self._repair_failed_files(vector_store_id, file_ids, paths_by_digest)
+
+        for key, (vector_store_id, repaired_files) in zip(missing, executor.map(create, missing)):
+            vector_store_ids[key] = vector_store_id
+            result.repaired_files += repaired_files
+        result.created_vector_stores = len(missing)
+        result.reused_vector_stores = len(vector_store_ids) - len(missing)
+
+        return vector_store_ids
+
+    def _repair_failed_files(
+        self, vector_store_id: str, file_ids: dict[str, str], paths_by_digest: dict[str, str]
+    ) -> int:
+        """
+        Attaches a fresh upload for each document that failed to index, checking
+        the store again after every round. Shared uploads are never deleted here
+        because other vector stores may still use them.
+        """
+        digests_by_file_id = {file_id: digest for digest, file_id in file_ids.items()}
+        repaired = 0
+
+        for attempt in range(self.repair_attempts + 1):
+            failed = self._failed_documents(vector_store_id, digests_by_file_id)
+            if not failed:
+                return repaired
+            if attempt == self.repair_attempts:
+                break
+
+            logger.warning(
+                f"Vector store {vector_store_id} has {len(failed)} failed files, uploading them again "
+                f"(attempt {attempt + 1}/{self.repair_attempts})"
+            )
+            replacements = {self._upload(paths_by_digest[digest], digest): digest for digest in failed}
+            self.client.vector_stores_update(vector_store_id, list(replacements))
+            digests_by_file_id.update(replacements)
+            repaired += len(replacements)
+
+        raise RuntimeError(
+            f"Vector store {vector_store_id} still has {len(failed)} failed files after "
+            f"{self.repair_attempts} repair attempts"
+        )
+
+    def _failed_documents(self, vector_store_id: str, digests_by_file_id: dict[str, str]) -> list[str]:
+        """
+        Documents with no successfully indexed copy in the store; a replaced
+        upload stays listed as failed next to its replacement.
+        """
+        statuses: dict[str, set[str]] = {}
+        for file in self.client.vector_stores_files(vector_store_id):
+            if file.id in digests_by_file_id:
+                statuses.setdefault(digests_by_file_id[file.id], set()).add(file.status)
+        return sorted(digest for digest, digest_statuses in statuses.items() if digest_statuses == {"failed"})
+
+
+def attached_vector_store_ids(assistant) -> list[str]:
+    tool_resources = getattr(assistant, "tool_resources", None)
+    file_search = getattr(tool_resources, "file_search", None)
+    return list(getattr(file_search, "vector_store_ids", None) or [])
+
+
+def tool_keys(tools) -> list[str]:
+    """
+    Compares tools by type and, for functions, by definition; the API adds
+    defaults to file_search that a spec does not spell out.
+    """
+    keys = []
+    for tool in tools or []:
+        definition = tool if isinstance(tool, dict) else tool.model_dump(exclude_none=True)
+        key = {"type": definition["type"]}
+        if definition.get("function"):
+            key["function"] = definition["function"]
+        keys.append(json.dumps(key, sort_keys=True))
+    return sorted(keys)
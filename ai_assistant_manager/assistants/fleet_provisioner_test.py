@@ -0,0 +1,121 @@
+import pytest
+
+from ..clients.openai_api import OpenAIClient
+from ..fake_api.fake_api_config import FakeApiConfig
+from ..fake_api.fake_api_server import FakeOpenAIServer
+from .fleet_provisioner import AssistantSpec, FleetProvisioner, file_digest
+
+
+@pytest.fixture(name="documents")
+def build_documents(tmp_path):
+    documents = {}
+    for name, content in [("shared", "Shared policy"), ("copy", "Shared policy"), ("a", "Tenant A"), ("b", "Tenant B")]:
+        path = tmp_path / f"{name}.txt"
+        path.write_text(content)
+        documents[name] = str(path)
+    return documents
+
+
+def build_specs(documents: dict[str, str]) -> list[AssistantSpec]:
+    return [
+        AssistantSpec("Tenant A", "Prompt A", [documents["shared"], documents["a"]]),
+        AssistantSpec("Tenant B", "Prompt B", [documents["copy"], documents["b"]]),
+        AssistantSpec("Tenant B2", "Prompt B2", [documents["b"], documents["shared"]]),
+    ]
+
+
+def test_file_digest(documents):
+    assert file_digest(documents["shared"]) == file_digest(documents["copy"])
+    assert file_digest(documents["shared"]) != file_digest(documents["a"])
+
+
+def test_provision_uploads_each_document_once(documents):
+    specs = build_specs(documents)
+
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        provisioner = FleetProvisioner(OpenAIClient(server.build_openai_client()), concurrency=4)
+
+        result = provisioner.provision(specs)
+
+        assert set(result.assistant_ids) == {"Tenant A", "Tenant B", "Tenant B2"}
+        assert (result.uploaded_files, result.reused_files) == (3, 0)
+        assert (result.created_vector_stores, result.reused_vector_stores) == (2, 0)
+        assert server.request_counts["POST /files"] == 3
+        assert len(server.state.assistants) == 3
+
+        tenant_b, tenant_b2 = (
+            server.state.assistants[result.assistant_ids[name]] for name in ["Tenant B", "Tenant B2"]
+        )
+        assert tenant_b["tool_resources"] == tenant_b2["tool_resources"]
+
+        server.reset_request_counts()
+        rerun = provisioner.provision([*specs, AssistantSpec("Tenant C", "Prompt C", [documents["a"]])])
+
+        assert rerun.assistant_ids["Tenant A"] == result.assistant_ids["Tenant A"]
+        assert (rerun.uploaded_files, rerun.reused_files) == (0, 3)
+        assert (rerun.created_vector_stores, rerun.reused_vector_stores) == (1, 2)
+        assert rerun.updated_assistants == 0
+        assert server.request_counts["POST /files"] == 0
+
+        provisioner.delete_fleet([*specs, AssistantSpec("Tenant C", "Prompt C", [])])
+
+        assert server.state.assistants == {}
+        assert server.state.vector_stores == {}
+        assert server.state.files == {}
+
+
+def test_provision_repairs_failed_files(documents):
+    with FakeOpenAIServer(FakeApiConfig(seed=3, failed_file_probability=0.5)) as server:
+        provisioner = FleetProvisioner(OpenAIClient(server.build_openai_client()), concurrency=1)
+
+        result = provisioner.provision(build_specs(documents))
+
+        assert len(result.assistant_ids) == 3
+        assert result.repaired_files > 0
+        assert server.request_counts["POST /files"] == 3 + result.repaired_files
+
+
+def test_provision_updates_changed_assistants(documents):
+    specs = build_specs(documents)
+
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        provisioner = FleetProvisioner(OpenAIClient(server.build_openai_client()), concurrency=4)
+        result = provisioner.provision(specs)
+
+        specs[0].prompt = "Prompt A, revised"
+        specs[1].file_paths = [documents["b"]]
+        rerun = provisioner.provision(specs)
+
+        assert rerun.assistant_ids == result.assistant_ids
+        assert rerun.updated_assistants == 2
+        assert rerun.created_vector_stores == 1
+        tenant_a, tenant_b, tenant_b2 = (server.state.assistants[result.assistant_ids[spec.name]] for spec in specs)
+        assert tenant_a["instructions"] == "Prompt A, revised"
+        assert tenant_b["tool_resources"] != tenant_b2["tool_resources"]
+        assert provisioner.provision(specs).updated_assistants == 0
+
+
+def test_delete_fleet_keeps_other_fleets(documents):
+    fleet_a, fleet_b = build_specs(documents)[:1], build_specs(documents)[1:]
+
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        provisioner = FleetProvisioner(OpenAIClient(server.build_openai_client()), concurrency=4)
+        provisioner.provision(fleet_a)
+        provisioner.provision(fleet_b)
+
+        provisioner.delete_fleet(fleet_a)
+
+        assert {assistant["name"] for assistant in server.state.assistants.values()} == {"Tenant B", "Tenant B2"}
+        assert len(server.state.vector_stores) == 1
+        assert [file["filename"] for file in server.state.files.values()] == [
+            f"Fleet {file_digest(documents['shared'])} - shared.txt",
+            f"Fleet {file_digest(documents['b'])} - b.txt",
+        ]
+
+
+def test_provision_gives_up_on_files_that_keep_failing(documents):
+    with FakeOpenAIServer(FakeApiConfig(seed=1, failed_file_probability=1.0)) as server:
+        provisioner = FleetProvisioner(OpenAIClient(server.build_openai_client()), concurrency=1, repair_attempts=2)
+
+        with pytest.raises(RuntimeError, match="still has 2 failed files after 2 repair attempts"):
+            provisioner.provision(build_specs(documents)[:1])
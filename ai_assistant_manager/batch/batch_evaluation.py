@@ -0,0 +1,209 @@
+import json
+import os
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from ..clients.openai_api import OpenAIClient
+from ..encoding import UTF_8
+from ..named_bytes import NamedBytesIO
+from ..search.context_passage import ContextPassage, ContextProvider
+from .batch_runner import BatchQuestion, BatchResult, BatchSummary, summarize_batch
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_BATCH_STATUSES = ["completed", "failed", "expired", "cancelled"]
+PARTIAL_BATCH_STATUSES = ["expired", "cancelled"]
+
+
+@dataclass
+class SubmittedBatch:
+    """
+    A submitted batch with the question and sources behind each request, keyed
+    by custom_id, so results can be matched back to what was asked.
+    """
+
+    id: str
+    input_file_id: str
+    messages: dict[str, str] = field(default_factory=dict)
+    sources: dict[str, list[str]] = field(default_factory=dict)
+
+
+def build_user_message(question: str, passages: list[ContextPassage]) -> str:
+    if not passages:
+        return question
+    context = "\n\n".join(f"[{index}] {passage.source}\n{passage.text}" for index, passage in enumerate(passages, 1))
+    return f"Answer using the context below.\n\n{context}\n\nQuestion: {question}"
+
+
+class BatchEvaluator:
+    """
+    Offline alternative to BatchRunner for large evaluation sets: every question
+    becomes one chat-completions request (the assistant's prompt, plus any
+    passages from `context_provider` in place of file_search) in a JSONL file
+    submitted to the Batch API, and the results are streamed back as
+    BatchResult records once the batch finishes. The input, output and error
+    files are deleted once they have been read.
+    """
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        *,
+        prompt: str,
+        model: str | None = None,
+        context_provider: ContextProvider | None = None,
+        max_completion_tokens: int | None = None,
+        poll_interval_in_seconds: float = 10.0,
+    ):
+        self.client = client
+        self.prompt = prompt
+        self.model = model or client.open_ai_model
+        self.context_provider = context_provider
+        self.max_completion_tokens = max_completion_tokens
+        self.poll_interval_in_seconds = poll_interval_in_seconds
+
+    def build_requests(self, questions: Iterable[BatchQuestion]) -> Iterator[dict]:
+        for question in questions:
+            yield self._request(question, self._passages(question))
+
+    def submit(self, questions: Iterable[BatchQuestion], *, name: str = "evaluation") -> SubmittedBatch:
+        messages, sources, lines = {}, {}, []
+        for question in questions:
+            if question.id in messages:
+                raise ValueError(f"Duplicate question id: {question.id}")
+            passages = self._passages(question)
+            messages[question.id] = question.message
+            sources[question.id] = list(dict.fromkeys(passage.source for passage in passages))
+            lines.append(json.dumps(self._request(question, passages)) + "\n")
+
+        input_file = self.client.files_create(NamedBytesIO("".join(lines).encode(), f"{name}.jsonl"), "batch")
+        try:
+            batch = self.client.batches_create(input_file.id, endpoint=BATCH_ENDPOINT, metadata={"name": name})
+        except Exception:
+            self._delete_file(input_file.id)
+            raise
+
+        logger.info(f"Submitted batch {batch.id} with {len(messages)} questions")
+        return SubmittedBatch(batch.id, input_file.id, messages, sources)
+
+    def wait(self, batch_id: str, *, timeout_in_seconds: float = 24 * 60 * 60):
+        """
+        Polls until the batch reaches a terminal status; on timeout the batch is
+        cancelled before TimeoutError is raised, so it stops accruing cost.
+        """
+        deadline = time.monotonic() + timeout_in_seconds
+
+        while (batch := self.client.batches_retrieve(batch_id)).status not in TERMINAL_BATCH_STATUSES:
+            if time.monotonic() >= deadline:
+                self._cancel(batch_id)
+                raise TimeoutError(f"Batch {batch_id} still {batch.status} after {timeout_in_seconds} seconds")
+            logger.info(f"Batch {batch_id} {batch.status}: {batch.request_counts}")
+            time.sleep(self.poll_interval_in_seconds)
+
+        logger.info(f"Batch {batch_id} {batch.status}: {batch.request_counts}")
+        return batch
+
+    def results(self, submitted: SubmittedBatch, batch) -> Iterator[BatchResult]:
+        """
+        Yields one result per request, successes first. The output and error
+        files are downloaded to a temporary directory and read line by line,
+        then deleted. A failed batch raises RuntimeError; an expired or
+        cancelled one yields the requests it finished.
+        """
+        if batch.status == "failed":
+            errors = (batch.errors.data if batch.errors else None) or []
+            details = "; ".join(error.message or error.code for error in errors) or "no error details"
+            raise RuntimeError(f"Batch {batch.id} failed: {details}")
+        if batch.status in PARTIAL_BATCH_STATUSES:
+            logger.warning(f"Batch {batch.id} {batch.status}; reading partial results: {batch.request_counts}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            for file_id in [batch.output_file_id, batch.error_file_id]:
+                if not file_id:
+                    continue
+                file_path = os.path.join(directory, f"{file_id}.jsonl")
+                try:
+                    self.client.files_download(file_id, file_path)
+                    with open(file_path, encoding=UTF_8) as file:
+                        for line in file:
+                            if line.strip():
+                                yield self._to_result(submitted, json.loads(line))
+                finally:
+                    self._delete_file(file_id)
+
+    def run(
+        self,
+        questions: Iterable[BatchQuestion],
+        *,
+        on_result: Callable[[BatchResult], None] | None = None,
+        timeout_in_seconds: float = 24 * 60 * 60,
+    ) -> BatchSummary:
+        started_at = time.monotonic()
+        submitted = self.submit(questions)
+
+        results = []
+        try:
+            batch = self.wait(submitted.id, timeout_in_seconds=timeout_in_seconds)
+            for result in self.results(submitted, batch):
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        finally:
+            self._delete_file(submitted.input_file_id)
+
+        return summarize_batch(results, time.monotonic() - started_at)
+
+    def _passages(self, question: BatchQuestion) -> list[ContextPassage]:
+        return self.context_provider(question.message) if self.context_provider else []
+
+    def _request(self, question: BatchQuestion, passages: list[ContextPassage]) -> dict:
+        body = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.prompt},
+                {"role": "user", "content": build_user_message(question.message, passages)},
+            ],
+        }
+        if self.max_completion_tokens:
+            body["max_completion_tokens"] = self.max_completion_tokens
+        return {"custom_id": question.id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
+    def _cancel(self, batch_id: str):
+        from openai import APIError
+
+        try:
+            self.client.batches_cancel(batch_id)
+        except APIError as e:
+            logger.warning(f"Could not cancel batch {batch_id}: {e}")
+
+    def _delete_file(self, file_id: str):
+        from openai import APIError
+
+        try:
+            self.client.files_delete(file_id)
+        except APIError as e:
+            logger.warning(f"Could not delete file {file_id}: {e}")
+
+    @staticmethod
+    def _to_result(submitted: SubmittedBatch, line: dict) -> BatchResult:
+        question_id = line["custom_id"]
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        result = BatchResult(
+            id=question_id,
+            message=submitted.messages.get(question_id, ""),
+            response=None,
+            annotation_files=submitted.sources.get(question_id, []),
+        )
+
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or body.get("error") or {}
+            result.error = error.get("message") or f"Request failed with status {response.get('status_code')}"
+            return result
+
+        result.response = body["choices"][0]["message"]["content"]
+        result.token_count = (body.get("usage") or {}).get("total_tokens", 0)
+        return result
@@ -0,0 +1,168 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..clients.openai_api import OpenAIClient
+from ..fake_api.fake_api_config import FakeApiConfig, constant
+from ..fake_api.fake_api_server import FakeOpenAIServer
+from ..search.context_passage import ContextPassage
+from .batch_evaluation import BatchEvaluator, build_user_message
+from .batch_runner import BatchQuestion
+
+QUESTIONS = [BatchQuestion(id=str(index), message=f"Question {index}") for index in range(5)]
+
+
+def retrieve(question: str) -> list[ContextPassage]:
+    return [ContextPassage("Guide.md", f"About {question}"), ContextPassage("Guide.md", "More")]
+
+
+def test_build_user_message():
+    assert build_user_message("Why?", []) == "Why?"
+
+    message = build_user_message("Why?", [ContextPassage("a.md", "Because.")])
+
+    assert message == "Answer using the context below.\n\n[1] a.md\nBecause.\n\nQuestion: Why?"
+
+
+def test_build_requests():
+    evaluator = BatchEvaluator(
+        OpenAIClient(None, open_ai_model="model"),
+        prompt="Be brief",
+        context_provider=retrieve,
+        max_completion_tokens=50,
+    )
+
+    [request] = evaluator.build_requests(QUESTIONS[:1])
+
+    assert request["custom_id"] == "0"
+    assert request["url"] == "/v1/chat/completions"
+    assert request["body"]["model"] == "model"
+    assert request["body"]["max_completion_tokens"] == 50
+    assert request["body"]["messages"][0] == {"role": "system", "content": "Be brief"}
+    assert "About Question 0" in request["body"]["messages"][1]["content"]
+
+
+def test_submit_uploads_requests():
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client(), open_ai_model="model")
+        evaluator = BatchEvaluator(client, prompt="Be brief", context_provider=retrieve)
+
+        submitted = evaluator.submit(QUESTIONS)
+
+        lines = server.state.file_contents[submitted.input_file_id].decode().splitlines()
+        assert server.state.files[submitted.input_file_id]["purpose"] == "batch"
+        assert server.request_counts["POST /batches"] == 1
+
+    assert len(lines) == 5
+    assert json.loads(lines[0])["body"]["messages"][0]["content"] == "Be brief"
+    assert submitted.messages["0"] == "Question 0"
+    assert submitted.sources["0"] == ["Guide.md"]
+
+
+def test_submit_rejects_duplicate_ids():
+    evaluator = BatchEvaluator(MagicMock(), prompt="Be brief", model="model")
+
+    with pytest.raises(ValueError, match="Duplicate question id: 0"):
+        evaluator.submit([QUESTIONS[0], QUESTIONS[0]])
+
+    evaluator.client.files_create.assert_not_called()
+
+
+def test_run_against_fake_api():
+    streamed = []
+
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client(), open_ai_model="model")
+        evaluator = BatchEvaluator(client, prompt="Be brief", context_provider=retrieve, poll_interval_in_seconds=0)
+
+        summary = evaluator.run(QUESTIONS, on_result=streamed.append)
+
+        assert server.request_counts["POST /batches"] == 1
+        assert server.request_counts["DELETE /files/{file_id}"] == 2
+        assert server.state.files == {}
+
+    assert summary.succeeded == 5
+    assert sorted(result.id for result in streamed) == [str(index) for index in range(5)]
+    assert all(result.response.startswith("This is a fake response") for result in streamed)
+    assert all(result.annotation_files == ["Guide.md"] for result in streamed)
+    assert all(result.token_count > 0 for result in streamed)
+
+
+def test_failed_requests_become_errors():
+    with FakeOpenAIServer(FakeApiConfig(seed=1, run_failure_probability=1.0)) as server:
+        evaluator = BatchEvaluator(
+            OpenAIClient(server.build_openai_client(), open_ai_model="model"),
+            prompt="Be brief",
+            poll_interval_in_seconds=0,
+        )
+
+        summary = evaluator.run(QUESTIONS[:2])
+
+    assert summary.failed == 2
+
+
+def test_wait_times_out():
+    with FakeOpenAIServer(FakeApiConfig(seed=1, batch_duration=constant(60.0))) as server:
+        evaluator = BatchEvaluator(
+            OpenAIClient(server.build_openai_client(), open_ai_model="model"),
+            prompt="Be brief",
+            poll_interval_in_seconds=0.01,
+        )
+        submitted = evaluator.submit(QUESTIONS[:1])
+
+        with pytest.raises(TimeoutError, match="still in_progress"):
+            evaluator.wait(submitted.id, timeout_in_seconds=0.05)
+
+        assert server.state.batches[submitted.id]["status"] == "cancelled"
+
+
+def test_results_are_matched_per_submission():
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        evaluator = BatchEvaluator(
+            OpenAIClient(server.build_openai_client(), open_ai_model="model"),
+            prompt="Be brief",
+            poll_interval_in_seconds=0,
+        )
+        first = evaluator.submit(QUESTIONS[:1])
+        second = evaluator.submit([BatchQuestion(id="0", message="Another question")])
+
+        [result] = evaluator.results(first, evaluator.wait(first.id))
+
+    assert result.message == "Question 0"
+    assert second.messages == {"0": "Another question"}
+
+
+def test_failed_batch_raises():
+    client = MagicMock()
+    client.batches_retrieve.return_value = SimpleNamespace(
+        id="batch_1",
+        status="failed",
+        request_counts=None,
+        errors=SimpleNamespace(data=[SimpleNamespace(code="invalid_json", message="Line 1 is not JSON")]),
+    )
+    client.files_create.return_value.id = "file_1"
+    client.batches_create.return_value.id = "batch_1"
+    evaluator = BatchEvaluator(client, prompt="Be brief", model="model", poll_interval_in_seconds=0)
+
+    with pytest.raises(RuntimeError, match="Batch batch_1 failed: Line 1 is not JSON"):
+        evaluator.run(QUESTIONS[:1])
+
+    client.files_delete.assert_called_once_with("file_1")
+
+
+def test_cancelled_batch_yields_partial_results():
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        evaluator = BatchEvaluator(
+            OpenAIClient(server.build_openai_client(), open_ai_model="model"),
+            prompt="Be brief",
+            poll_interval_in_seconds=0,
+        )
+        submitted = evaluator.submit(QUESTIONS[:2])
+        batch = evaluator.wait(submitted.id)
+        batch.status = "cancelled"
+
+        results = list(evaluator.results(submitted, batch))
+
+    assert len(results) == 2
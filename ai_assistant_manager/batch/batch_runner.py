@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Self
+
+from loguru import logger
+
+from ai_assistant_manager.encoding import UTF_8
+from ai_assistant_manager.percentile import percentile
+
+from ..chats.chat import Chat, RequiresActionException
+from ..clients.openai_api import OpenAIClient
+
+
+@dataclass
+class BatchQuestion:
+    id: str
+    message: str
+
+
+@dataclass
+class BatchResult:
+    id: str
+    message: str
+    response: str | None
+    annotation_files: list[str] = field(default_factory=list)
+    token_count: int = 0
+    latency_in_seconds: float = 0.0
+    thread_id: str | None = None
+    error: str | None = None
+
+
+@dataclass
+class BatchSummary:
+    total: int
+    succeeded: int
+    failed: int
+    elapsed_in_seconds: float
+    questions_per_second: float
+    p50_latency_in_seconds: float
+    p90_latency_in_seconds: float
+    p99_latency_in_seconds: float
+    total_tokens: int
+
+
+def load_questions(file_path: str) -> Iterator[BatchQuestion]:
+    """
+    Streams questions from a JSONL file. Each line needs a "message" (or
+    "question") and may carry an "id"; the line number is used otherwise.
+    """
+    with open(file_path, "r", encoding=UTF_8) as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            message = record.get("message") or record.get("question")
+            if not message:
+                raise ValueError(f'{file_path}:{line_number}: a question needs a "message" or "question"')
+            yield BatchQuestion(id=str(record.get("id", line_number)), message=message)
+
+
+class JsonlResultWriter:
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = None
+
+    def __enter__(self) -> Self:
+        self._file = open(self.file_path, "w", encoding=UTF_8)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file.close()
+
+    def __call__(self, result: BatchResult):
+        self._file.write(json.dumps(asdict(result)) + "\n")
+        self._file.flush()
+
+
+class BatchRunner:
+    """
+    Sends questions to an assistant with at most `concurrency` in flight. Each
+    worker thread keeps its own Chat and every question gets a fresh thread, so
+    answers do not share conversation context. Threads are deleted once their
+    question is answered unless `keep_threads` is set.
+    """
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        assistant_id: str,
+        *,
+        concurrency: int = 8,
+        chat_factory: Callable[[], Chat] | None = None,
+        keep_threads: bool = False,
+    ):
+        self.client = client
+        self.assistant_id = assistant_id
+        self.concurrency = concurrency
+        self.keep_threads = keep_threads
+        self.chat_factory = chat_factory or (lambda: Chat(self.client, self.assistant_id))
+        self._local = threading.local()
+
+    def run(
+        self, questions: Iterable[BatchQuestion], *, on_result: Callable[[BatchResult], None] | None = None
+    ) -> BatchSummary:
+        """
+        Results are passed to `on_result` from the calling thread in the order
+        they complete.
+        """
+        results: list[BatchResult] = []
+        started_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as executor:
+            in_flight: set[Future] = set()
+
+            for question in questions:
+                if len(in_flight) >= self.concurrency:
+                    in_flight = self._drain(wait(in_flight, return_when=FIRST_COMPLETED), results, on_result)
+                in_flight.add(executor.submit(self._ask, question))
+
+            while in_flight:
+                in_flight = self._drain(wait(in_flight, return_when=FIRST_COMPLETED), results, on_result)
+
+        return summarize_batch(results, time.perf_counter() - started_at)
+
+    def _drain(self, done_and_pending, results: list[BatchResult], on_result) -> set[Future]:
+        done, pending = done_and_pending
+        for future in done:
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return pending
+
+    def _chat(self) -> Chat:
+        if not hasattr(self._local, "chat"):
+            self._local.chat = self.chat_factory()
+        return self._local.chat
+
+    def _ask(self, question: BatchQuestion) -> BatchResult:
+        from openai import APIError
+
+        chat = self._chat()
+        started_at = time.perf_counter()
+        chat.thread_id = None
+
+        try:
+            chat.start()
+            response = chat.send_user_message(question.message)
+            return BatchResult(
+                id=question.id,
+                message=question.message,
+                response=response.message,
+                annotation_files=response.annotation_files,
+                token_count=response.token_count,
+                latency_in_seconds=round(time.perf_counter() - started_at, 4),
+                thread_id=chat.thread_id,
+            )
+        except RequiresActionException as e:
+            error = f"Requires action: {e.data.name}"
+        except (RuntimeError, APIError) as e:
+            error = f"{type(e).__name__}: {e}"
+        except Exception as e:
+            logger.exception(f"Question {question.id} raised an unexpected error")
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            self._delete_thread(chat.thread_id)
+
+        logger.warning(f"Question {question.id} failed: {error}")
+        return BatchResult(
+            id=question.id,
+            message=question.message,
+            response=None,
+            latency_in_seconds=round(time.perf_counter() - started_at, 4),
+            thread_id=chat.thread_id,
+            error=error,
+        )
+
+    def _delete_thread(self, thread_id: str | None):
+        from openai import APIError
+
+        if self.keep_threads or not thread_id:
+            return
+        try:
+            self.client.threads_delete(thread_id)
+        except APIError as e:
+            logger.warning(f"Could not delete thread {thread_id}: {e}")
+
+
+def summarize_batch(results: list[BatchResult], elapsed_in_seconds: float) -> BatchSummary:
+    latencies = [result.latency_in_seconds for result in results if result.error is None] or [0.0]
+    failed = sum(1 for result in results if result.error is not None)
+
+    return BatchSummary(
+        total=len(results),
+        succeeded=len(results) - failed,
+        failed=failed,
+        elapsed_in_seconds=round(elapsed_in_seconds, 4),
+        questions_per_second=round(len(results) / elapsed_in_seconds, 4) if elapsed_in_seconds else 0.0,
+        p50_latency_in_seconds=percentile(latencies, 0.5),
+        p90_latency_in_seconds=percentile(latencies, 0.9),
+        p99_latency_in_seconds=percentile(latencies, 0.99),
+        total_tokens=sum(result.token_count for result in results),
+    )
@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..assistants.assistant_service import AssistantService
+from ..chats.chat import ActionData, RequiresActionException
+from ..chats.chat_response import ChatResponse
+from ..clients.openai_api import OpenAIClient
+from ..fake_api.fake_api_config import FakeApiConfig
+from ..fake_api.fake_api_server import FakeOpenAIServer
+from .batch_runner import BatchQuestion, BatchRunner, JsonlResultWriter, load_questions, summarize_batch
+
+
+class FakeChat:
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.thread_id = None
+
+    def start(self):
+        self.thread_id = "thread"
+
+    def send_user_message(self, message: str) -> ChatResponse:
+        with FakeChat.lock:
+            FakeChat.active += 1
+            FakeChat.max_active = max(FakeChat.max_active, FakeChat.active)
+        time.sleep(0.01)
+        with FakeChat.lock:
+            FakeChat.active -= 1
+
+        if message == "tool":
+            raise RequiresActionException("action", data=ActionData("run", "call", "get_weather", {}))
+        if message == "boom":
+            raise RuntimeError("Run failed with status: failed")
+        if message == "parse":
+            raise KeyError("choices")
+        return ChatResponse(message=f"answer to {message}", annotation_files=[], token_count=3)
+
+
+def test_load_questions(tmp_path):
+    questions_path = tmp_path / "questions.jsonl"
+    questions_path.write_text('{"id": "a", "message": "first"}\n\n{"question": "second"}\n')
+
+    assert list(load_questions(str(questions_path))) == [
+        BatchQuestion(id="a", message="first"),
+        BatchQuestion(id="3", message="second"),
+    ]
+
+
+def test_load_questions_rejects_records_without_a_message(tmp_path):
+    questions_path = tmp_path / "questions.jsonl"
+    questions_path.write_text('{"message": "first"}\n{"id": "b"}\n')
+
+    with pytest.raises(ValueError, match=r"questions.jsonl:2: a question needs"):
+        list(load_questions(str(questions_path)))
+
+
+def test_run_bounds_concurrency_and_records_errors():
+    questions = [BatchQuestion(id=str(index), message=f"q{index}") for index in range(20)]
+    questions += [BatchQuestion(id=message, message=message) for message in ["tool", "boom", "parse"]]
+    streamed = []
+
+    runner = BatchRunner(MagicMock(), "assistant", concurrency=4, chat_factory=FakeChat)
+    summary = runner.run(iter(questions), on_result=streamed.append)
+
+    assert FakeChat.max_active <= 4
+    assert len(streamed) == 23
+    assert summary.succeeded == 20
+    assert summary.failed == 3
+    assert summary.total_tokens == 60
+    errors = {result.id: result.error for result in streamed if result.error}
+    assert errors == {
+        "tool": "Requires action: get_weather",
+        "boom": "RuntimeError: Run failed with status: failed",
+        "parse": "KeyError: 'choices'",
+    }
+
+
+def test_run_deletes_threads_unless_kept():
+    client = MagicMock()
+    questions = [BatchQuestion(id="ok", message="ok"), BatchQuestion(id="boom", message="boom")]
+
+    BatchRunner(client, "assistant", concurrency=1, chat_factory=FakeChat).run(questions)
+    assert client.threads_delete.call_count == 2
+
+    client.reset_mock()
+    BatchRunner(client, "assistant", concurrency=1, chat_factory=FakeChat, keep_threads=True).run(questions)
+    client.threads_delete.assert_not_called()
+
+
+def test_summarize_batch_without_successes():
+    summary = summarize_batch([], 0)
+
+    assert summary.total == 0
+    assert summary.p50_latency_in_seconds == 0.0
+    assert summary.questions_per_second == 0.0
+
+
+def test_run_against_fake_api(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "bin" / "files").mkdir(parents=True)
+    (tmp_path / "bin" / "files" / "Batch - about.txt").write_text("About")
+    output_path = str(tmp_path / "results.jsonl")
+
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = AssistantService(client, prompt="Batch", assistant_name="Batch").get_assistant_id()
+        questions = [BatchQuestion(id=str(index), message=f"Question {index}") for index in range(6)]
+
+        with JsonlResultWriter(output_path) as writer:
+            summary = BatchRunner(client, assistant_id, concurrency=3).run(questions, on_result=writer)
+
+        assert server.request_counts["POST /threads"] == 6
+        assert server.request_counts["DELETE /threads/{thread_id}"] == 6
+        assert server.state.threads == {}
+
+    with open(output_path) as file:
+        results = [json.loads(line) for line in file]
+
+    assert summary.succeeded == 6
+    assert sorted(result["id"] for result in results) == [str(index) for index in range(6)]
+    assert len({result["thread_id"] for result in results}) == 6
+    assert all(result["response"].startswith("This is a fake response") for result in results)
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_chat():
+    FakeChat.active = 0
+    FakeChat.max_active = 0
@@ -0,0 +1,131 @@
+import json
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from ai_assistant_manager.encoding import UTF_8
+from ai_assistant_manager.percentile import percentile
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    iterations: int
+    min_seconds: float
+    median_seconds: float
+    p95_seconds: float
+    mean_seconds: float
+    metrics: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class BenchmarkComparison:
+    name: str
+    baseline_seconds: float
+    current_seconds: float
+    change: float
+    regressed: bool
+
+
+def summarize(name: str, timings: list[float], metrics: dict[str, float] | None = None) -> BenchmarkResult:
+    return BenchmarkResult(
+        name=name,
+        iterations=len(timings),
+        min_seconds=round(min(timings), 6),
+        median_seconds=round(statistics.median(timings), 6),
+        p95_seconds=round(percentile(timings, 0.95), 6),
+        mean_seconds=round(statistics.fmean(timings), 6),
+        metrics=metrics or {},
+    )
+
+
+def run_benchmark(
+    name: str,
+    func: Callable[[], object],
+    *,
+    iterations: int = 5,
+    warmup: int = 1,
+    setup: Callable[[], object] | None = None,
+) -> BenchmarkResult:
+    """
+    Times `func` over `iterations` runs after `warmup` untimed runs. `setup` runs
+    before every call and is excluded from the timing.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    timings = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start_time = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start_time)
+
+    return summarize(name, timings)
+
+
+def save_results(results: list[BenchmarkResult], file_path: str):
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [asdict(result) for result in results],
+    }
+    with open(file_path, "w", encoding=UTF_8) as file:
+        json.dump(report, file, indent=2)
+
+
+def load_results(file_path: str) -> list[BenchmarkResult]:
+    with open(file_path, "r", encoding=UTF_8) as file:
+        report = json.load(file)
+    return [BenchmarkResult(**result) for result in report["results"]]
+
+
+def compare_to_baseline(
+    results: list[BenchmarkResult], baseline: list[BenchmarkResult], *, tolerance: float = 0.2
+) -> list[BenchmarkComparison]:
+    """
+    Compares median timings; a benchmark regresses when it is more than
+    `tolerance` (a fraction) slower than its baseline.
+    """
+    baseline_by_name = {result.name: result for result in baseline}
+    comparisons = []
+
+    for result in results:
+        if result.name not in baseline_by_name:
+            continue
+
+        baseline_seconds = baseline_by_name[result.name].median_seconds
+        change = (result.median_seconds - baseline_seconds) / baseline_seconds if baseline_seconds else 0.0
+        comparisons.append(
+            BenchmarkComparison(
+                name=result.name,
+                baseline_seconds=baseline_seconds,
+                current_seconds=result.median_seconds,
+                change=round(change, 4),
+                regressed=change > tolerance,
+            )
+        )
+
+    return comparisons
+
+
+def format_results(results: list[BenchmarkResult], comparisons: list[BenchmarkComparison] | None = None) -> str:
+    changes = {comparison.name: comparison for comparison in comparisons or []}
+    lines = [f"{'benchmark':<48} {'median':>10} {'p95':>10}  change"]
+
+    for result in results:
+        comparison = changes.get(result.name)
+        change = f"{comparison.change:+.1%}{' REGRESSED' if comparison.regressed else ''}" if comparison else ""
+        metrics = " ".join(f"{key}={value}" for key, value in result.metrics.items())
+        lines.append(
+            f"{result.name:<48} {result.median_seconds:>10.4f} {result.p95_seconds:>10.4f}  {change} {metrics}".rstrip()
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,180 @@
+import contextlib
+import os
+import shutil
+import time
+
+from loguru import logger
+
+from ai_assistant_manager.assistants.assistant_service import AssistantService
+from ai_assistant_manager.chats.chat import Chat
+from ai_assistant_manager.clients.openai_api import OpenAIClient
+from ai_assistant_manager.encoding import UTF_8
+from ai_assistant_manager.env_variables import get_config
+from ai_assistant_manager.exporters.directory.directory_exporter import DirectoryExporter
+from ai_assistant_manager.fake_api.fake_api_config import FakeApiConfig
+from ai_assistant_manager.fake_api.fake_api_server import FakeOpenAIServer
+
+from .benchmark import BenchmarkResult, run_benchmark, summarize
+
+CORPUS_DIRECTORY = "corpus"
+BENCHMARK_PREFIX = "Benchmark"
+
+
+def build_corpus(data_dir: str, file_count: int, *, body_lines: int = 20) -> str:
+    """
+    Writes `file_count` synthetic documents in the DirectoryExporter format
+    (first line is the date). Existing corpora of the same size are reused.
+    """
+    corpus_dir = os.path.join(data_dir, CORPUS_DIRECTORY)
+    if os.path.isdir(corpus_dir) and len(os.listdir(corpus_dir)) == file_count:
+        return corpus_dir
+
+    shutil.rmtree(corpus_dir, ignore_errors=True)
+    os.makedirs(corpus_dir)
+    body = "\n".join(f"Line {line} of a synthetic benchmark document." for line in range(body_lines))
+
+    for index in range(file_count):
+        with open(os.path.join(corpus_dir, f"{index % 1000:03d} Document {index}.md"), "w", encoding=UTF_8) as file:
+            file.write(f"2024-08-{index % 28 + 1:02d}\n{body}\n")
+
+    return corpus_dir
+
+
+def exporter_benchmarks(work_dir: str, sizes: list[int], *, iterations: int = 3) -> list[BenchmarkResult]:
+    results = []
+
+    for size in sizes:
+        data_dir = os.path.join(work_dir, f"data-{size}")
+        bin_dir = os.path.join(work_dir, f"bin-{size}")
+        logger.info(f"Building corpus of {size} files")
+        build_corpus(data_dir, size)
+
+        config = get_config().replace(data_dir=data_dir, bin_dir=bin_dir, data_file_prefix=BENCHMARK_PREFIX)
+        exporter = DirectoryExporter(CORPUS_DIRECTORY, config=config)
+        os.makedirs(exporter.get_dir_path(), exist_ok=True)
+        result = run_benchmark(
+            f"directory_exporter.write_data[{size}]", exporter.write_data, iterations=iterations, warmup=0
+        )
+
+        result.metrics["files_per_second"] = round(size / result.median_seconds)
+        results.append(result)
+
+    return results
+
+
+def provisioning_benchmarks(
+    work_dir: str, file_counts: list[int], *, config: FakeApiConfig | None = None, iterations: int = 3
+) -> list[BenchmarkResult]:
+    results = []
+
+    with FakeOpenAIServer(config or FakeApiConfig()) as server, contextlib.chdir(work_dir):
+        client = OpenAIClient(server.build_openai_client())
+
+        for file_count in file_counts:
+            service = AssistantService(client, prompt="Benchmark", assistant_name=f"{BENCHMARK_PREFIX} {file_count}")
+            _build_retrieval_files(work_dir, file_count, prefix=service.data_file_prefix)
+
+            results.append(
+                _timed_with_requests(
+                    f"assistant_service.create_retrieval_files[{file_count}]",
+                    server,
+                    service.create_retrieval_files,
+                    iterations=iterations,
+                    teardown=service.delete_assistant,
+                )
+            )
+            results.append(
+                _timed_with_requests(
+                    f"assistant_service.provision[{file_count}]",
+                    server,
+                    service.get_assistant_id,
+                    iterations=iterations,
+                    teardown=service.delete_assistant,
+                )
+            )
+
+            service.get_assistant_id()
+            results.append(
+                _timed_with_requests(
+                    f"assistant_service.delete_assistant[{file_count}]",
+                    server,
+                    service.delete_assistant,
+                    iterations=1,
+                )
+            )
+            _check_torn_down(server)
+
+    return results
+
+
+def chat_benchmarks(work_dir: str, *, turns: int = 10, config: FakeApiConfig | None = None) -> list[BenchmarkResult]:
+    with FakeOpenAIServer(config or FakeApiConfig()) as server, contextlib.chdir(work_dir):
+        client = OpenAIClient(server.build_openai_client())
+        service = AssistantService(client, prompt="Benchmark", assistant_name=f"{BENCHMARK_PREFIX} chat")
+        _build_retrieval_files(work_dir, 3, prefix=service.data_file_prefix)
+        assistant_id = service.get_assistant_id()
+
+        chat = Chat(client, assistant_id)
+        start_time = time.perf_counter()
+        chat.start()
+        first_thread_seconds = time.perf_counter() - start_time
+
+        timings = []
+        requests = 0
+        for turn in range(turns):
+            server.reset_request_counts()
+            start_time = time.perf_counter()
+            chat.send_user_message(f"Benchmark question {turn}?")
+            timings.append(time.perf_counter() - start_time)
+            requests += server.total_requests()
+
+        service.delete_assistant()
+        _check_torn_down(server)
+
+    return [
+        summarize(
+            "chat.send_user_message",
+            timings,
+            {"requests_per_turn": round(requests / turns, 2), "start_seconds": round(first_thread_seconds, 4)},
+        )
+    ]
+
+
+def _build_retrieval_files(work_dir: str, file_count: int, *, prefix: str):
+    """
+    Names the files with the service's data_file_prefix, so its teardown finds
+    and deletes what it uploaded.
+    """
+    files_dir = os.path.join(work_dir, "bin", "files")
+    shutil.rmtree(os.path.join(work_dir, "bin"), ignore_errors=True)
+    os.makedirs(files_dir)
+
+    for index in range(file_count):
+        with open(os.path.join(files_dir, f"{prefix} - {index}.txt"), "w", encoding=UTF_8) as file:
+            file.write(f"Benchmark retrieval file {index}\n")
+
+
+def _check_torn_down(server: FakeOpenAIServer):
+    """
+    Leftovers would make later iterations reuse uploads instead of measuring
+    them, so a teardown that misses anything fails the run.
+    """
+    state = server.state
+    if leftovers := len(state.assistants) + len(state.vector_stores) + len(state.files):
+        raise RuntimeError(f"Benchmark teardown left {leftovers} assistants, vector stores or files behind")
+
+
+def _timed_with_requests(name: str, server: FakeOpenAIServer, func, *, iterations: int, teardown=None):
+    timings = []
+    requests = 0
+
+    for _ in range(iterations):
+        server.reset_request_counts()
+        start_time = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start_time)
+        requests += server.total_requests()
+        if teardown:
+            teardown()
+
+    return summarize(name, timings, {"requests": round(requests / iterations, 2)})
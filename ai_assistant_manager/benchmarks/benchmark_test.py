@@ -0,0 +1,92 @@
+import os
+
+from ..env_variables import ENV_VARIABLES
+from ..fake_api.fake_api_config import FakeApiConfig
+from .benchmark import (
+    BenchmarkResult,
+    compare_to_baseline,
+    format_results,
+    load_results,
+    percentile,
+    run_benchmark,
+    save_results,
+    summarize,
+)
+from .benchmark_suites import build_corpus, chat_benchmarks, exporter_benchmarks, provisioning_benchmarks
+
+
+def test_summarize():
+    result = summarize("example", [0.3, 0.1, 0.2], {"requests": 2})
+
+    assert result.iterations == 3
+    assert result.min_seconds == 0.1
+    assert result.median_seconds == 0.2
+    assert result.p95_seconds == 0.3
+    assert result.metrics == {"requests": 2}
+    assert percentile([1, 2, 3, 4, 5], 0.5) == 3
+
+
+def test_run_benchmark_runs_setup_and_warmup():
+    calls = []
+
+    result = run_benchmark(
+        "example", lambda: calls.append("run"), iterations=2, warmup=1, setup=lambda: calls.append("setup")
+    )
+
+    assert result.iterations == 2
+    assert calls == ["setup", "run"] * 3
+
+
+def test_save_load_and_compare(tmp_path):
+    file_path = str(tmp_path / "results.json")
+    baseline = [summarize("fast", [1.0]), summarize("slow", [1.0])]
+    save_results(baseline, file_path)
+
+    comparisons = compare_to_baseline(
+        [summarize("fast", [1.1]), summarize("slow", [1.5]), summarize("new", [1.0])],
+        load_results(file_path),
+        tolerance=0.2,
+    )
+
+    assert [(comparison.name, comparison.regressed) for comparison in comparisons] == [
+        ("fast", False),
+        ("slow", True),
+    ]
+    assert "REGRESSED" in format_results([summarize("slow", [1.5])], comparisons)
+
+
+def test_build_corpus_is_reused(tmp_path):
+    corpus_dir = build_corpus(str(tmp_path), 5)
+    first_file = os.path.join(corpus_dir, min(os.listdir(corpus_dir)))
+    modified_at = os.path.getmtime(first_file)
+
+    build_corpus(str(tmp_path), 5)
+
+    assert len(os.listdir(corpus_dir)) == 5
+    assert os.path.getmtime(first_file) == modified_at
+
+
+def test_exporter_benchmarks_leave_env_variables_untouched(tmp_path):
+    data_dir = ENV_VARIABLES.data_dir
+
+    [result] = exporter_benchmarks(str(tmp_path), [10], iterations=1)
+
+    assert isinstance(result, BenchmarkResult)
+    assert result.name == "directory_exporter.write_data[10]"
+    assert result.metrics["files_per_second"] > 0
+    assert ENV_VARIABLES.data_dir == data_dir
+
+
+def test_provisioning_and_chat_benchmarks(tmp_path):
+    config = FakeApiConfig(seed=1)
+
+    results = provisioning_benchmarks(str(tmp_path), [2], config=config, iterations=2)
+    [chat_result] = chat_benchmarks(str(tmp_path), turns=2, config=config)
+
+    assert [result.name for result in results] == [
+        "assistant_service.create_retrieval_files[2]",
+        "assistant_service.provision[2]",
+        "assistant_service.delete_assistant[2]",
+    ]
+    assert results[0].metrics["requests"] == 2
+    assert chat_result.metrics["requests_per_turn"] > 0
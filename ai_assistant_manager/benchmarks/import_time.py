@@ -0,0 +1,67 @@
+import json
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from .benchmark import BenchmarkResult, summarize
+
+IMPORT_BUDGETS_IN_SECONDS = {
+    "ai_assistant_manager.chats.chat": 0.5,
+    "ai_assistant_manager.exporters.directory.directory_exporter": 0.5,
+    "ai_assistant_manager.exporters.files.files_exporter": 0.5,
+    "ai_assistant_manager.search.bm25_index": 0.5,
+}
+
+LAZY_DEPENDENCIES = ["openai", "httpx", "dateutil", "dotenv"]
+
+MEASURE_SCRIPT = """
+import json, sys, time
+started_at = time.perf_counter()
+__import__({module!r})
+elapsed = time.perf_counter() - started_at
+print(json.dumps({{"seconds": elapsed, "modules": sorted(name.split(".")[0] for name in sys.modules)}}))
+"""
+
+
+@dataclass
+class ImportMeasurement:
+    module: str
+    seconds: float
+    loaded_lazy_dependencies: list[str]
+
+
+def measure_import(module: str) -> ImportMeasurement:
+    """
+    Imports `module` in a fresh interpreter so nothing is already cached in
+    sys.modules, and reports the time taken and which lazy dependencies loaded.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT.format(module=module)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+    loaded = set(report["modules"])
+
+    return ImportMeasurement(
+        module=module,
+        seconds=report["seconds"],
+        loaded_lazy_dependencies=[dependency for dependency in LAZY_DEPENDENCIES if dependency in loaded],
+    )
+
+
+def import_benchmarks(*, iterations: int = 3) -> list[BenchmarkResult]:
+    results = []
+
+    for module, budget in IMPORT_BUDGETS_IN_SECONDS.items():
+        measurements = [measure_import(module) for _ in range(iterations)]
+        results.append(
+            summarize(
+                f"import[{module}]",
+                [measurement.seconds for measurement in measurements],
+                {"budget_seconds": budget},
+            )
+        )
+
+    return results
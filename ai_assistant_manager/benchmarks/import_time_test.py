@@ -0,0 +1,18 @@
+import pytest
+
+from .import_time import IMPORT_BUDGETS_IN_SECONDS, import_benchmarks, measure_import
+
+
+@pytest.mark.parametrize("module", list(IMPORT_BUDGETS_IN_SECONDS))
+def test_import_stays_within_budget(module):
+    measurement = min((measure_import(module) for _ in range(2)), key=lambda measurement: measurement.seconds)
+
+    assert measurement.loaded_lazy_dependencies == []
+    assert measurement.seconds < IMPORT_BUDGETS_IN_SECONDS[module]
+
+
+def test_import_benchmarks():
+    results = import_benchmarks(iterations=1)
+
+    assert [result.name for result in results] == [f"import[{module}]" for module in IMPORT_BUDGETS_IN_SECONDS]
+    assert all(result.metrics["budget_seconds"] > 0 for result in results)
@@ -1,5 +1,7 @@
 import json
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 
 from loguru import logger
@@ -7,17 +9,54 @@ from loguru import logger
 from ai_assistant_manager.chats.chat_response import MessageWithAnnotations
 
 from ..clients.openai_api import OpenAIClient
+from ..concurrency.singleflight import shared_flights
 from ..timer.timer import timer
-from .chat_response import Annotation, ChatResponse
+from ..usage.usage_ledger import RunUsage, UsageLedger
+from .chat_response import Annotation, ChatResponse, render_annotations
+from .response_cache import ResponseCache
+from .run_monitor import RunMonitor
+from .run_options import RunOptions
+from .transcript_store import ASSISTANT, TOOL_CALL, TOOL_OUTPUT, USER, TranscriptEntry, TranscriptStore
 
 TOOL_CALL_PREFIX = "tc!"
+TERMINAL_RUN_STATUSES = ["completed", "failed", "expired", "cancelled", "incomplete"]
+TOKEN_LIMIT_REASONS = ["max_completion_tokens", "max_prompt_tokens"]
+CANCEL_TIMEOUT_IN_SECONDS = 10
 
 
 class Chat:
-    def __init__(self, client: OpenAIClient, assistant_id: str, *, thread_id: str | None = None):
+    def __init__(
+        self,
+        client: OpenAIClient,
+        assistant_id: str,
+        *,
+        thread_id: str | None = None,
+        usage_ledger: UsageLedger | None = None,
+        response_cache: ResponseCache | None = None,
+        config_hash: str = "",
+        run_timeout_in_seconds: float = 120,
+        run_options: RunOptions | None = None,
+        run_monitor: RunMonitor | None = None,
+        transcript_store: TranscriptStore | None = None,
+    ):
         self.client = client
         self.assistant_id = assistant_id
         self.thread_id = thread_id
+        self.usage_ledger = usage_ledger
+        self.response_cache = response_cache
+        self.config_hash = config_hash
+        self.run_timeout_in_seconds = run_timeout_in_seconds
+        self.run_options = run_options or RunOptions()
+        self.last_run_options = self.run_options
+        self.run_monitor = run_monitor
+        self.transcript_store = transcript_store
+        self.last_run_usage: RunUsage | None = None
+        self.last_run_id: str | None = None
+        self.last_run_incomplete = False
+        self.history_cursor: str | None = None
+        self._run_started_at: dict[str, float] = {}
+        self._file_names: dict[str, str] = {}
+        self._pending_threads: set[str] = set()
 
     def start(self):
         logger.info("Starting Chat")
@@ -27,55 +66,314 @@ class Chat:
     def create_thread(self):
         return self.client.threads_create().id
 
-    def send_user_message(self, message: str) -> ChatResponse:
+    def send_user_message(
+        self, message: str, *, timeout_in_seconds: float | None = None, run_options: RunOptions | None = None
+    ) -> ChatResponse:
+        """
+        The run must finish within `timeout_in_seconds` (default
+        `run_timeout_in_seconds`) of this call, or it is cancelled and
+        RunTimeoutError is raised with the thread ready for the next message.
+        `run_options` overrides the chat's context controls for this run.
+        """
+        deadline = self._deadline(timeout_in_seconds)
+        content = self.remove_tool_call_from_message(message)
         self.client.messages_create(
             self.thread_id,
-            self.remove_tool_call_from_message(message),
+            content,
             "user",
         )
-        tokens = self.run_thread(self.should_force_tool_call(message))
-        last_message = self.last_message_with_annotations()
+        self._record_transcript(USER, content, run_id=None)
+        tokens = self.run_thread(self.should_force_tool_call(message), deadline=deadline, run_options=run_options)
+        return self._build_response(tokens)
+
+    def ask(self, message: str) -> ChatResponse:
+        """
+        Answers a stateless, single-turn question on a throwaway thread, so the
+        answer cannot depend on this chat's history, and serves repeats from the
+        response cache when one is configured. Cache hits make no API calls.
+        When the run stops for a tool call, the throwaway thread is kept until
+        the outputs are submitted with the exception data's thread_id; forced
+        tool calls are never cached.
+        """
+        if self.response_cache is None or self.should_force_tool_call(message):
+            return self._send_on_fresh_thread(message)
+
+        if cached := self.response_cache.get(self.assistant_id, message, config_hash=self.config_hash):
+            logger.info("Response cache hit")
+            return cached
+
+        response = self._send_on_fresh_thread(message)
+        if response.incomplete:
+            return response
+        self.response_cache.put(self.assistant_id, message, response, config_hash=self.config_hash)
+        return response
+
+    def _send_on_fresh_thread(self, message: str) -> ChatResponse:
+        with self._throwaway_thread(self.create_thread()):
+            return self.send_user_message(message)
+
+    @contextmanager
+    def _throwaway_thread(self, thread_id: str) -> Iterator[None]:
+        """
+        Points the chat at a throwaway thread for one exchange, then restores its
+        own thread and last run. The throwaway thread is deleted afterwards
+        unless a run on it is waiting for tool outputs.
+        """
+        from openai import APIError
+
+        previous = self.thread_id, self.last_run_id
+        self.thread_id = thread_id
+        pending = False
+        try:
+            yield
+        except RequiresActionException:
+            pending = True
+            raise
+        finally:
+            self.thread_id, self.last_run_id = previous
+            if pending:
+                self._pending_threads.add(thread_id)
+            else:
+                self._pending_threads.discard(thread_id)
+                try:
+                    self.client.threads_delete(thread_id)
+                except APIError as e:
+                    logger.warning(f"Could not delete thread {thread_id}: {e}")
+
+    @timer("Submit Tool Outputs")
+    def submit_tool_outputs(
+        self,
+        run_id: str,
+        tool_call_id: str,
+        response: str,
+        *,
+        thread_id: str | None = None,
+        timeout_in_seconds: float | None = None,
+    ) -> ChatResponse:
+        """
+        `thread_id` is the run's thread from the RequiresActionException data;
+        it defaults to the chat's thread, and a throwaway thread from `ask` is
+        deleted once its run settles.
+        """
+        if thread_id in self._pending_threads:
+            with self._throwaway_thread(thread_id):
+                return self._submit_tool_outputs(run_id, tool_call_id, response, timeout_in_seconds)
+        if thread_id not in (None, self.thread_id):
+            raise ValueError(f"Thread {thread_id} has no run waiting for tool outputs from this chat")
+        return self._submit_tool_outputs(run_id, tool_call_id, response, timeout_in_seconds)
+
+    def _submit_tool_outputs(
+        self, run_id: str, tool_call_id: str, response: str, timeout_in_seconds: float | None
+    ) -> ChatResponse:
+        deadline = self._deadline(timeout_in_seconds)
+        self._run_started_at[run_id] = time.monotonic()
+        self.last_run_id = run_id
+        try:
+            self.client.submit_tool_outputs_to_run(run_id, tool_call_id, self.thread_id, response)
+            self._record_transcript(TOOL_OUTPUT, response, tool_call={"id": tool_call_id})
+        except Exception:
+            self._run_started_at.pop(run_id, None)
+            raise
+        tokens = self._wait_for_run_to_complete(run_id, deadline=deadline)
+        return self._build_response(tokens)
+
+    def _deadline(self, timeout_in_seconds: float | None) -> float:
+        return time.monotonic() + (self.run_timeout_in_seconds if timeout_in_seconds is None else timeout_in_seconds)
+
+    def _build_response(self, tokens: int) -> ChatResponse:
+        """
+        Materializes a completed run's reply with a single message fetch, shared by
+        the user-message and tool-output paths. A run cut short by a token limit
+        returns whatever it wrote, flagged as incomplete.
+        """
+        try:
+            last_message = self.last_message_with_annotations()
+        except IndexError:
+            if not self.last_run_incomplete:
+                raise
+            last_message = MessageWithAnnotations(message="", annotation_files=[])
+        self._record_transcript(
+            ASSISTANT,
+            last_message.message,
+            annotation_files=tuple(last_message.annotation_files),
+            usage=self.last_run_usage,
+        )
         return ChatResponse(
-            message=last_message.message, annotation_files=last_message.annotation_files, token_count=tokens
+            message=last_message.message,
+            annotation_files=last_message.annotation_files,
+            token_count=tokens,
+            usage=self.last_run_usage,
+            incomplete=self.last_run_incomplete,
         )
 
-    @timer("Submit Tool Outputs")
-    def submit_tool_outputs(self, run_id: str, tool_call_id: str, response: str) -> int:
-        self.client.submit_tool_outputs_to_run(run_id, tool_call_id, self.thread_id, response)
-        tokens = self._wait_for_run_to_complete(run_id)
-        return ChatResponse(message=self.last_message(), annotation_files=[], token_count=tokens)
+    def _record_transcript(self, role: str, content: str, *, usage: RunUsage | None = None, **details):
+        if not self.transcript_store:
+            return
+        entry = TranscriptEntry(
+            thread_id=self.thread_id,
+            assistant_id=self.assistant_id,
+            role=role,
+            content=content,
+            **{"run_id": self.last_run_id, **details},
+        )
+        self.transcript_store.record(entry.with_usage(usage))
+
+    def history(self, *, limit: int | None = None) -> list[TranscriptEntry]:
+        """
+        Reads this thread's transcript from the local store, oldest first.
+        """
+        if not self.transcript_store:
+            raise RuntimeError("Chat has no transcript store")
+        return self.transcript_store.history(self.thread_id, limit=limit)
 
     @timer("Run Thread")
-    def run_thread(self, should_force_tool_call: bool = False) -> int:
-        run = self.client.runs_create(self.assistant_id, self.thread_id, should_force_tool_call)
-        return self._wait_for_run_to_complete(run.id)
+    def run_thread(
+        self,
+        should_force_tool_call: bool = False,
+        *,
+        deadline: float | None = None,
+        run_options: RunOptions | None = None,
+    ) -> int:
+        self.last_run_usage = None
+        self.last_run_options = run_options or self.run_options
+        started_at = time.monotonic()
+        run = self.client.runs_create(
+            self.assistant_id,
+            self.thread_id,
+            should_force_tool_call,
+            poll=False,
+            **self.last_run_options.to_request(),
+        )
+        self._run_started_at[run.id] = started_at
+        self.last_run_id = run.id
+        return self._wait_for_run_to_complete(run.id, deadline=deadline)
 
-    def _wait_for_run_to_complete(self, run_id: str, *, step: float = 0.25, timeout_in_seconds: int = 120) -> int:
-        timeout = timeout_in_seconds / step
+    def _wait_for_run_to_complete(
+        self,
+        run_id: str,
+        *,
+        step: float = 0.25,
+        timeout_in_seconds: float | None = None,
+        deadline: float | None = None,
+    ) -> int:
+        deadline = deadline or self._deadline(timeout_in_seconds)
+        started_at = self._run_started_at.pop(run_id, time.monotonic())
 
-        while timeout > 0:
-            run = self.client.runs_retrieve(run_id, self.thread_id)
+        if self.run_monitor:
+            run, poll_count = self._watch_run(run_id, deadline)
+            if run and (tokens := self._settle_run(run_id, run, started_at, poll_count)) is not None:
+                return tokens
+        else:
+            poll_count = 0
+
+            while time.monotonic() < deadline:
+                run = self.client.runs_retrieve(run_id, self.thread_id)
+                poll_count += 1
+
+                if (tokens := self._settle_run(run_id, run, started_at, poll_count)) is not None:
+                    return tokens
 
-            if run.status in ["completed"]:
-                return run.usage.total_tokens
-            if run.status in ["requires_action"] and run.required_action.type == "submit_tool_outputs":
-                tool_call = run.required_action.submit_tool_outputs.tool_calls[0]
-                tool_call_id = tool_call.id
-                name = tool_call.function.name
-                arguments = tool_call.function.arguments
-                raise RequiresActionException(
-                    f"Run requires action with status: {run.status}",
-                    data=ActionData(
-                        run_id=run_id, tool_call_id=tool_call_id, name=name, arguments=json.loads(arguments)
-                    ),
-                )
-            if run.status in ["failed", "expired", "cancelled"]:
-                raise RuntimeError(f"Run failed with status: {run.status}")
-
-            timeout -= 1
+                time.sleep(step)
+
+        run = self._cancel_run(run_id, step=step)
+        if run.status == "completed":
+            return self._settle_run(run_id, run, started_at, poll_count)
+        raise RunTimeoutError(run_id, run.status, run.last_error, timeout_in_seconds=deadline - started_at)
+
+    def _watch_run(self, run_id: str, deadline: float):
+        """
+        Waits for the shared RunMonitor to resolve the run instead of polling from
+        this thread; returns (None, 0) when the deadline passes first.
+        """
+        future = self.run_monitor.watch(run_id, self.thread_id)
+        try:
+            outcome = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            self.run_monitor.forget(run_id)
+            return None, 0
+        return outcome.run, outcome.poll_count
+
+    def _settle_run(self, run_id: str, run, started_at: float, poll_count: int) -> int | None:
+        """
+        Returns the run's total tokens once completed, or stopped by a token limit,
+        raises when it needs a tool call, needs any other action or has failed,
+        and returns None while it is still going.
+        """
+        if run.status in ["completed"] or self._hit_token_limit(run):
+            self.last_run_incomplete = run.status == "incomplete"
+            self._record_usage(run_id, run.usage, time.monotonic() - started_at, poll_count)
+            return run.usage.total_tokens
+        if run.status in ["requires_action"] and run.required_action.type == "submit_tool_outputs":
+            tool_call = run.required_action.submit_tool_outputs.tool_calls[0]
+            tool_call_id = tool_call.id
+            name = tool_call.function.name
+            arguments = tool_call.function.arguments
+            self._record_transcript(TOOL_CALL, arguments, run_id=run_id, tool_call={"id": tool_call_id, "name": name})
+            raise RequiresActionException(
+                f"Run requires action with status: {run.status}",
+                data=ActionData(
+                    run_id=run_id,
+                    tool_call_id=tool_call_id,
+                    name=name,
+                    arguments=json.loads(arguments),
+                    thread_id=self.thread_id,
+                ),
+            )
+        if run.status in ["requires_action"]:
+            raise RunFailedError(
+                run_id, run.status, message=f"Run requires unsupported action: {run.required_action.type}"
+            )
+        if run.status in TERMINAL_RUN_STATUSES:
+            raise RunFailedError(run_id, run.status, run.last_error)
+        return None
+
+    @staticmethod
+    def _hit_token_limit(run) -> bool:
+        return (
+            run.status == "incomplete"
+            and run.incomplete_details is not None
+            and run.incomplete_details.reason in TOKEN_LIMIT_REASONS
+        )
+
+    def _cancel_run(self, run_id: str, *, step: float = 0.25):
+        """
+        Cancels a run that outlived its deadline and waits for it to stop, since a
+        thread with an active run rejects new messages. The run may still
+        complete before the cancel lands.
+        """
+        from openai import APIError
+
+        try:
+            self.client.runs_cancel(run_id, self.thread_id)
+        except APIError as e:
+            logger.warning(f"Could not cancel run {run_id}: {e}")
+
+        for _ in range(max(1, int(CANCEL_TIMEOUT_IN_SECONDS / step))):
+            run = self.client.runs_retrieve(run_id, self.thread_id)
+            if run.status in TERMINAL_RUN_STATUSES:
+                return run
             time.sleep(step)
 
-        raise RuntimeError(f"Run timed out after {timeout_in_seconds} seconds")
+        logger.warning(f"Run {run_id} still {run.status} {CANCEL_TIMEOUT_IN_SECONDS} seconds after cancelling")
+        return run
+
+    def _record_usage(self, run_id: str, usage, duration_in_seconds: float, poll_count: int):
+        self.last_run_usage = RunUsage(
+            assistant_id=self.assistant_id,
+            thread_id=self.thread_id,
+            run_id=run_id,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+            duration_in_seconds=round(duration_in_seconds, 4),
+            poll_count=poll_count,
+            last_messages=self.last_run_options.last_messages,
+            max_prompt_tokens=self.last_run_options.max_prompt_tokens,
+            max_completion_tokens=self.last_run_options.max_completion_tokens,
+        )
+
+        if self.usage_ledger:
+            self.usage_ledger.record(self.last_run_usage)
 
     def last_message(self) -> str:
         message_content = self._get_messages()[0].content[0]
@@ -91,19 +389,46 @@ class Chat:
             raise RuntimeError("No text content found in the messages")
 
         annotations: list[Annotation] = [
-            Annotation(file_id=annotation.file_citation.file_id, text=annotation.text)
+            Annotation(
+                file_id=annotation.file_citation.file_id,
+                text=annotation.text,
+                start_index=annotation.start_index,
+                end_index=annotation.end_index,
+            )
             for annotation in message_content.text.annotations
         ]
-        file_names = [self.client.files_get(annotation.file_id).filename for annotation in annotations]
 
-        text_with_annotations = message_content.text.value
-        for index, annotation in enumerate(annotations):
-            text_with_annotations = text_with_annotations.replace(annotation.text, f"[*{index + 1}]")
+        text_with_annotations, file_ids = render_annotations(message_content.text.value, annotations)
+        file_names = [self._file_name(file_id) for file_id in file_ids]
 
         return MessageWithAnnotations(message=text_with_annotations, annotation_files=file_names)
 
+    def _file_name(self, file_id: str) -> str:
+        if file_id not in self._file_names:
+            file = shared_flights.do((self.client, "files_get", file_id), self.client.files_get, file_id)
+            self._file_names[file_id] = file.filename
+        return self._file_names[file_id]
+
     def _get_messages(self):
-        return self.client.messages_list(self.thread_id).data
+        """
+        Fetches only the newest message, scoped to the last run when there is one.
+        """
+        return self.client.messages_list(self.thread_id, limit=1, order="desc", run_id=self.last_run_id).data
+
+    def new_messages(self, *, page_size: int = 20) -> list:
+        """
+        Returns the thread's messages added since the previous call, oldest first,
+        advancing `history_cursor` so each call only downloads what is new.
+        """
+        messages = []
+
+        while True:
+            page = self.client.messages_list(self.thread_id, limit=page_size, order="asc", after=self.history_cursor)
+            messages.extend(page.data)
+            if page.data:
+                self.history_cursor = page.data[-1].id
+            if not page.has_more:
+                return messages
 
     def remove_tool_call_from_message(self, message: str) -> str:
         return message.replace(TOOL_CALL_PREFIX, "", 1) if self.should_force_tool_call(message) else message
@@ -118,6 +443,29 @@ class ActionData:
     tool_call_id: str
     name: str
     arguments: dict
+    thread_id: str | None = None
+
+
+class RunFailedError(RuntimeError):
+    """
+    The run ended without completing; `last_error` is the API's explanation,
+    when it gave one.
+    """
+
+    def __init__(self, run_id: str, status: str, last_error=None, *, message: str | None = None):
+        message = message or f"Run failed with status: {status}"
+        if last_error:
+            message = f"{message} ({last_error.code}: {last_error.message})"
+        super().__init__(message)
+        self.run_id = run_id
+        self.status = status
+        self.last_error = last_error
+
+
+class RunTimeoutError(RunFailedError):
+    def __init__(self, run_id: str, status: str, last_error=None, *, timeout_in_seconds: float):
+        super().__init__(run_id, status, last_error, message=f"Run timed out after {timeout_in_seconds:.0f} seconds")
+        self.timeout_in_seconds = timeout_in_seconds
 
 
 class RequiresActionException(Exception):
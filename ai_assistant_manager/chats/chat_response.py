@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from ..usage.usage_ledger import RunUsage
 
 
 @dataclass
@@ -6,6 +8,9 @@ class ChatResponse:
     message: str
     annotation_files: list[str]
     token_count: int
+    usage: RunUsage | None = field(default=None, compare=False)
+    cached: bool = field(default=False, compare=False)
+    incomplete: bool = False
 
 
 @dataclass
@@ -18,3 +23,37 @@ class MessageWithAnnotations:
 class Annotation:
     text: str
     file_id: str
+    start_index: int | None = None
+    end_index: int | None = None
+
+
+def render_annotations(text: str, annotations: list[Annotation]) -> tuple[str, list[str]]:
+    """
+    Replaces each annotation with a `[*n]` marker in one pass over `text`, using
+    the API's offsets (or the next occurrence when they are missing). Citations
+    of the same file share a number; returns the text and the cited file ids in
+    citation order.
+    """
+    spans = []
+    position = 0
+    for annotation in sorted(annotations, key=lambda annotation: annotation.start_index or 0):
+        start, end = annotation.start_index, annotation.end_index
+        if start is None or end is None or text[start:end] != annotation.text:
+            start = text.find(annotation.text, position)
+            end = start + len(annotation.text)
+        if start < position:
+            continue
+        spans.append((start, end, annotation.file_id))
+        position = end
+
+    parts = []
+    file_numbers: dict[str, int] = {}
+    position = 0
+    for start, end, file_id in spans:
+        number = file_numbers.setdefault(file_id, len(file_numbers) + 1)
+        parts.append(text[position:start])
+        parts.append(f"[*{number}]")
+        position = end
+    parts.append(text[position:])
+
+    return "".join(parts), list(file_numbers)
@@ -0,0 +1,38 @@
+from .chat_response import Annotation, render_annotations
+
+MARKER = "【4:0†source】"
+
+
+def annotation_at(text: str, occurrence: int, file_id: str) -> Annotation:
+    start = -1
+    for _ in range(occurrence + 1):
+        start = text.index(MARKER, start + 1)
+    return Annotation(text=MARKER, file_id=file_id, start_index=start, end_index=start + len(MARKER))
+
+
+def test_render_annotations_uses_offsets_and_dedupes_files():
+    text = f"One{MARKER} two{MARKER} three{MARKER}."
+    annotations = [annotation_at(text, 2, "file_a"), annotation_at(text, 0, "file_a"), annotation_at(text, 1, "file_b")]
+
+    message, file_ids = render_annotations(text, annotations)
+
+    assert message == "One[*1] two[*2] three[*1]."
+    assert file_ids == ["file_a", "file_b"]
+
+
+def test_render_annotations_without_offsets_uses_next_occurrence():
+    text = f"A{MARKER} B{MARKER}"
+    annotations = [Annotation(text=MARKER, file_id="file_a"), Annotation(text=MARKER, file_id="file_b")]
+
+    assert render_annotations(text, annotations) == ("A[*1] B[*2]", ["file_a", "file_b"])
+
+
+def test_render_annotations_skips_overlapping_and_stale_offsets():
+    text = f"A{MARKER}"
+    annotations = [
+        Annotation(text=MARKER, file_id="file_a", start_index=1, end_index=1 + len(MARKER)),
+        Annotation(text=MARKER, file_id="file_b", start_index=1, end_index=1 + len(MARKER)),
+    ]
+
+    assert render_annotations(text, annotations) == ("A[*1]", ["file_a"])
+    assert render_annotations("No citations", []) == ("No citations", [])
@@ -8,7 +8,11 @@ from openai.types.beta.threads.text_content_block import TextContentBlock
 
 from ai_assistant_manager.chats.chat_response import MessageWithAnnotations
 
-from .chat import ActionData, Chat, RequiresActionException
+from ..clients.openai_api import OpenAIClient
+from ..fake_api.fake_api_config import FakeApiConfig, constant
+from ..fake_api.fake_api_server import FakeOpenAIServer
+from ..usage.usage_ledger import RunUsage, UsageLedger
+from .chat import ActionData, Chat, RequiresActionException, RunFailedError, RunTimeoutError
 from .chat_response import ChatResponse
 
 
@@ -64,15 +68,27 @@ class TestChat(TestCase):
         self.mock_client.messages_list.return_value.data = [{"content": "Hello"}]
         self.chat.thread_id = "thread_id"
         self.chat.run_thread = MagicMock(return_value=10)
-        self.chat.last_message = MagicMock(return_value="Hello")
+        self.chat.last_message_with_annotations = MagicMock(
+            return_value=MessageWithAnnotations(message="Hello", annotation_files=["A File Name"])
+        )
         self.mock_client.runs_retrieve.return_value = MagicMock(status="completed", usage=MagicMock(total_tokens=10))
         result = self.chat.submit_tool_outputs("run_id", "tool_call_id", "response")
 
-        assert result == ChatResponse(message="Hello", annotation_files=[], token_count=10)
+        assert result == ChatResponse(message="Hello", annotation_files=["A File Name"], token_count=10)
         self.mock_client.submit_tool_outputs_to_run.assert_called_once_with(
             "run_id", "tool_call_id", "thread_id", "response"
         )
-        self.chat.last_message.assert_called_once()
+        self.chat.last_message_with_annotations.assert_called_once()
+
+    def test_submit_tool_outputs_failure_forgets_run_start(self):
+        self.chat.thread_id = "thread_id"
+        self.mock_client.submit_tool_outputs_to_run.side_effect = RuntimeError("Run is not waiting for outputs")
+
+        with pytest.raises(RuntimeError, match="not waiting"):
+            self.chat.submit_tool_outputs("run_id", "tool_call_id", "response")
+
+        # pylint: disable=protected-access
+        assert self.chat._run_started_at == {}
 
     def test_chat_run_thread(self):
         self.mock_client.runs_create.return_value.id = "run_id"
@@ -81,7 +97,8 @@ class TestChat(TestCase):
         with patch.object(self.chat, "_wait_for_run_to_complete") as mock_wait_for_run_to_complete:
             self.chat.run_thread(False)
 
-        mock_wait_for_run_to_complete.assert_called_once_with("run_id")
+        self.mock_client.runs_create.assert_called_once_with(self.assistant_id, "thread_id", False, poll=False)
+        mock_wait_for_run_to_complete.assert_called_once_with("run_id", deadline=None)
 
     def test_chat_run_thread_with_tool_call(self):
         arguments = '{"arguments": "arguments"}'
@@ -104,7 +121,11 @@ class TestChat(TestCase):
             self.chat.run_thread()
 
         assert action_exception.value.data == ActionData(
-            run_id="run_id", tool_call_id="tool_call_id", name="Grogu", arguments=json.loads(arguments)
+            run_id="run_id",
+            tool_call_id="tool_call_id",
+            name="Grogu",
+            arguments=json.loads(arguments),
+            thread_id="thread_id",
         )
 
     def test_wait_for_run_to_complete_success(self):
@@ -119,6 +140,26 @@ class TestChat(TestCase):
             self.chat.thread_id,
         )
 
+    def test_wait_for_run_to_complete_records_usage(self):
+        ledger = UsageLedger()
+        self.chat = Chat(self.mock_client, self.assistant_id, thread_id="thread_id", usage_ledger=ledger)
+        self.mock_client.runs_retrieve.side_effect = [
+            MagicMock(status="in_progress"),
+            MagicMock(status="completed", usage=MagicMock(prompt_tokens=7, completion_tokens=3, total_tokens=10)),
+        ]
+
+        with patch("time.sleep", return_value=None):
+            # pylint: disable=protected-access
+            tokens = self.chat._wait_for_run_to_complete("run_id")
+
+        assert tokens == 10
+        usage = self.chat.last_run_usage
+        assert isinstance(usage, RunUsage)
+        assert (usage.assistant_id, usage.thread_id, usage.run_id) == (self.assistant_id, "thread_id", "run_id")
+        assert (usage.prompt_tokens, usage.completion_tokens, usage.total_tokens) == (7, 3, 10)
+        assert usage.poll_count == 2
+        assert ledger.runs == [usage]
+
     def test_wait_for_run_to_complete_failure(self):
         self.mock_client.runs_retrieve.return_value.status = "failed"
 
@@ -136,7 +177,7 @@ class TestChat(TestCase):
         self.mock_client.runs_retrieve.return_value.status = "running"
 
         with patch("time.sleep", return_value=None):
-            with pytest.raises(RuntimeError, match="Run timed out after 1 seconds"):
+            with pytest.raises(RunTimeoutError, match="Run timed out after 1 seconds"):
                 # pylint: disable=protected-access
                 self.chat._wait_for_run_to_complete("run_id", timeout_in_seconds=1)
 
@@ -144,6 +185,70 @@ class TestChat(TestCase):
             "run_id",
             self.chat.thread_id,
         )
+        self.mock_client.runs_cancel.assert_called_once_with("run_id", self.chat.thread_id)
+
+    def test_wait_for_run_to_complete_settles_run_completed_while_cancelling(self):
+        self.mock_client.runs_retrieve.return_value = MagicMock(
+            status="completed", usage=MagicMock(prompt_tokens=7, completion_tokens=3, total_tokens=10)
+        )
+
+        # pylint: disable=protected-access
+        tokens = self.chat._wait_for_run_to_complete("run_id", step=60, timeout_in_seconds=0)
+
+        assert tokens == 10
+        assert self.chat.last_run_usage.total_tokens == 10
+        self.mock_client.runs_cancel.assert_called_once_with("run_id", self.chat.thread_id)
+
+    def test_cancel_run_polls_once_when_step_exceeds_cancel_timeout(self):
+        self.mock_client.runs_retrieve.return_value = MagicMock(status="cancelling")
+
+        with patch("time.sleep", return_value=None):
+            # pylint: disable=protected-access
+            run = self.chat._cancel_run("run_id", step=60)
+
+        assert run.status == "cancelling"
+        self.mock_client.runs_retrieve.assert_called_once_with("run_id", self.chat.thread_id)
+
+    def test_wait_for_run_to_complete_unsupported_action(self):
+        self.mock_client.runs_retrieve.return_value = MagicMock(
+            status="requires_action", required_action=MagicMock(type="unknown_action")
+        )
+
+        with pytest.raises(RunFailedError, match="Run requires unsupported action: unknown_action"):
+            # pylint: disable=protected-access
+            self.chat._wait_for_run_to_complete("run_id")
+
+        self.mock_client.runs_cancel.assert_not_called()
+
+    def test_wait_for_run_to_complete_returns_run_cut_short_by_token_limit(self):
+        self.mock_client.runs_retrieve.return_value = MagicMock(
+            status="incomplete", incomplete_details=MagicMock(reason="max_completion_tokens")
+        )
+        self.mock_client.runs_retrieve.return_value.usage.total_tokens = 10
+
+        # pylint: disable=protected-access
+        assert self.chat._wait_for_run_to_complete("run_id") == 10
+        assert self.chat.last_run_incomplete
+
+    def test_wait_for_run_to_complete_incomplete_for_other_reasons_fails(self):
+        self.mock_client.runs_retrieve.return_value = MagicMock(
+            status="incomplete", incomplete_details=MagicMock(reason="content_filter"), last_error=None
+        )
+
+        with pytest.raises(RunFailedError, match="Run failed with status: incomplete"):
+            # pylint: disable=protected-access
+            self.chat._wait_for_run_to_complete("run_id")
+
+    def test_wait_for_run_to_complete_failure_carries_last_error(self):
+        last_error = MagicMock(code="server_error", message="boom")
+        self.mock_client.runs_retrieve.return_value = MagicMock(status="failed", last_error=last_error)
+
+        with pytest.raises(RunFailedError, match="server_error: boom") as error:
+            # pylint: disable=protected-access
+            self.chat._wait_for_run_to_complete("run_id")
+
+        assert error.value.last_error == last_error
+        assert error.value.status == "failed"
 
     def test_last_message(self):
         self.mock_client.messages_list.return_value.data = [
@@ -154,7 +259,31 @@ class TestChat(TestCase):
         result = self.chat.last_message()
 
         assert result == "Hello"
-        self.mock_client.messages_list.assert_called_once_with("thread_id")
+        self.mock_client.messages_list.assert_called_once_with("thread_id", limit=1, order="desc", run_id=None)
+
+    def test_last_message_is_scoped_to_last_run(self):
+        self.mock_client.messages_list.return_value.data = [
+            MagicMock(content=[MagicMock(text=MagicMock(value="Hello"))])
+        ]
+        self.chat.thread_id = "thread_id"
+        self.chat.last_run_id = "run_id"
+
+        self.chat.last_message()
+
+        self.mock_client.messages_list.assert_called_once_with("thread_id", limit=1, order="desc", run_id="run_id")
+
+    def test_new_messages_pages_from_cursor(self):
+        self.chat.thread_id = "thread_id"
+        self.mock_client.messages_list.side_effect = [
+            MagicMock(data=[MagicMock(id="msg_1"), MagicMock(id="msg_2")], has_more=True),
+            MagicMock(data=[MagicMock(id="msg_3")], has_more=False),
+            MagicMock(data=[], has_more=False),
+        ]
+
+        assert [message.id for message in self.chat.new_messages(page_size=2)] == ["msg_1", "msg_2", "msg_3"]
+        assert self.chat.new_messages(page_size=2) == []
+        assert self.chat.history_cursor == "msg_3"
+        self.mock_client.messages_list.assert_called_with("thread_id", limit=2, order="asc", after="msg_3")
 
     def test_last_message_with_text_content(self):
         self.chat._get_messages = MagicMock(
@@ -181,7 +310,11 @@ class TestChat(TestCase):
                     content=[
                         MagicMock(
                             text=MagicMock(
-                                annotations=[MagicMock(text="【4:0†source】", file_citation=file_citation)],
+                                annotations=[
+                                    MagicMock(
+                                        text="【4:0†source】", file_citation=file_citation, start_index=13, end_index=25
+                                    )
+                                ],
                                 value="Hello, world!【4:0†source】",
                             ),
                             type="text",
@@ -195,6 +328,9 @@ class TestChat(TestCase):
         assert result.message == "Hello, world![*1]"
         assert result.annotation_files == ["A File Name"]
 
+        self.chat.last_message_with_annotations()
+        self.mock_client.files_get.assert_called_once_with("a_file_id")
+
     def test_last_message_with_annotations_with_no_text_content(self):
         not_text = MagicMock()
         delattr(not_text, "text")
@@ -209,3 +345,20 @@ class TestChat(TestCase):
     def test_should_force_tool_call(self):
         assert self.chat.should_force_tool_call("tc!")
         assert not self.chat.should_force_tool_call(" tc!")
+
+
+def test_send_user_message_cancels_run_after_deadline():
+    with FakeOpenAIServer(FakeApiConfig(run_duration=constant(60), seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = client.assistants_create("Deadline", "prompt", []).id
+        chat = Chat(client, assistant_id)
+        chat.start()
+
+        with pytest.raises(RunTimeoutError) as error:
+            chat.send_user_message("Are you there?", timeout_in_seconds=0.5)
+
+        assert server.state.runs[error.value.run_id]["status"] == "cancelled"
+        assert error.value.status == "cancelled"
+
+        server.state.config.run_duration = constant(0.0)
+        assert chat.send_user_message("Are you there now?").message
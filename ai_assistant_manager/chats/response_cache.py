@@ -0,0 +1,148 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, replace
+
+from .chat_response import ChatResponse
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    return WHITESPACE_PATTERN.sub(" ", question.casefold()).strip().rstrip("?!. ")
+
+
+def config_hash(**config) -> str:
+    """
+    Hashes whatever determines an assistant's answers (prompt, model, tools,
+    vector store ids, ...), so cached responses stop matching once it changes.
+    """
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class ResponseCache:
+    """
+    Exact-match cache of single-turn answers keyed on assistant id, config hash
+    and normalized question. Entries are evicted least-recently-used beyond
+    `max_entries` and expire after `ttl_in_seconds`. With `file_path`, entries
+    are also written to a SQLite file and survive restarts.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl_in_seconds: float = 60 * 60,
+        file_path: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.ttl_in_seconds = ttl_in_seconds
+        self.clock = clock
+        self.stats = Counter()
+        self._entries: OrderedDict[str, tuple[str, float, ChatResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = self._open(file_path) if file_path else None
+
+    def get(self, assistant_id: str, question: str, *, config_hash: str = "") -> ChatResponse | None:
+        key = self._key(assistant_id, question, config_hash)
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.get(key) or self._load(key)
+            if entry and entry[1] > now:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self._evict()
+                self.stats["hits"] += 1
+                return replace(entry[2], annotation_files=list(entry[2].annotation_files))
+
+            if entry:
+                self._delete(key)
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, assistant_id: str, question: str, response: ChatResponse, *, config_hash: str = ""):
+        key = self._key(assistant_id, question, config_hash)
+        cached = ChatResponse(
+            message=response.message,
+            annotation_files=list(response.annotation_files),
+            token_count=response.token_count,
+            cached=True,
+        )
+        entry = (assistant_id, self.clock() + self.ttl_in_seconds, cached)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            if self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (key, assistant_id, entry[1], json.dumps(asdict(cached))),
+                )
+                self._db.commit()
+
+    def invalidate(self, assistant_id: str | None = None):
+        """
+        Drops every entry for `assistant_id`, or the whole cache when None.
+        """
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if assistant_id in (None, entry[0])]:
+                del self._entries[key]
+            if self._db:
+                if assistant_id is None:
+                    self._db.execute("DELETE FROM responses")
+                else:
+                    self._db.execute("DELETE FROM responses WHERE assistant_id = ?", (assistant_id,))
+                self._db.commit()
+            self.stats["invalidations"] += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def close(self):
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def _key(self, assistant_id: str, question: str, config_hash: str) -> str:
+        raw_key = json.dumps([assistant_id, config_hash, normalize_question(question)])
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _open(self, file_path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(file_path, check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, assistant_id TEXT, expires_at REAL, response TEXT)"
+        )
+        db.execute("DELETE FROM responses WHERE expires_at <= ?", (self.clock(),))
+        db.commit()
+        return db
+
+    def _load(self, key: str) -> tuple[str, float, ChatResponse] | None:
+        if not self._db:
+            return None
+        row = self._db.execute(
+            "SELECT assistant_id, expires_at, response FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        return row[0], row[1], ChatResponse(**json.loads(row[2]))
+
+    def _delete(self, key: str):
+        self._entries.pop(key, None)
+        if self._db:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
@@ -0,0 +1,210 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..assistants.assistant_service import AssistantService
+from .chat import ActionData, Chat, RequiresActionException
+from .chat_response import ChatResponse
+from .response_cache import ResponseCache, config_hash, normalize_question
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_response(message: str = "answer") -> ChatResponse:
+    return ChatResponse(message=message, annotation_files=["doc.txt"], token_count=10)
+
+
+def test_normalize_question():
+    assert normalize_question("  What   is\tRAG? ") == "what is rag"
+    assert normalize_question("what is rag") == normalize_question("What is RAG?!")
+
+
+def test_config_hash_changes_with_config():
+    assert config_hash(prompt="a", model="m") == config_hash(model="m", prompt="a")
+    assert config_hash(prompt="a") != config_hash(prompt="b")
+
+
+def test_get_returns_cached_copy_for_normalized_question():
+    cache = ResponseCache()
+    cache.put("asst_id", "What is RAG?", build_response())
+
+    cached = cache.get("asst_id", "what is  rag")
+
+    assert cached == build_response()
+    assert cached.cached
+    assert cache.get("other_id", "what is rag") is None
+    assert cache.get("asst_id", "what is rag", config_hash="changed") is None
+    assert cache.stats == {"hits": 1, "misses": 2}
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl_in_seconds=60, clock=clock)
+    cache.put("asst_id", "question", build_response())
+
+    clock.now = 61
+
+    assert cache.get("asst_id", "question") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("asst_id", "first", build_response("1"))
+    cache.put("asst_id", "second", build_response("2"))
+    cache.get("asst_id", "first")
+
+    cache.put("asst_id", "third", build_response("3"))
+
+    assert cache.get("asst_id", "second") is None
+    assert cache.get("asst_id", "first").message == "1"
+    assert cache.stats["evictions"] == 1
+
+
+def test_invalidate_drops_only_that_assistant():
+    cache = ResponseCache()
+    cache.put("asst_1", "question", build_response())
+    cache.put("asst_2", "question", build_response())
+
+    cache.invalidate("asst_1")
+
+    assert cache.get("asst_1", "question") is None
+    assert cache.get("asst_2", "question") is not None
+
+
+def test_file_backed_cache_survives_restart(tmp_path):
+    file_path = str(tmp_path / "responses.db")
+    cache = ResponseCache(file_path=file_path)
+    cache.put("asst_id", "question", build_response())
+    cache.close()
+
+    reopened = ResponseCache(file_path=file_path)
+
+    assert reopened.get("asst_id", "question") == build_response()
+
+    reopened.invalidate("asst_id")
+    reopened.close()
+
+    assert ResponseCache(file_path=file_path).get("asst_id", "question") is None
+
+
+def test_ask_serves_repeats_without_api_calls():
+    cache = ResponseCache()
+    chat = Chat(MagicMock(), "asst_id", thread_id="thread_id", response_cache=cache)
+    chat.send_user_message = MagicMock(return_value=build_response())
+
+    first = chat.ask("What is RAG?")
+    second = chat.ask("what is rag")
+
+    chat.send_user_message.assert_called_once_with("What is RAG?")
+    assert not first.cached
+    assert second.cached
+
+
+def test_ask_misses_run_on_a_throwaway_thread():
+    client = MagicMock()
+    client.threads_create.return_value.id = "fresh_thread_id"
+    chat = Chat(client, "asst_id", thread_id="thread_id", response_cache=ResponseCache())
+    threads_used = []
+    chat.send_user_message = MagicMock(side_effect=lambda _: threads_used.append(chat.thread_id) or build_response())
+
+    chat.ask("What is RAG?")
+
+    assert threads_used == ["fresh_thread_id"]
+    assert chat.thread_id == "thread_id"
+    client.threads_delete.assert_called_once_with("fresh_thread_id")
+
+
+def test_ask_keeps_throwaway_thread_until_tool_outputs_are_submitted():
+    client = MagicMock()
+    client.threads_create.return_value.id = "fresh_thread_id"
+    chat = Chat(client, "asst_id", thread_id="thread_id", response_cache=ResponseCache())
+
+    def request_action(_):
+        chat.last_run_id = "run_id"
+        data = ActionData("run_id", "call_id", "get_weather", {}, thread_id=chat.thread_id)
+        raise RequiresActionException("action", data=data)
+
+    chat.send_user_message = MagicMock(side_effect=request_action)
+
+    with pytest.raises(RequiresActionException) as action:
+        chat.ask("What is the weather?")
+
+    assert action.value.data.thread_id == "fresh_thread_id"
+    assert (chat.thread_id, chat.last_run_id) == ("thread_id", None)
+    client.threads_delete.assert_not_called()
+
+    threads_used = []
+    chat._submit_tool_outputs = MagicMock(  # pylint: disable=protected-access
+        side_effect=lambda *_: threads_used.append(chat.thread_id) or build_response()
+    )
+    chat.submit_tool_outputs("run_id", "call_id", "Rainy", thread_id="fresh_thread_id")
+
+    assert threads_used == ["fresh_thread_id"]
+    assert chat.thread_id == "thread_id"
+    client.threads_delete.assert_called_once_with("fresh_thread_id")
+
+
+def test_ask_sends_tool_calls_on_a_throwaway_thread():
+    client = MagicMock()
+    client.threads_create.return_value.id = "fresh_thread_id"
+    chat = Chat(client, "asst_id", thread_id="thread_id")
+    threads_used = []
+    chat.send_user_message = MagicMock(side_effect=lambda _: threads_used.append(chat.thread_id) or build_response())
+
+    chat.ask("tc!weather")
+
+    assert threads_used == ["fresh_thread_id"]
+
+
+def test_cache_hits_are_copies():
+    cache = ResponseCache()
+    cache.put("asst_id", "question", build_response())
+
+    cache.get("asst_id", "question").annotation_files.append("other.txt")
+
+    assert cache.get("asst_id", "question").annotation_files == ["doc.txt"]
+
+
+def test_ask_does_not_cache_tool_calls():
+    chat = Chat(MagicMock(), "asst_id", thread_id="thread_id", response_cache=ResponseCache())
+    chat.send_user_message = MagicMock(return_value=build_response())
+
+    chat.ask("tc!weather")
+    chat.ask("tc!weather")
+
+    assert chat.send_user_message.call_count == 2
+
+
+def test_ask_does_not_cache_incomplete_answers():
+    chat = Chat(MagicMock(), "asst_id", thread_id="thread_id", response_cache=ResponseCache())
+    chat.send_user_message = MagicMock(
+        return_value=ChatResponse(message="partial", annotation_files=[], token_count=5, incomplete=True)
+    )
+
+    chat.ask("What is RAG?")
+    chat.ask("What is RAG?")
+
+    assert chat.send_user_message.call_count == 2
+
+
+def test_recreating_vector_stores_invalidates_assistant_responses():
+    client = MagicMock()
+    assistant = MagicMock(id="asst_id")
+    assistant.name = "Cached"
+    client.assistants_list.return_value = [assistant]
+    client.vector_stores_create.return_value = "vs_id"
+    client.vector_stores_files.return_value = []
+    cache = ResponseCache()
+    cache.put("asst_id", "question", build_response())
+    service = AssistantService(client, assistant_name="Cached", response_cache=cache)
+
+    service.create_vector_stores(file_ids=["file_id"])
+
+    assert cache.get("asst_id", "question") is None
@@ -0,0 +1,211 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Self
+
+from loguru import logger
+
+from ..clients.openai_api import OpenAIClient
+from ..clients.resilience import is_transient
+
+RESOLVED_RUN_STATUSES = {"completed", "requires_action", "failed", "expired", "cancelled", "incomplete"}
+
+
+@dataclass(frozen=True)
+class RunOutcome:
+    run: object
+    poll_count: int
+
+
+@dataclass
+class _WatchedRun:
+    run_id: str
+    thread_id: str
+    future: Future
+    interval_in_seconds: float
+    poll_count: int = 0
+
+
+class RunMonitor:
+    """
+    Polls the in-flight runs of every chat from one scheduler thread, instead of
+    one sleeping thread per chat. Polls are spaced to stay within
+    `requests_per_second` overall and handed to a pool of up to
+    `max_concurrent_polls` requests, so throughput is not capped at one poll
+    per round trip; each run starts at `min_interval_in_seconds` and backs off
+    towards `max_interval_in_seconds` while it keeps running. `watch` returns a
+    future that resolves with a RunOutcome once the run completes, fails or
+    requires action, or with the error that polling it raised.
+    """
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        *,
+        requests_per_second: float = 20.0,
+        min_interval_in_seconds: float = 0.25,
+        max_interval_in_seconds: float = 4.0,
+        backoff: float = 1.5,
+        max_concurrent_polls: int = 4,
+    ):
+        self.client = client
+        self.requests_per_second = requests_per_second
+        self.min_interval_in_seconds = min_interval_in_seconds
+        self.max_interval_in_seconds = max_interval_in_seconds
+        self.backoff = backoff
+        self.stats = Counter()
+        self._runs: dict[str, _WatchedRun] = {}
+        self._schedule: list[tuple[float, int, _WatchedRun]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._next_poll_at = 0.0
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._poll_slots = threading.Semaphore(max_concurrent_polls)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_polls, thread_name_prefix="run-monitor-poll")
+
+    def watch(
+        self, run_id: str, thread_id: str, *, callback: Callable[[Future], None] | None = None
+    ) -> "Future[RunOutcome]":
+        future = Future()
+        if callback:
+            future.add_done_callback(callback)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("RunMonitor is closed")
+            watched = self._runs[run_id] = _WatchedRun(run_id, thread_id, future, self.min_interval_in_seconds)
+            self._push(watched, time.monotonic())
+            self._ensure_started()
+            self._condition.notify()
+
+        return future
+
+    def forget(self, run_id: str):
+        """
+        Stops polling a run whose caller gave up on it.
+        """
+        with self._condition:
+            watched = self._runs.pop(run_id, None)
+        if watched:
+            watched.future.cancel()
+
+    def in_flight(self) -> int:
+        with self._condition:
+            return len(self._runs)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            watched_runs = list(self._runs.values())
+            self._runs.clear()
+            self._condition.notify()
+
+        if self._thread:
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+        for watched in watched_runs:
+            watched.future.cancel()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _ensure_started(self):
+        if not self._thread or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="run-monitor", daemon=True)
+            self._thread.start()
+
+    def _push(self, watched: _WatchedRun, poll_at: float):
+        heapq.heappush(self._schedule, (poll_at, next(self._sequence), watched))
+
+    def _run(self):
+        while watched := self._next_due():
+            self._poll_slots.acquire()
+            poll = self._executor.submit(self._poll, watched)
+            poll.add_done_callback(partial(self._polled, watched))
+
+    def _polled(self, watched: _WatchedRun, poll: Future):
+        self._poll_slots.release()
+        if error := poll.exception():
+            logger.warning(f"Polling run {watched.run_id} failed: {error!r}")
+            self._resolve(watched, error=error)
+
+    def _next_due(self) -> _WatchedRun | None:
+        with self._condition:
+            while not self._closed:
+                if not self._schedule:
+                    self._condition.wait()
+                    continue
+
+                poll_at, _, watched = self._schedule[0]
+                if self._runs.get(watched.run_id) is not watched:
+                    heapq.heappop(self._schedule)
+                    continue
+
+                now = time.monotonic()
+                ready_at = max(poll_at, self._next_poll_at)
+                if ready_at > now:
+                    self._condition.wait(ready_at - now)
+                    continue
+
+                heapq.heappop(self._schedule)
+                self._next_poll_at = now + 1 / self.requests_per_second
+                return watched
+            return None
+
+    def _poll(self, watched: _WatchedRun):
+        """
+        Transient API errors only reschedule the poll; any other error fails the
+        watched run's future.
+        """
+        from openai import APIError
+
+        try:
+            run = self.client.runs_retrieve(watched.run_id, watched.thread_id)
+        except APIError as e:
+            if not is_transient(e):
+                raise
+            logger.warning(f"Polling run {watched.run_id} failed: {e}")
+            self.stats["poll_errors"] += 1
+            self._reschedule(watched)
+            return
+
+        watched.poll_count += 1
+        self.stats["polls"] += 1
+
+        if run.status in RESOLVED_RUN_STATUSES:
+            self._resolve(watched, outcome=RunOutcome(run=run, poll_count=watched.poll_count))
+            return
+
+        self._reschedule(watched)
+
+    def _reschedule(self, watched: _WatchedRun):
+        with self._condition:
+            if self._runs.get(watched.run_id) is watched:
+                self._push(watched, time.monotonic() + watched.interval_in_seconds)
+                watched.interval_in_seconds = min(
+                    watched.interval_in_seconds * self.backoff, self.max_interval_in_seconds
+                )
+                self._condition.notify()
+
+    def _resolve(self, watched: _WatchedRun, *, outcome: RunOutcome | None = None, error: Exception | None = None):
+        with self._condition:
+            if self._runs.get(watched.run_id) is watched:
+                del self._runs[watched.run_id]
+
+        if not watched.future.set_running_or_notify_cancel():
+            return
+        self.stats["resolved"] += 1
+        if error:
+            watched.future.set_exception(error)
+        else:
+            watched.future.set_result(outcome)
@@ -0,0 +1,159 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from openai import APIConnectionError, NotFoundError
+
+from ..clients.openai_api import OpenAIClient
+from ..fake_api.fake_api_config import FakeApiConfig, constant
+from ..fake_api.fake_api_server import FakeOpenAIServer
+from .chat import Chat, RunTimeoutError
+from .run_monitor import RunMonitor
+
+
+def build_client(statuses: dict[str, list[str]]) -> MagicMock:
+    client = MagicMock()
+    remaining = {run_id: iter(run_statuses) for run_id, run_statuses in statuses.items()}
+    client.runs_retrieve.side_effect = lambda run_id, _thread_id: MagicMock(status=next(remaining[run_id]))
+    return client
+
+
+def test_watch_resolves_when_run_reaches_resolved_status():
+    client = build_client({"run_1": ["queued", "in_progress", "completed"], "run_2": ["requires_action"]})
+
+    with RunMonitor(client, min_interval_in_seconds=0.01, requests_per_second=1000) as monitor:
+        first = monitor.watch("run_1", "thread_1")
+        second = monitor.watch("run_2", "thread_2")
+
+        assert first.result(timeout=5).run.status == "completed"
+        assert first.result().poll_count == 3
+        assert second.result(timeout=5).run.status == "requires_action"
+        assert monitor.in_flight() == 0
+
+
+def test_callback_is_called_with_resolved_future():
+    client = build_client({"run_1": ["completed"]})
+    resolved = threading.Event()
+
+    with RunMonitor(client) as monitor:
+        monitor.watch("run_1", "thread_1", callback=lambda future: resolved.set())
+
+        assert resolved.wait(5)
+
+
+def test_polls_back_off_and_respect_global_budget():
+    client = build_client({f"run_{index}": ["in_progress"] * 100 for index in range(10)})
+
+    with RunMonitor(client, requests_per_second=50, min_interval_in_seconds=0.01) as monitor:
+        for index in range(10):
+            monitor.watch(f"run_{index}", "thread_id")
+        time.sleep(0.5)
+        polls = monitor.stats["polls"]
+
+    assert 10 <= polls <= 30
+
+
+def test_forget_cancels_future_and_stops_polling():
+    client = build_client({"run_1": ["in_progress"] * 100})
+
+    with RunMonitor(client, min_interval_in_seconds=0.01) as monitor:
+        future = monitor.watch("run_1", "thread_1")
+        monitor.forget("run_1")
+
+        assert future.cancelled()
+        assert monitor.in_flight() == 0
+
+
+def test_poll_errors_are_set_on_future():
+    client = MagicMock()
+    client.runs_retrieve.side_effect = NotFoundError("No run found", response=MagicMock(status_code=404), body=None)
+
+    with RunMonitor(client) as monitor, pytest.raises(NotFoundError, match="No run found"):
+        monitor.watch("run_1", "thread_1").result(timeout=5)
+
+
+def test_transient_poll_errors_are_retried():
+    client = MagicMock()
+    client.runs_retrieve.side_effect = [APIConnectionError(request=MagicMock()), MagicMock(status="completed")]
+
+    with RunMonitor(client, min_interval_in_seconds=0.01) as monitor:
+        outcome = monitor.watch("run_1", "thread_1").result(timeout=5)
+
+        assert outcome.run.status == "completed"
+        assert monitor.stats["poll_errors"] == 1
+
+
+def test_unexpected_poll_errors_fail_only_their_run():
+    client = build_client({"run_2": ["completed"]})
+    retrieve = client.runs_retrieve.side_effect
+    client.runs_retrieve.side_effect = lambda run_id, thread_id: (
+        (_ for _ in ()).throw(RuntimeError("Circuit open")) if run_id == "run_1" else retrieve(run_id, thread_id)
+    )
+
+    with RunMonitor(client) as monitor:
+        failed = monitor.watch("run_1", "thread_1")
+        with pytest.raises(RuntimeError, match="Circuit open"):
+            failed.result(timeout=5)
+
+        assert monitor.watch("run_2", "thread_2").result(timeout=5).run.status == "completed"
+
+
+def test_scheduler_thread_is_restarted_if_it_died():
+    client = build_client({"run_1": ["completed"]})
+
+    with RunMonitor(client) as monitor:
+        monitor._thread = threading.Thread(target=lambda: None)
+        monitor._thread.start()
+        monitor._thread.join()
+
+        assert monitor.watch("run_1", "thread_1").result(timeout=5).run.status == "completed"
+
+
+def test_polls_run_concurrently():
+    client = MagicMock()
+    client.runs_retrieve.side_effect = lambda *_: time.sleep(0.2) or MagicMock(status="completed")
+
+    with RunMonitor(client, requests_per_second=1000, max_concurrent_polls=4) as monitor:
+        started_at = time.monotonic()
+        futures = [monitor.watch(f"run_{index}", "thread_id") for index in range(4)]
+        assert all(future.result(timeout=5).run.status == "completed" for future in futures)
+
+    assert time.monotonic() - started_at < 0.6
+
+
+def test_chats_share_one_monitor():
+    with FakeOpenAIServer(FakeApiConfig(run_duration=constant(0.2), seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = client.assistants_create("Monitor", "prompt", []).id
+
+        with RunMonitor(client, min_interval_in_seconds=0.05) as monitor:
+
+            def converse(index: int) -> str:
+                chat = Chat(client, assistant_id, run_monitor=monitor)
+                chat.start()
+                return chat.send_user_message(f"Question {index}").message
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                messages = list(executor.map(converse, range(8)))
+
+            assert all(messages)
+            assert monitor.stats["resolved"] == 8
+            assert monitor.in_flight() == 0
+
+
+def test_monitored_run_is_cancelled_after_deadline():
+    with FakeOpenAIServer(FakeApiConfig(run_duration=constant(60), seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = client.assistants_create("Monitor", "prompt", []).id
+
+        with RunMonitor(client) as monitor:
+            chat = Chat(client, assistant_id, run_monitor=monitor)
+            chat.start()
+
+            with pytest.raises(RunTimeoutError):
+                chat.send_user_message("Are you there?", timeout_in_seconds=0.3)
+
+            assert server.state.runs[chat.last_run_id]["status"] == "cancelled"
+            assert monitor.in_flight() == 0
@@ -0,0 +1,35 @@
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """
+    Context controls for a run. `last_messages` sends only the newest messages
+    of the thread instead of letting the API truncate automatically, and the
+    token caps bound the prompt and completion of a single run, which bounds
+    the latency and cost of a turn however long the thread grows.
+    """
+
+    last_messages: int | None = None
+    max_prompt_tokens: int | None = None
+    max_completion_tokens: int | None = None
+
+    @classmethod
+    def last_turns(cls, turns: int, **options) -> "RunOptions":
+        """
+        Keeps the new message plus the previous `turns` user/assistant exchanges.
+        """
+        return cls(last_messages=turns * 2 + 1, **options)
+
+    def replace(self, **changes) -> "RunOptions":
+        return replace(self, **changes)
+
+    def to_request(self) -> dict:
+        request = {}
+        if self.last_messages:
+            request["truncation_strategy"] = {"type": "last_messages", "last_messages": self.last_messages}
+        if self.max_prompt_tokens:
+            request["max_prompt_tokens"] = self.max_prompt_tokens
+        if self.max_completion_tokens:
+            request["max_completion_tokens"] = self.max_completion_tokens
+        return request
@@ -0,0 +1,72 @@
+from ..clients.openai_api import OpenAIClient
+from ..fake_api.fake_api_config import FakeApiConfig
+from ..fake_api.fake_api_server import FakeOpenAIServer
+from ..usage.usage_ledger import UsageLedger
+from .chat import Chat
+from .run_options import RunOptions
+
+
+def test_default_options_send_nothing():
+    assert RunOptions().to_request() == {}
+
+
+def test_to_request():
+    options = RunOptions.last_turns(2, max_prompt_tokens=1000, max_completion_tokens=200)
+
+    assert options.to_request() == {
+        "truncation_strategy": {"type": "last_messages", "last_messages": 5},
+        "max_prompt_tokens": 1000,
+        "max_completion_tokens": 200,
+    }
+
+
+def run_conversation(run_options: RunOptions | None, turns: int = 6) -> UsageLedger:
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = client.assistants_create("Truncation", "prompt", []).id
+        ledger = UsageLedger()
+        chat = Chat(client, assistant_id, usage_ledger=ledger, run_options=run_options)
+        chat.start()
+
+        for turn in range(turns):
+            chat.send_user_message(f"Tell me more about topic number {turn}, in detail please.")
+
+        return ledger
+
+
+def test_last_turns_bounds_prompt_tokens_as_thread_grows():
+    untruncated = [run.prompt_tokens for run in run_conversation(None).runs]
+    truncated = run_conversation(RunOptions.last_turns(1)).runs
+
+    assert untruncated[-1] > untruncated[1]
+    assert [run.prompt_tokens for run in truncated][-1] == truncated[1].prompt_tokens
+    assert truncated[-1].last_messages == 3
+
+
+def test_send_user_message_overrides_chat_options():
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = client.assistants_create("Truncation", "prompt", []).id
+        chat = Chat(client, assistant_id, run_options=RunOptions(max_completion_tokens=500))
+        chat.start()
+
+        chat.send_user_message("Hello", run_options=RunOptions(max_completion_tokens=5))
+
+        assert server.state.runs[chat.last_run_id]["max_completion_tokens"] == 5
+        assert chat.last_run_usage.completion_tokens <= 5
+        assert chat.last_run_usage.max_completion_tokens == 5
+
+
+def test_run_stopped_by_completion_limit_returns_partial_answer():
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = client.assistants_create("Truncation", "prompt", []).id
+        chat = Chat(client, assistant_id)
+        chat.start()
+
+        response = chat.send_user_message("Hello", run_options=RunOptions(max_completion_tokens=5))
+        full = chat.send_user_message("Hello again")
+
+    assert response.incomplete
+    assert 0 < len(response.message) <= 20
+    assert not full.incomplete
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+from loguru import logger
+
+from ..clients.openai_api import OpenAIClient
+
+
+class PrewarmedThreadPool:
+    """
+    Keeps up to `size` empty threads created ahead of time so a new chat can
+    start without waiting on threads_create. When fewer than `low_watermark`
+    remain, a background refill tops the pool up again. Threads older than
+    `max_age_in_seconds` are not handed out; the refill deletes them.
+    """
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        *,
+        size: int = 5,
+        low_watermark: int = 2,
+        max_age_in_seconds: float = 24 * 60 * 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 <= low_watermark <= size:
+            raise ValueError(f"low_watermark must be between 0 and size ({size}), got {low_watermark}")
+
+        self.client = client
+        self.size = size
+        self.low_watermark = low_watermark
+        self.max_age_in_seconds = max_age_in_seconds
+        self.clock = clock
+        self._threads: deque[tuple[str, float]] = deque()
+        self._expired: list[str] = []
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._refill_thread: threading.Thread | None = None
+        self._closed = False
+
+    def start(self) -> "PrewarmedThreadPool":
+        self._schedule_refill()
+        return self
+
+    def acquire(self) -> str:
+        """
+        Returns a pre-created thread id, or creates one inline when the pool is
+        empty.
+        """
+        thread_id = self._take()
+
+        if len(self) < self.low_watermark or self._expired:
+            self._schedule_refill()
+
+        if thread_id:
+            return thread_id
+
+        logger.info("Thread pool empty, creating thread inline")
+        return self.client.threads_create().id
+
+    def refill(self):
+        with self._lock:
+            expired, self._expired = self._expired, []
+        for thread_id in expired:
+            self._delete(thread_id)
+
+        while not self._closed and len(self) < self.size:
+            thread_id = self.client.threads_create().id
+            with self._lock:
+                self._threads.append((thread_id, self.clock()))
+
+    def wait_for_refill(self, timeout: float | None = None):
+        with self._lock:
+            refill_thread = self._refill_thread
+        if refill_thread:
+            refill_thread.join(timeout)
+
+    def close(self):
+        """
+        Stops refilling and deletes the threads that were never handed out.
+        """
+        self._closed = True
+        self.wait_for_refill()
+
+        with self._lock:
+            unused = [thread_id for thread_id, _ in self._threads] + self._expired
+            self._threads.clear()
+            self._expired = []
+        for thread_id in unused:
+            self._delete(thread_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._threads)
+
+    def _take(self) -> str | None:
+        with self._lock:
+            while self._threads:
+                thread_id, created_at = self._threads.popleft()
+                if self.clock() - created_at < self.max_age_in_seconds:
+                    return thread_id
+                self._expired.append(thread_id)
+        return None
+
+    def _schedule_refill(self):
+        with self._lock:
+            if self._refilling or self._closed:
+                return
+            self._refilling = True
+            self._refill_thread = threading.Thread(target=self._run_refill, name="thread-pool-refill", daemon=True)
+            self._refill_thread.start()
+
+    def _run_refill(self):
+        """
+        Refills until the pool is back above the low watermark, re-checking under
+        the lock before finishing so a drop during the refill is not missed.
+        """
+        from openai import APIError
+
+        settled = False
+        try:
+            while True:
+                self.refill()
+                with self._lock:
+                    if self._closed or (len(self._threads) >= self.low_watermark and not self._expired):
+                        self._refilling = False
+                        settled = True
+                        return
+        except APIError as e:
+            logger.warning(f"Thread pool refill failed: {e}")
+        except Exception:
+            logger.exception("Thread pool refill failed")
+        finally:
+            if not settled:
+                with self._lock:
+                    self._refilling = False
+
+    def _delete(self, thread_id: str):
+        from openai import APIError
+
+        try:
+            self.client.threads_delete(thread_id)
+        except APIError as e:
+            logger.warning(f"Could not delete pooled thread {thread_id}: {e}")
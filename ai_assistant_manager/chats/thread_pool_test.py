@@ -0,0 +1,145 @@
+import itertools
+from unittest.mock import MagicMock
+
+import pytest
+from openai import APIConnectionError
+
+from ..assistants.assistant_service import AssistantService
+from ..clients.openai_api import OpenAIClient
+from ..fake_api.fake_api_config import FakeApiConfig
+from ..fake_api.fake_api_server import FakeOpenAIServer
+from .thread_pool import PrewarmedThreadPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_client() -> MagicMock:
+    client = MagicMock()
+    ids = itertools.count(1)
+    client.threads_create.side_effect = lambda: MagicMock(id=f"thread_{next(ids)}")
+    return client
+
+
+def test_acquire_hands_out_prewarmed_threads_and_refills():
+    client = build_client()
+    pool = PrewarmedThreadPool(client, size=3, low_watermark=2).start()
+    pool.wait_for_refill()
+
+    assert len(pool) == 3
+    assert pool.acquire() == "thread_1"
+    assert pool.acquire() == "thread_2"
+
+    pool.wait_for_refill()
+
+    assert len(pool) == 3
+    assert client.threads_create.call_count == 5
+
+
+def test_acquire_creates_inline_when_empty():
+    client = build_client()
+    pool = PrewarmedThreadPool(client, size=1, low_watermark=0)
+
+    assert pool.acquire() == "thread_1"
+    assert len(pool) == 0
+
+
+def test_expired_threads_are_skipped_and_deleted():
+    client = build_client()
+    clock = FakeClock()
+    pool = PrewarmedThreadPool(client, size=2, low_watermark=1, max_age_in_seconds=60, clock=clock)
+    pool.refill()
+
+    clock.now = 61
+    thread_id = pool.acquire()
+    pool.wait_for_refill()
+
+    assert thread_id not in ["thread_1", "thread_2"]
+    client.threads_delete.assert_any_call("thread_1")
+    client.threads_delete.assert_any_call("thread_2")
+    assert len(pool) == 2
+
+
+def test_refill_repeats_when_pool_drains_during_refill():
+    client = build_client()
+    pool = PrewarmedThreadPool(client, size=2, low_watermark=1)
+    refill = pool.refill
+    rounds = []
+
+    def draining_refill():
+        refill()
+        rounds.append(len(pool))
+        if len(rounds) == 1:
+            pool._take()  # pylint: disable=protected-access
+            pool._take()  # pylint: disable=protected-access
+
+    pool.refill = draining_refill
+    pool.start().wait_for_refill()
+
+    assert rounds == [2, 2]
+    assert len(pool) == 2
+
+
+def test_failed_refill_can_be_scheduled_again():
+    client = build_client()
+    create = client.threads_create.side_effect
+    client.threads_create.side_effect = APIConnectionError(request=MagicMock())
+    pool = PrewarmedThreadPool(client, size=1, low_watermark=1)
+
+    pool.start().wait_for_refill()
+    assert len(pool) == 0
+
+    client.threads_create.side_effect = create
+    pool.start().wait_for_refill()
+    assert len(pool) == 1
+
+
+def test_unexpected_refill_errors_are_logged_and_can_be_rescheduled():
+    client = build_client()
+    create = client.threads_create.side_effect
+    client.threads_create.side_effect = KeyError("id")
+    pool = PrewarmedThreadPool(client, size=1, low_watermark=1)
+
+    pool.start().wait_for_refill()
+    assert len(pool) == 0
+
+    client.threads_create.side_effect = create
+    pool.start().wait_for_refill()
+    assert len(pool) == 1
+
+
+def test_low_watermark_above_size_is_rejected():
+    with pytest.raises(ValueError, match="low_watermark must be between 0 and size"):
+        PrewarmedThreadPool(build_client(), size=1, low_watermark=2)
+
+
+def test_close_deletes_unused_threads():
+    client = build_client()
+    pool = PrewarmedThreadPool(client, size=2)
+    pool.refill()
+
+    pool.close()
+
+    assert client.threads_delete.call_count == 2
+    assert len(pool) == 0
+
+
+def test_start_chat_uses_pool_without_threads_create():
+    with FakeOpenAIServer(FakeApiConfig(seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        pool = PrewarmedThreadPool(client, size=2).start()
+        pool.wait_for_refill()
+        service = AssistantService(client, assistant_name="Pool", thread_pool=pool)
+
+        server.reset_request_counts()
+        chat = service.start_chat("asst_id", None)
+
+        assert chat.thread_id in server.state.threads
+        assert server.request_counts["POST /threads"] == 0
+
+        pool.close()
@@ -0,0 +1,158 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field, replace
+
+from ..usage.usage_ledger import RunUsage
+
+USER = "user"
+ASSISTANT = "assistant"
+TOOL_CALL = "tool_call"
+TOOL_OUTPUT = "tool_output"
+
+
+@dataclass(frozen=True)
+class TranscriptEntry:
+    thread_id: str
+    assistant_id: str
+    role: str
+    content: str
+    run_id: str | None = None
+    annotation_files: tuple[str, ...] = ()
+    tool_call: dict | None = None
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    total_tokens: int | None = None
+    created_at: float = field(default_factory=time.time)
+    id: int | None = None
+
+    def with_usage(self, usage: RunUsage | None) -> "TranscriptEntry":
+        if not usage:
+            return self
+        return replace(
+            self,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+        )
+
+
+COLUMNS = [
+    "thread_id",
+    "assistant_id",
+    "role",
+    "content",
+    "run_id",
+    "annotation_files",
+    "tool_call",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "created_at",
+]
+
+
+class TranscriptStore:
+    """
+    A local SQLite record of what each Chat sent and received: messages,
+    citations, tool calls and token usage, indexed by thread and time so a
+    history view is a local read instead of paging through messages_list.
+    Defaults to an in-memory database; pass a file path to keep transcripts.
+    """
+
+    def __init__(self, file_path: str = ":memory:"):
+        self._db = sqlite3.connect(file_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS transcript ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, thread_id TEXT NOT NULL, assistant_id TEXT, role TEXT NOT NULL, "
+            "content TEXT, run_id TEXT, annotation_files TEXT, tool_call TEXT, "
+            "prompt_tokens INTEGER, completion_tokens INTEGER, total_tokens INTEGER, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS transcript_thread ON transcript (thread_id, created_at, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS transcript_created_at ON transcript (created_at)")
+        self._db.commit()
+
+    def record(self, entry: TranscriptEntry) -> TranscriptEntry:
+        values = [
+            entry.thread_id,
+            entry.assistant_id,
+            entry.role,
+            entry.content,
+            entry.run_id,
+            json.dumps(list(entry.annotation_files)),
+            json.dumps(entry.tool_call) if entry.tool_call is not None else None,
+            entry.prompt_tokens,
+            entry.completion_tokens,
+            entry.total_tokens,
+            entry.created_at,
+        ]
+        with self._lock:
+            cursor = self._db.execute(
+                f"INSERT INTO transcript ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", values
+            )
+            self._db.commit()
+        return replace(entry, id=cursor.lastrowid)
+
+    def history(
+        self,
+        thread_id: str,
+        *,
+        limit: int | None = None,
+        before: float | None = None,
+        after: float | None = None,
+    ) -> list[TranscriptEntry]:
+        """
+        Returns a thread's entries oldest first; with `limit`, the newest `limit`
+        entries in the window.
+        """
+        query = f"SELECT id, {', '.join(COLUMNS)} FROM transcript WHERE thread_id = ?"
+        parameters: list = [thread_id]
+        if before is not None:
+            query += " AND created_at < ?"
+            parameters.append(before)
+        if after is not None:
+            query += " AND created_at > ?"
+            parameters.append(after)
+        query += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, parameters).fetchall()
+        return [self._to_entry(row) for row in reversed(rows)]
+
+    def threads(self, *, assistant_id: str | None = None, limit: int | None = None) -> list[str]:
+        """
+        Returns thread ids, most recently active first.
+        """
+        query = "SELECT thread_id FROM transcript"
+        parameters: list = []
+        if assistant_id is not None:
+            query += " WHERE assistant_id = ?"
+            parameters.append(assistant_id)
+        query += " GROUP BY thread_id ORDER BY MAX(created_at) DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._lock:
+            return [row[0] for row in self._db.execute(query, parameters).fetchall()]
+
+    def delete_thread(self, thread_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM transcript WHERE thread_id = ?", (thread_id,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _to_entry(self, row: tuple) -> TranscriptEntry:
+        values = dict(zip(["id", *COLUMNS], row))
+        values["annotation_files"] = tuple(json.loads(values["annotation_files"] or "[]"))
+        values["tool_call"] = json.loads(values["tool_call"]) if values["tool_call"] else None
+        return TranscriptEntry(**values)
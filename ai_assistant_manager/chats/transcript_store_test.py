@@ -0,0 +1,86 @@
+import pytest
+
+from ..clients.openai_api import OpenAIClient
+from ..fake_api.fake_api_config import FakeApiConfig, ToolCallScenario
+from ..fake_api.fake_api_server import FakeOpenAIServer
+from ..usage.usage_ledger import RunUsage
+from .chat import Chat, RequiresActionException
+from .transcript_store import ASSISTANT, TOOL_CALL, TOOL_OUTPUT, USER, TranscriptEntry, TranscriptStore
+
+WEATHER_TOOLS = [
+    {"type": "function", "function": {"name": "get_weather", "parameters": {"type": "object", "properties": {}}}},
+]
+
+
+def entry(thread_id: str, content: str, created_at: float, **details) -> TranscriptEntry:
+    return TranscriptEntry(
+        thread_id=thread_id, assistant_id="asst_id", role=USER, content=content, created_at=created_at, **details
+    )
+
+
+def test_history_is_ordered_and_windowed():
+    store = TranscriptStore()
+    for index in range(5):
+        store.record(entry("thread_1", f"message {index}", created_at=index))
+    store.record(entry("thread_2", "other", created_at=10))
+
+    assert [item.content for item in store.history("thread_1")] == [f"message {index}" for index in range(5)]
+    assert [item.content for item in store.history("thread_1", limit=2)] == ["message 3", "message 4"]
+    assert [item.content for item in store.history("thread_1", after=1, before=4)] == ["message 2", "message 3"]
+    assert store.threads() == ["thread_2", "thread_1"]
+
+
+def test_entries_round_trip(tmp_path):
+    file_path = str(tmp_path / "transcripts.db")
+    store = TranscriptStore(file_path)
+    usage = RunUsage("asst_id", "thread_1", "run_1", 7, 3, 10, 0.5, 2)
+    recorded = store.record(
+        entry(
+            "thread_1",
+            "answer",
+            created_at=1.0,
+            run_id="run_1",
+            annotation_files=("doc.txt",),
+            tool_call={"id": "call_1"},
+        ).with_usage(usage)
+    )
+    store.close()
+
+    reopened = TranscriptStore(file_path)
+    [loaded] = reopened.history("thread_1")
+    reopened.close()
+
+    assert loaded == recorded
+    assert loaded.id is not None
+    assert (loaded.prompt_tokens, loaded.completion_tokens, loaded.total_tokens) == (7, 3, 10)
+
+
+def test_chat_records_every_turn_and_reads_history_locally():
+    scenario = ToolCallScenario("weather", "get_weather", {"location": "London"})
+    with FakeOpenAIServer(FakeApiConfig(tool_calls=[scenario], seed=1)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = client.assistants_create("Transcript", "prompt", [], tools=WEATHER_TOOLS).id
+        store = TranscriptStore()
+        chat = Chat(client, assistant_id, transcript_store=store)
+        chat.start()
+
+        chat.send_user_message("Hello")
+        with pytest.raises(RequiresActionException) as action:
+            chat.send_user_message("What is the weather?")
+        chat.submit_tool_outputs(action.value.data.run_id, action.value.data.tool_call_id, "Rainy")
+
+        server.reset_request_counts()
+        history = chat.history()
+
+        assert server.total_requests() == 0
+        assert [item.role for item in history] == [USER, ASSISTANT, USER, TOOL_CALL, TOOL_OUTPUT, ASSISTANT]
+        assert history[1].total_tokens > 0
+        assert history[3].tool_call == {"id": action.value.data.tool_call_id, "name": "get_weather"}
+        assert history[4].content == "Rainy"
+        assert "Rainy" in history[5].content
+        assert history[5].run_id == action.value.data.run_id
+
+
+def test_history_requires_store():
+    with pytest.raises(RuntimeError, match="no transcript store"):
+        Chat(None, "asst_id").history()
@@ -1,31 +1,78 @@
 import time
 from io import BufferedReader
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 from loguru import logger
-from openai import OpenAI
 
-from ..env_variables import ENV_VARIABLES
+from ..env_variables import get_config
 from ..timer.timer import timer
+from .rate_limiter import Priority, RateLimiter, rate_limited
+from .resilience import OperationKind, Resilience, resilient
 
+if TYPE_CHECKING:
+    from openai import OpenAI
 
-def build_openai_client():
-    return OpenAI(timeout=90)
+
+def build_openai_client(*, rate_limiter: RateLimiter | None = None, max_retries: int | None = None) -> "OpenAI":
+    """
+    Pass max_retries=0 when the OpenAIClient is given a Resilience policy, so the
+    SDK's own retries do not multiply with it. The SDK is imported here rather
+    than at module load to keep cold starts fast.
+    """
+    from openai import DefaultHttpxClient, OpenAI
+
+    options = {} if max_retries is None else {"max_retries": max_retries}
+    if rate_limiter:
+        http_client = DefaultHttpxClient(event_hooks={"response": [rate_limiter.on_response]})
+        return OpenAI(timeout=90, http_client=http_client, **options)
+    return OpenAI(timeout=90, **options)
 
 
 class OpenAIClient:
-    def __init__(self, open_ai: OpenAI, *, open_ai_model: str | None = None):
+    def __init__(
+        self,
+        open_ai: "OpenAI",
+        *,
+        open_ai_model: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        resilience: Resilience | None = None,
+    ):
         self.open_ai = open_ai
-        self.open_ai_model = open_ai_model if open_ai_model else ENV_VARIABLES.openai_model
+        self.open_ai_model = open_ai_model if open_ai_model else get_config().openai_model
+        self.rate_limiter = rate_limiter
+        self.resilience = resilience
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.INTERACTIVE)
     @timer("OpenAIClient.threads_create")
     def threads_create(self):
         return self.open_ai.beta.threads.create()
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
+    @timer("OpenAIClient.threads_delete")
+    def threads_delete(self, thread_id: str):
+        return self.open_ai.beta.threads.delete(thread_id)
+
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.INTERACTIVE)
     @timer("OpenAIClient.messages_list")
-    def messages_list(self, thread_id: str):
-        return self.open_ai.beta.threads.messages.list(thread_id)
+    def messages_list(
+        self,
+        thread_id: str,
+        *,
+        limit: int | None = None,
+        order: Literal["asc", "desc"] | None = None,
+        run_id: str | None = None,
+        after: str | None = None,
+    ):
+        options = {"limit": limit, "order": order, "run_id": run_id, "after": after}
+        return self.open_ai.beta.threads.messages.list(
+            thread_id, **{key: value for key, value in options.items() if value is not None}
+        )
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.INTERACTIVE)
     @timer("OpenAIClient.messages_create")
     def messages_create(self, thread_id: str, content: str, role: Literal["user", "assistant"]):
         return self.open_ai.beta.threads.messages.create(
@@ -34,28 +81,65 @@ class OpenAIClient:
             role=role,
         )
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.INTERACTIVE, uses_model=True)
     @timer("OpenAIClient.runs_create")
-    def runs_create(self, assistant_id: str, thread_id: str, should_force_tool_call: bool):
-        return self.open_ai.beta.threads.runs.create_and_poll(
+    def runs_create(
+        self,
+        assistant_id: str,
+        thread_id: str,
+        should_force_tool_call: bool,
+        *,
+        poll: bool = True,
+        truncation_strategy: dict | None = None,
+        max_prompt_tokens: int | None = None,
+        max_completion_tokens: int | None = None,
+    ):
+        """
+        With poll=False the run is returned as soon as it is queued, so the caller
+        can poll it against its own deadline.
+        """
+        create = self.open_ai.beta.threads.runs.create_and_poll if poll else self.open_ai.beta.threads.runs.create
+        options = {
+            "truncation_strategy": truncation_strategy,
+            "max_prompt_tokens": max_prompt_tokens,
+            "max_completion_tokens": max_completion_tokens,
+        }
+        return create(
             assistant_id=assistant_id,
             thread_id=thread_id,
             tool_choice={"type": "file_search"} if should_force_tool_call else "auto",
+            **{key: value for key, value in options.items() if value is not None},
         )
 
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.INTERACTIVE)
     @timer("OpenAIClient.runs_retrieve")
     def runs_retrieve(self, run_id: str, thread_id: str):
         return self.open_ai.beta.threads.runs.retrieve(run_id, thread_id=thread_id)
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.INTERACTIVE)
+    @timer("OpenAIClient.runs_cancel")
+    def runs_cancel(self, run_id: str, thread_id: str):
+        return self.open_ai.beta.threads.runs.cancel(run_id, thread_id=thread_id)
+
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.INTERACTIVE, uses_model=True)
     @timer("OpenAIClient.runs_retrieve")
     def submit_tool_outputs_to_run(self, run_id: str, tool_call_id: str, thread_id: str, response: str):
         return self.open_ai.beta.threads.runs.submit_tool_outputs(
             run_id, thread_id=thread_id, tool_outputs=[{"output": response, "tool_call_id": tool_call_id}]
         )
 
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.assistants_list")
     def assistants_list(self):
         return self.open_ai.beta.assistants.list()
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.assistants_create")
     def assistants_create(
         self,
@@ -72,34 +156,99 @@ class OpenAIClient:
             tools=tools,
         )
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
+    @timer("OpenAIClient.assistants_update")
+    def assistants_update(
+        self,
+        assistant_id: str,
+        instructions: str,
+        vector_store_ids: list[str],
+        tools: list[dict] | None = None,
+    ):
+        return self.open_ai.beta.assistants.update(
+            assistant_id,
+            instructions=instructions,
+            tool_resources={"file_search": {"vector_store_ids": vector_store_ids}},
+            tools=tools,
+        )
+
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.assistants_delete")
     def assistants_delete(self, assistant_id: str):
         self.open_ai.beta.assistants.delete(assistant_id)
 
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.files_list")
     def files_list(self):
         return self.open_ai.files.list()
 
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.INTERACTIVE)
     @timer("OpenAIClient.files_get")
     def files_get(self, file_id: str):
         return self.open_ai.files.retrieve(file_id)
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.files_create")
     def files_create(self, file: BufferedReader, purpose: Literal["assistants", "batch", "fine-tune"]):
         return self.open_ai.files.create(file=file, purpose=purpose)
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.files_delete")
     def files_delete(self, file_id: str):
         self.open_ai.files.delete(file_id)
 
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.BACKGROUND)
+    @timer("OpenAIClient.files_download")
+    def files_download(self, file_id: str, file_path: str):
+        with self.open_ai.files.with_streaming_response.content(file_id) as response:
+            response.stream_to_file(file_path)
+
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
+    @timer("OpenAIClient.batches_create")
+    def batches_create(
+        self, input_file_id: str, *, endpoint: str = "/v1/chat/completions", metadata: dict | None = None
+    ):
+        return self.open_ai.batches.create(
+            input_file_id=input_file_id,
+            endpoint=endpoint,
+            completion_window="24h",
+            **({"metadata": metadata} if metadata else {}),
+        )
+
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.BACKGROUND)
+    @timer("OpenAIClient.batches_retrieve")
+    def batches_retrieve(self, batch_id: str):
+        return self.open_ai.batches.retrieve(batch_id)
+
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
+    @timer("OpenAIClient.batches_cancel")
+    def batches_cancel(self, batch_id: str):
+        return self.open_ai.batches.cancel(batch_id)
+
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.vector_stores_list")
     def vector_stores_list(self):
         return self.open_ai.vector_stores.list()
 
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.vector_stores_retrieve")
     def vector_stores_retrieve(self, vector_store_id: str):
         return self.open_ai.vector_stores.retrieve(vector_store_id)
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.vector_stores_create")
     def vector_stores_create(self, name: str, file_ids: list[str]):
         created_vector_store = self.open_ai.vector_stores.create(name=name, file_ids=file_ids)
@@ -118,7 +267,12 @@ class OpenAIClient:
 
     @timer("OpenAIClient.vector_stores_update")
     def vector_stores_update(self, vector_store_id: str, file_ids: list[str]):
-        [self.open_ai.vector_stores.files.create(vector_store_id, file_id=file_id) for file_id in file_ids]
+        """
+        Attaches each file with its own retried request, so a retry never
+        re-attaches files that were already added.
+        """
+        for file_id in file_ids:
+            self.vector_stores_file_create(vector_store_id, file_id)
 
         while (vector_store := self.vector_stores_retrieve(vector_store_id)).status != "completed":
             logger.info("Waiting for vector store to be ready")
@@ -130,15 +284,27 @@ class OpenAIClient:
             )
         return vector_store_id
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.vector_stores_delete")
     def vector_stores_delete(self, vector_store_id: str):
         self.open_ai.vector_stores.delete(vector_store_id)
 
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
+    @timer("OpenAIClient.vector_stores_file_create")
+    def vector_stores_file_create(self, vector_store_id: str, file_id: str):
+        return self.open_ai.vector_stores.files.create(vector_store_id, file_id=file_id)
+
+    @resilient(OperationKind.WRITE)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.vector_stores_file_delete")
     def vector_stores_file_delete(self, vector_store_id: str, file_id: str):
         self.open_ai.vector_stores.files.delete(file_id, vector_store_id=vector_store_id)
         self.files_delete(file_id)
 
+    @resilient(OperationKind.READ)
+    @rate_limited(Priority.BACKGROUND)
     @timer("OpenAIClient.vector_stores_files")
     def vector_stores_files(self, vector_store_id: str):
         return self.open_ai.vector_stores.files.list(vector_store_id, limit=100)
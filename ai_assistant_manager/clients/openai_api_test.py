@@ -2,15 +2,45 @@ from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 from .openai_api import OpenAIClient, build_openai_client
+from .rate_limiter import Priority, RateLimiter
 
 
-@patch("ai_assistant_manager.clients.openai_api.OpenAI")
+@patch("openai.OpenAI")
 def test_build_openai_client(mock_openai):
     client = build_openai_client()
     assert client is mock_openai.return_value
     mock_openai.assert_called_once_with(timeout=90)
 
 
+@patch("openai.DefaultHttpxClient")
+@patch("openai.OpenAI")
+def test_build_openai_client_with_rate_limiter(mock_openai, mock_http_client):
+    rate_limiter = RateLimiter()
+
+    client = build_openai_client(rate_limiter=rate_limiter)
+
+    assert client is mock_openai.return_value
+    mock_http_client.assert_called_once_with(event_hooks={"response": [rate_limiter.on_response]})
+    mock_openai.assert_called_once_with(timeout=90, http_client=mock_http_client.return_value)
+
+
+@patch("openai.OpenAI")
+def test_build_openai_client_with_max_retries(mock_openai):
+    build_openai_client(max_retries=0)
+    mock_openai.assert_called_once_with(timeout=90, max_retries=0)
+
+
+def test_client_acquires_from_rate_limiter():
+    rate_limiter = MagicMock(run_token_estimate=500)
+    client = OpenAIClient(MagicMock(), rate_limiter=rate_limiter)
+
+    client.runs_create("assistant_id", "thread_id", False)
+    rate_limiter.acquire.assert_called_with(Priority.INTERACTIVE, tokens=500)
+
+    client.vector_stores_list()
+    rate_limiter.acquire.assert_called_with(Priority.BACKGROUND, tokens=0)
+
+
 class TestOpenAIClient(TestCase):
     client: OpenAIClient
     mock_open_ai: MagicMock
@@ -23,11 +53,22 @@ class TestOpenAIClient(TestCase):
         self.client.threads_create()
         self.mock_open_ai.beta.threads.create.assert_called()
 
+    def test_threads_delete(self):
+        self.client.threads_delete("thread_id")
+        self.mock_open_ai.beta.threads.delete.assert_called_once_with("thread_id")
+
     def test_messages_list(self):
         thread_id = "thread_id"
         self.client.messages_list(thread_id)
         self.mock_open_ai.beta.threads.messages.list.assert_called_once_with(thread_id)
 
+    def test_messages_list_with_options(self):
+        thread_id = "thread_id"
+        self.client.messages_list(thread_id, limit=1, order="desc", run_id="run_id", after="msg_1")
+        self.mock_open_ai.beta.threads.messages.list.assert_called_once_with(
+            thread_id, limit=1, order="desc", run_id="run_id", after="msg_1"
+        )
+
     def test_messages_create(self):
         thread_id = "thread_id"
         content = "Hello"
@@ -53,6 +94,35 @@ class TestOpenAIClient(TestCase):
             thread_id=thread_id, assistant_id=assistant_id, tool_choice={"type": "file_search"}
         )
 
+    def test_runs_create_without_polling(self):
+        self.client.runs_create("assistant_id", "thread_id", False, poll=False)
+        self.mock_open_ai.beta.threads.runs.create.assert_called_once_with(
+            thread_id="thread_id", assistant_id="assistant_id", tool_choice="auto"
+        )
+        self.mock_open_ai.beta.threads.runs.create_and_poll.assert_not_called()
+
+    def test_runs_create_with_context_controls(self):
+        truncation_strategy = {"type": "last_messages", "last_messages": 5}
+        self.client.runs_create(
+            "assistant_id",
+            "thread_id",
+            False,
+            poll=False,
+            truncation_strategy=truncation_strategy,
+            max_prompt_tokens=2000,
+        )
+        self.mock_open_ai.beta.threads.runs.create.assert_called_once_with(
+            thread_id="thread_id",
+            assistant_id="assistant_id",
+            tool_choice="auto",
+            truncation_strategy=truncation_strategy,
+            max_prompt_tokens=2000,
+        )
+
+    def test_runs_cancel(self):
+        self.client.runs_cancel("run_id", "thread_id")
+        self.mock_open_ai.beta.threads.runs.cancel.assert_called_once_with("run_id", thread_id="thread_id")
+
     def test_runs_retrieve(self):
         run_id = "run_id"
         thread_id = "thread_id"
@@ -87,6 +157,16 @@ class TestOpenAIClient(TestCase):
             tools=tools,
         )
 
+    def test_assistants_update(self):
+        tools = [{"type": "file_search"}]
+        self.client.assistants_update("assistant_id", "instructions", ["vector_store_id"], tools)
+        self.mock_open_ai.beta.assistants.update.assert_called_once_with(
+            "assistant_id",
+            instructions="instructions",
+            tool_resources={"file_search": {"vector_store_ids": ["vector_store_id"]}},
+            tools=tools,
+        )
+
     def test_assistants_delete(self):
         assistant_id = "assistant_id"
         self.client.assistants_delete(assistant_id)
@@ -109,6 +189,24 @@ class TestOpenAIClient(TestCase):
         self.client.files_create(file, purpose)
         self.mock_open_ai.files.create.assert_called_once_with(file=file, purpose=purpose)
 
+    def test_files_download(self):
+        self.client.files_download("file_id", "output.jsonl")
+        content = self.mock_open_ai.files.with_streaming_response.content
+        content.assert_called_once_with("file_id")
+        content.return_value.__enter__.return_value.stream_to_file.assert_called_once_with("output.jsonl")
+
+    def test_batches_create(self):
+        self.client.batches_create("file_id")
+        self.mock_open_ai.batches.create.assert_called_once_with(
+            input_file_id="file_id", endpoint="/v1/chat/completions", completion_window="24h"
+        )
+
+    def test_batches_retrieve_and_cancel(self):
+        self.client.batches_retrieve("batch_id")
+        self.client.batches_cancel("batch_id")
+        self.mock_open_ai.batches.retrieve.assert_called_once_with("batch_id")
+        self.mock_open_ai.batches.cancel.assert_called_once_with("batch_id")
+
     def test_files_delete(self):
         file_id = "file_id"
         self.client.files_delete(file_id)
@@ -0,0 +1,190 @@
+import re
+import threading
+import time
+from collections.abc import Callable, Mapping
+from enum import IntEnum
+from functools import wraps
+
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+MAX_WAIT_IN_SECONDS = 1.0
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+def parse_duration(value: str | None) -> float | None:
+    """
+    Parses OpenAI reset durations such as "20ms", "1s" or "6m0s" into seconds.
+    """
+    if not value:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float, *, now: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.available = capacity
+        self.updated_at = now
+
+    def refill(self, now: float):
+        elapsed = max(0.0, now - self.updated_at)
+        self.available = min(self.capacity, self.available + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float, *, reserve: float = 0.0) -> float:
+        self.refill(now)
+        amount = min(amount, self.capacity)
+        missing = amount + reserve * self.capacity - self.available
+        if missing <= 0:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return MAX_WAIT_IN_SECONDS
+        return missing / self.refill_per_second
+
+    def take(self, amount: float):
+        self.available -= min(amount, self.capacity)
+
+    def sync(self, limit: float | None, remaining: float | None, reset_in_seconds: float | None, now: float):
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.available = min(self.capacity, remaining)
+            if reset_in_seconds:
+                self.refill_per_second = max(self.capacity - remaining, 1) / reset_in_seconds
+        self.updated_at = now
+
+
+class RateLimiter:
+    """
+    Client-side traffic shaping for the OpenAI API.
+
+    Requests and model tokens are tracked in separate token buckets whose limits
+    and refill rates are learned from the x-ratelimit-* response headers. Background
+    callers may not drain the last `background_reserve` fraction of either bucket
+    and always yield to waiting interactive callers. A 429 response pauses all
+    traffic until its retry-after has elapsed.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 200_000,
+        run_token_estimate: int = 2_000,
+        background_reserve: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        now = clock()
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60, now=now)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60, now=now)
+        self.run_token_estimate = run_token_estimate
+        self.background_reserve = background_reserve
+        self.clock = clock
+        self.paused_until = 0.0
+        self._waiting = {priority: 0 for priority in Priority}
+        self._condition = threading.Condition()
+
+    def acquire(self, priority: Priority = Priority.INTERACTIVE, *, tokens: int = 0):
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while (wait := self._wait_time(priority, tokens)) > 0:
+                    self._condition.wait(min(wait, MAX_WAIT_IN_SECONDS))
+                self._take(tokens)
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def try_acquire(self, priority: Priority = Priority.INTERACTIVE, *, tokens: int = 0) -> bool:
+        with self._condition:
+            if self._wait_time(priority, tokens) > 0:
+                return False
+            self._take(tokens)
+            return True
+
+    def update_from_headers(self, headers: Mapping[str, str], *, status_code: int | None = None):
+        now = self.clock()
+
+        with self._condition:
+            self.requests.sync(
+                _to_float(headers.get("x-ratelimit-limit-requests")),
+                _to_float(headers.get("x-ratelimit-remaining-requests")),
+                parse_duration(headers.get("x-ratelimit-reset-requests")),
+                now,
+            )
+            self.tokens.sync(
+                _to_float(headers.get("x-ratelimit-limit-tokens")),
+                _to_float(headers.get("x-ratelimit-remaining-tokens")),
+                parse_duration(headers.get("x-ratelimit-reset-tokens")),
+                now,
+            )
+
+            if status_code == 429:
+                retry_after = parse_duration(headers.get("retry-after")) or MAX_WAIT_IN_SECONDS
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+            self._condition.notify_all()
+
+    def on_response(self, response):
+        """
+        Response event hook for the underlying HTTP client, see build_openai_client.
+        """
+        self.update_from_headers(response.headers, status_code=response.status_code)
+
+    def _wait_time(self, priority: Priority, tokens: int) -> float:
+        if any(count for waiting, count in self._waiting.items() if waiting < priority):
+            return MAX_WAIT_IN_SECONDS
+
+        now = self.clock()
+        reserve = self.background_reserve if priority > Priority.INTERACTIVE else 0.0
+
+        return max(
+            self.paused_until - now,
+            self.requests.wait_time(1, now, reserve=reserve),
+            self.tokens.wait_time(tokens, now, reserve=reserve) if tokens else 0.0,
+        )
+
+    def _take(self, tokens: int):
+        self.requests.take(1)
+        if tokens:
+            self.tokens.take(tokens)
+
+
+def rate_limited(priority: Priority, *, uses_model: bool = False):
+    """
+    Waits on the client's rate limiter (if any) before calling the wrapped OpenAIClient method.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if rate_limiter := self.rate_limiter:
+                rate_limiter.acquire(priority, tokens=rate_limiter.run_token_estimate if uses_model else 0)
+            return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _to_float(value: str | None) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,160 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from .rate_limiter import Priority, RateLimiter, TokenBucket, parse_duration, rate_limited
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("20ms", 0.02),
+        ("1s", 1.0),
+        ("6m0s", 360.0),
+        ("1h2m3.5s", 3723.5),
+        ("2.5", 2.5),
+        ("", None),
+        (None, None),
+        ("soon", None),
+    ],
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == expected
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(10, 1, now=0)
+    bucket.take(10)
+
+    assert bucket.wait_time(5, 0) == 5
+    assert bucket.wait_time(5, 5) == 0
+
+
+def test_token_bucket_clamps_amount_to_capacity():
+    bucket = TokenBucket(10, 1, now=0)
+
+    assert bucket.wait_time(50, 0) == 0
+
+
+def test_token_bucket_sync_learns_refill_rate():
+    bucket = TokenBucket(10, 1, now=0)
+
+    bucket.sync(100, 40, 6, 0)
+
+    assert bucket.capacity == 100
+    assert bucket.available == 40
+    assert bucket.refill_per_second == 10
+
+
+def test_try_acquire_consumes_requests():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=2, clock=clock)
+
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+    clock.now += 30
+    assert limiter.try_acquire()
+
+
+def test_background_cannot_drain_reserve():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=10, background_reserve=0.5, clock=clock)
+
+    acquired = [limiter.try_acquire(Priority.BACKGROUND) for _ in range(10)]
+
+    assert acquired.count(True) == 5
+    assert limiter.try_acquire(Priority.INTERACTIVE)
+
+
+def test_token_budget_is_tracked_separately():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1_000, clock=clock)
+
+    assert limiter.try_acquire(tokens=1_000)
+    assert not limiter.try_acquire(tokens=100)
+    assert limiter.try_acquire()
+
+
+def test_update_from_headers():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+
+    limiter.update_from_headers(
+        {
+            "x-ratelimit-limit-requests": "60",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "1s",
+            "x-ratelimit-limit-tokens": "1000",
+            "x-ratelimit-remaining-tokens": "500",
+            "x-ratelimit-reset-tokens": "6m0s",
+        }
+    )
+
+    assert limiter.requests.capacity == 60
+    assert not limiter.try_acquire()
+    assert limiter.tokens.available == 500
+
+
+def test_rate_limit_response_pauses_traffic():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+
+    limiter.on_response(MagicMock(status_code=429, headers={"retry-after": "2"}))
+
+    assert not limiter.try_acquire()
+    clock.now += 2
+    assert limiter.try_acquire()
+
+
+def test_background_yields_to_waiting_interactive():
+    limiter = RateLimiter()
+    limiter._waiting[Priority.INTERACTIVE] = 1  # pylint: disable=protected-access
+
+    assert not limiter.try_acquire(Priority.BACKGROUND)
+    assert limiter.try_acquire(Priority.INTERACTIVE)
+
+
+def test_acquire_blocks_until_capacity():
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.requests.available = 0
+    done = threading.Event()
+
+    thread = threading.Thread(target=lambda: (limiter.acquire(), done.set()))
+    thread.start()
+    thread.join(timeout=2)
+
+    assert done.is_set()
+
+
+def test_rate_limited_decorator():
+    class Client:
+        def __init__(self, rate_limiter):
+            self.rate_limiter = rate_limiter
+
+        @rate_limited(Priority.BACKGROUND)
+        def list(self):
+            return "listed"
+
+        @rate_limited(Priority.INTERACTIVE, uses_model=True)
+        def run(self):
+            return "ran"
+
+    rate_limiter = MagicMock(run_token_estimate=123)
+    client = Client(rate_limiter)
+
+    assert client.list() == "listed"
+    rate_limiter.acquire.assert_called_with(Priority.BACKGROUND, tokens=0)
+    assert client.run() == "ran"
+    rate_limiter.acquire.assert_called_with(Priority.INTERACTIVE, tokens=123)
+    assert Client(None).list() == "listed"
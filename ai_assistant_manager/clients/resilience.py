@@ -0,0 +1,249 @@
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import wraps
+
+from loguru import logger
+
+from .rate_limiter import parse_duration
+
+EXHAUSTED_ATTRIBUTE = "_resilience_exhausted"
+
+
+class OperationKind(Enum):
+    READ = "read"
+    WRITE = "write"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay_in_seconds: float = 0.5
+    max_delay_in_seconds: float = 8.0
+
+
+READ_POLICY = RetryPolicy(max_attempts=5, base_delay_in_seconds=0.25, max_delay_in_seconds=8.0)
+WRITE_POLICY = RetryPolicy(max_attempts=3, base_delay_in_seconds=0.5, max_delay_in_seconds=8.0)
+
+
+def decorrelated_jitter(
+    previous_delay: float | None, policy: RetryPolicy, *, rng: random.Random | None = None
+) -> float:
+    """
+    Decorrelated jitter backoff: sleep = min(cap, uniform(base, previous * 3)).
+    """
+    rng = rng or random
+    previous_delay = previous_delay or policy.base_delay_in_seconds
+    upper = max(policy.base_delay_in_seconds, previous_delay * 3)
+    return min(policy.max_delay_in_seconds, rng.uniform(policy.base_delay_in_seconds, upper))
+
+
+def is_transient(error: Exception) -> bool:
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+
+    return isinstance(error, (RateLimitError, APIConnectionError, InternalServerError))
+
+
+def is_retryable(error: Exception, kind: OperationKind) -> bool:
+    """
+    Reads are retried on any transient error. Writes are only retried when the
+    request was rejected before being processed, so a create is never repeated
+    after a timeout or a server error that may have applied it.
+    """
+    from openai import APIConnectionError, APITimeoutError, RateLimitError
+
+    if not is_transient(error):
+        return False
+    if kind == OperationKind.READ:
+        return True
+    return isinstance(error, RateLimitError) or (
+        isinstance(error, APIConnectionError) and not isinstance(error, APITimeoutError)
+    )
+
+
+def retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    return parse_duration(headers.get("retry-after"))
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures and rejects calls
+    until `reset_timeout_in_seconds` has passed. A single trial call is then let
+    through (half open); success closes the circuit and failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout_in_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_in_seconds = reset_timeout_in_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout_in_seconds:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_neutral(self):
+        """
+        A non-transient error (a 400, a 404) says nothing about the API's health:
+        the state and failure count are left as they are, and only a half-open
+        trial slot is freed so the next call can test the API instead.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """
+        Returns True when this failure opened the circuit.
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            should_open = self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold
+            if should_open and self.state != self.OPEN:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                self._trial_in_flight = False
+                return True
+            return False
+
+
+@dataclass
+class ResilienceMetrics:
+    retries: Counter = field(default_factory=Counter)
+    failures: Counter = field(default_factory=Counter)
+    short_circuits: Counter = field(default_factory=Counter)
+    circuit_opened: int = 0
+
+
+class Resilience:
+    """
+    Retry and circuit-breaker policy applied to OpenAIClient methods, see `resilient`.
+    Policies can be overridden per operation name (e.g. {"files_create": RetryPolicy(1)}).
+    """
+
+    def __init__(
+        self,
+        *,
+        read_policy: RetryPolicy = READ_POLICY,
+        write_policy: RetryPolicy = WRITE_POLICY,
+        policies: dict[str, RetryPolicy] | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ):
+        self.read_policy = read_policy
+        self.write_policy = write_policy
+        self.policies = policies or {}
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.metrics = ResilienceMetrics()
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self._metrics_lock = threading.Lock()
+
+    def policy_for(self, operation: str, kind: OperationKind) -> RetryPolicy:
+        default_policy = self.read_policy if kind == OperationKind.READ else self.write_policy
+        return self.policies.get(operation, default_policy)
+
+    def call(self, operation: str, kind: OperationKind, func: Callable, *args, **kwargs):
+        policy = self.policy_for(operation, kind)
+        delay = None
+
+        for attempt in range(1, policy.max_attempts + 1):
+            if not self.circuit_breaker.allow():
+                self._count(self.metrics.short_circuits, operation)
+                raise CircuitOpenError(f"Circuit open, skipping OpenAIClient.{operation}")
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if getattr(e, EXHAUSTED_ATTRIBUTE, False):
+                    raise
+                if not is_transient(e):
+                    self.circuit_breaker.record_neutral()
+                    raise
+
+                circuit_opened = self._record_failure(operation)
+                if circuit_opened or not is_retryable(e, kind) or attempt == policy.max_attempts:
+                    setattr(e, EXHAUSTED_ATTRIBUTE, True)
+                    raise
+
+                delay = max(decorrelated_jitter(delay, policy, rng=self.rng), retry_after(e) or 0.0)
+                self._count(self.metrics.retries, operation)
+                logger.warning(
+                    f"OpenAIClient.{operation} failed ({type(e).__name__}), "
+                    f"retry {attempt}/{policy.max_attempts - 1} in {round(delay, 2)} seconds"
+                )
+                self.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    def _record_failure(self, operation: str) -> bool:
+        self._count(self.metrics.failures, operation)
+        if not self.circuit_breaker.record_failure():
+            return False
+
+        with self._metrics_lock:
+            self.metrics.circuit_opened += 1
+        logger.error(f"Circuit opened after OpenAIClient.{operation} failures")
+        return True
+
+    def _count(self, counter: Counter, operation: str):
+        with self._metrics_lock:
+            counter[operation] += 1
+
+
+def resilient(kind: OperationKind):
+    """
+    Runs the wrapped OpenAIClient method through the client's Resilience policy (if any).
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if resilience := self.resilience:
+                return resilience.call(func.__name__, kind, func, self, *args, **kwargs)
+            return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,236 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    BadRequestError,
+    InternalServerError,
+    NotFoundError,
+    RateLimitError,
+)
+
+from .openai_api import OpenAIClient
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    OperationKind,
+    Resilience,
+    RetryPolicy,
+    decorrelated_jitter,
+    is_retryable,
+    resilient,
+)
+
+
+def status_error(error_class, status_code: int, headers: dict | None = None):
+    return error_class("error", response=MagicMock(status_code=status_code, headers=headers or {}), body=None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_resilience(**kwargs) -> Resilience:
+    return Resilience(sleep=MagicMock(), rng=random.Random(1), **kwargs)
+
+
+def test_decorrelated_jitter_stays_within_bounds():
+    policy = RetryPolicy(base_delay_in_seconds=1, max_delay_in_seconds=10)
+    rng = random.Random(0)
+    delay = None
+
+    for _ in range(50):
+        delay = decorrelated_jitter(delay, policy, rng=rng)
+        assert 1 <= delay <= 10
+
+
+@pytest.mark.parametrize(
+    "error, kind, expected",
+    [
+        (status_error(RateLimitError, 429), OperationKind.WRITE, True),
+        (APIConnectionError(request=MagicMock()), OperationKind.WRITE, True),
+        (APITimeoutError(request=MagicMock()), OperationKind.WRITE, False),
+        (APITimeoutError(request=MagicMock()), OperationKind.READ, True),
+        (status_error(InternalServerError, 500), OperationKind.WRITE, False),
+        (status_error(InternalServerError, 503), OperationKind.READ, True),
+        (status_error(BadRequestError, 400), OperationKind.READ, False),
+        (ValueError("bug"), OperationKind.READ, False),
+    ],
+)
+def test_is_retryable(error, kind, expected):
+    assert is_retryable(error, kind) == expected
+
+
+def test_call_retries_reads_until_success():
+    resilience = build_resilience()
+    func = MagicMock(side_effect=[status_error(InternalServerError, 503), APITimeoutError(request=MagicMock()), "ok"])
+
+    assert resilience.call("files_get", OperationKind.READ, func) == "ok"
+
+    assert func.call_count == 3
+    assert resilience.sleep.call_count == 2
+    assert resilience.metrics.retries["files_get"] == 2
+
+
+def test_call_does_not_retry_ambiguous_writes():
+    resilience = build_resilience()
+    func = MagicMock(side_effect=APITimeoutError(request=MagicMock()))
+
+    with pytest.raises(APITimeoutError):
+        resilience.call("assistants_create", OperationKind.WRITE, func)
+
+    func.assert_called_once()
+    assert resilience.metrics.failures["assistants_create"] == 1
+
+
+def test_call_honours_retry_after():
+    resilience = build_resilience()
+    func = MagicMock(side_effect=[status_error(RateLimitError, 429, {"retry-after": "7"}), "ok"])
+
+    resilience.call("files_create", OperationKind.WRITE, func)
+
+    resilience.sleep.assert_called_once_with(7.0)
+
+
+def test_call_gives_up_after_max_attempts():
+    resilience = build_resilience(policies={"files_list": RetryPolicy(max_attempts=2)})
+    func = MagicMock(side_effect=APIConnectionError(request=MagicMock()))
+
+    with pytest.raises(APIConnectionError):
+        resilience.call("files_list", OperationKind.READ, func)
+
+    assert func.call_count == 2
+
+
+def test_exhausted_nested_errors_are_not_retried():
+    resilience = build_resilience()
+    error = APIConnectionError(request=MagicMock())
+    nested = MagicMock(side_effect=error)
+    outer = MagicMock(side_effect=lambda: resilience.call("vector_stores_retrieve", OperationKind.READ, nested))
+
+    with pytest.raises(APIConnectionError):
+        resilience.call("vector_stores_create", OperationKind.WRITE, outer)
+
+    outer.assert_called_once()
+    assert nested.call_count == 5
+
+
+def test_non_transient_errors_are_not_retried():
+    resilience = build_resilience()
+    func = MagicMock(side_effect=status_error(BadRequestError, 400))
+
+    with pytest.raises(BadRequestError):
+        resilience.call("files_get", OperationKind.READ, func)
+
+    func.assert_called_once()
+    assert resilience.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_in_seconds=10, clock=clock)
+
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_reopens_on_failed_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_in_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_non_transient_errors_leave_the_breaker_unchanged():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_in_seconds=10, clock=clock)
+    resilience = build_resilience(circuit_breaker=breaker)
+    not_found = MagicMock(side_effect=status_error(NotFoundError, 404))
+
+    breaker.record_failure()
+    with pytest.raises(NotFoundError):
+        resilience.call("files_get", OperationKind.READ, not_found)
+    assert breaker.consecutive_failures == 1
+
+    breaker.record_failure()
+    clock.now = 10
+    with pytest.raises(NotFoundError):
+        resilience.call("files_get", OperationKind.READ, not_found)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_call_fails_fast_when_circuit_open():
+    resilience = build_resilience(circuit_breaker=CircuitBreaker(failure_threshold=1))
+    func = MagicMock(side_effect=APIConnectionError(request=MagicMock()))
+
+    with pytest.raises(APIConnectionError):
+        resilience.call("files_list", OperationKind.READ, func)
+    with pytest.raises(CircuitOpenError):
+        resilience.call("files_list", OperationKind.READ, func)
+
+    func.assert_called_once()
+    assert resilience.metrics.circuit_opened == 1
+    assert resilience.metrics.short_circuits["files_list"] == 1
+
+
+def test_resilient_decorator():
+    class Client:
+        def __init__(self, resilience):
+            self.resilience = resilience
+
+        @resilient(OperationKind.READ)
+        def files_get(self, file_id):
+            return file_id
+
+    client = Client(build_resilience())
+
+    assert client.files_get("file_id") == "file_id"
+    assert client.resilience.circuit_breaker.state == CircuitBreaker.CLOSED
+    assert Client(None).files_get("file_id") == "file_id"
+
+
+def test_client_methods_are_resilient():
+    mock_open_ai = MagicMock()
+    mock_open_ai.files.retrieve.side_effect = [APIConnectionError(request=MagicMock()), "file"]
+    client = OpenAIClient(mock_open_ai, resilience=build_resilience())
+
+    assert client.files_get("file_id") == "file"
+    assert mock_open_ai.files.retrieve.call_count == 2
+
+
+def test_vector_stores_update_retries_each_file_on_its_own():
+    mock_open_ai = MagicMock()
+    mock_open_ai.vector_stores.files.create.side_effect = [
+        "first",
+        status_error(RateLimitError, 429),
+        "second",
+    ]
+    mock_open_ai.vector_stores.retrieve.return_value = MagicMock(status="completed", file_counts=MagicMock(failed=0))
+    client = OpenAIClient(mock_open_ai, resilience=build_resilience())
+
+    client.vector_stores_update("vs_id", ["file_1", "file_2"])
+
+    assert [call.kwargs["file_id"] for call in mock_open_ai.vector_stores.files.create.call_args_list] == [
+        "file_1",
+        "file_2",
+        "file_2",
+    ]
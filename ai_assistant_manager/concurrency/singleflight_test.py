@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..assistants.assistant_service import AssistantService
+from .singleflight import SingleFlight
+
+
+def run_concurrently(func, count: int = 8) -> list:
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(call) for _ in range(count)]
+        return [future.result() for future in futures]
+
+
+def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = []
+
+    def slow_lookup():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = run_concurrently(lambda: single_flight.do("key", slow_lookup))
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert single_flight.stats == {"executed": 1, "shared": 7}
+    assert single_flight.in_flight() == 0
+
+
+def test_errors_are_shared_and_not_cached():
+    single_flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    def call():
+        with pytest.raises(RuntimeError, match="boom"):
+            single_flight.do("key", failing)
+
+    run_concurrently(call, count=4)
+
+    assert single_flight.do("key", lambda: "recovered") == "recovered"
+    assert single_flight.stats["executed"] == 2
+
+
+def test_different_keys_run_independently():
+    single_flight = SingleFlight()
+
+    assert single_flight.do("a", lambda value: value, 1) == 1
+    assert single_flight.do("b", lambda value: value, 2) == 2
+    assert single_flight.stats == {"executed": 2}
+
+
+def test_concurrent_get_assistant_id_creates_one_assistant():
+    client = MagicMock()
+    client.assistants_list.return_value = []
+    vector_store = MagicMock(id="vs_id")
+    vector_store.name = "Tenant vector store"
+    client.vector_stores_list.return_value = [vector_store]
+
+    def create_assistant(*_args, **_kwargs):
+        time.sleep(0.1)
+        return MagicMock(id="asst_id")
+
+    client.assistants_create.side_effect = create_assistant
+    single_flight = SingleFlight()
+
+    results = run_concurrently(
+        lambda: AssistantService(client, assistant_name="Tenant", single_flight=single_flight).get_assistant_id()
+    )
+
+    assert results == ["asst_id"] * 8
+    client.assistants_create.assert_called_once()
@@ -1,7 +1,8 @@
 import os
-from dataclasses import dataclass
-
-from dotenv import load_dotenv
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, replace
 
 
 @dataclass
@@ -17,6 +18,8 @@ class EnvVariables:
 def set_env_variables(env_file_path: str | None = None):
     global ENV_VARIABLES
 
+    from dotenv import load_dotenv
+
     load_dotenv(env_file_path, override=True)
 
     ENV_VARIABLES.assistant_description = os.getenv("ASSISTANT_DESCRIPTION", "AI Assistant Manager")
@@ -36,3 +39,61 @@ ENV_VARIABLES = EnvVariables(
     data_file_prefix=os.getenv("DATA_FILE_PREFIX", "AI Assistant Manager"),
     openai_model=os.getenv("OPENAI_MODEL", "gpt-4o"),
 )
+
+
+@dataclass(frozen=True)
+class Config:
+    """
+    An immutable snapshot of the settings, for running several tenants in one
+    process. Pass it explicitly or activate it with `use_config`; code that is
+    given neither falls back to the global ENV_VARIABLES.
+    """
+
+    assistant_description: str
+    assistant_name: str
+    bin_dir: str
+    data_dir: str
+    data_file_prefix: str
+    openai_model: str
+
+    @classmethod
+    def from_env_variables(cls, env_variables: EnvVariables | None = None) -> "Config":
+        return cls(**asdict(env_variables or ENV_VARIABLES))
+
+    def replace(self, **changes) -> "Config":
+        return replace(self, **changes)
+
+
+_current_config: ContextVar[Config | None] = ContextVar("ai_assistant_manager_config", default=None)
+_default_config: tuple[dict, Config] | None = None
+
+
+def get_config() -> Config:
+    return _current_config.get() or _get_default_config()
+
+
+def _get_default_config() -> Config:
+    """
+    Snapshots ENV_VARIABLES once and reuses it until set_env_variables or a
+    direct assignment changes a value, since exporters ask for the config for
+    every file they read.
+    """
+    global _default_config
+
+    values = vars(ENV_VARIABLES)
+    if _default_config is None or _default_config[0] != values:
+        _default_config = (dict(values), Config(**values))
+    return _default_config[1]
+
+
+@contextmanager
+def use_config(config: Config) -> Iterator[Config]:
+    """
+    Makes `config` current for this thread or task. Worker threads do not
+    inherit it; submit work with `contextvars.copy_context().run` to carry it.
+    """
+    token = _current_config.set(config)
+    try:
+        yield config
+    finally:
+        _current_config.reset(token)
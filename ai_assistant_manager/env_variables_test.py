@@ -1,4 +1,19 @@
-from .env_variables import ENV_VARIABLES, set_env_variables
+import os
+import threading
+from dataclasses import FrozenInstanceError, asdict
+
+import pytest
+
+from .env_variables import ENV_VARIABLES, Config, get_config, set_env_variables, use_config
+
+
+@pytest.fixture(autouse=True)
+def restore_env_variables(monkeypatch):
+    original = asdict(ENV_VARIABLES)
+    monkeypatch.setattr(os, "environ", os.environ.copy())
+    yield
+    for key, value in original.items():
+        setattr(ENV_VARIABLES, key, value)
 
 
 def test_reset_env_variables(tmp_path):
@@ -20,3 +35,37 @@ def test_reset_env_variables(tmp_path):
     assert ENV_VARIABLES.data_dir == "test_data"
     assert ENV_VARIABLES.data_file_prefix == "test_prefix"
     assert ENV_VARIABLES.openai_model == "test_model"
+
+
+def test_get_config_defaults_to_env_variables():
+    config = get_config()
+
+    assert config == Config.from_env_variables(ENV_VARIABLES)
+    with pytest.raises(FrozenInstanceError):
+        config.assistant_name = "changed"
+
+
+def test_default_config_is_reused_until_env_variables_change():
+    config = get_config()
+
+    assert get_config() is config
+
+    ENV_VARIABLES.bin_dir = "changed_bin"
+
+    assert get_config() is not config
+    assert get_config().bin_dir == "changed_bin"
+
+
+def test_use_config_is_scoped_and_per_thread():
+    tenant = get_config().replace(assistant_name="Tenant", bin_dir="tenant_bin")
+    seen_in_thread = []
+
+    with use_config(tenant):
+        assert get_config() is tenant
+
+        thread = threading.Thread(target=lambda: seen_in_thread.append(get_config().assistant_name))
+        thread.start()
+        thread.join()
+
+    assert seen_in_thread == [ENV_VARIABLES.assistant_name]
+    assert get_config().assistant_name == ENV_VARIABLES.assistant_name
@@ -2,19 +2,19 @@ import json
 import os
 from dataclasses import asdict
 
-from dateutil import parser
 from loguru import logger
 
 from ai_assistant_manager.encoding import UTF_8
-from ai_assistant_manager.env_variables import ENV_VARIABLES
+from ai_assistant_manager.env_variables import Config, get_config
 
 from ..content_data import ContentData
 from ..exporter import create_dir, does_data_exist
 
 
 class DirectoryExporter:
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, *, config: Config | None = None):
         self.directory = directory
+        self.config = config
 
     def export(self):
         if does_data_exist(self.get_file_path()):
@@ -36,15 +36,17 @@ class DirectoryExporter:
         logger.info(f"Directory '{self.directory}' data written to file: {self.get_file_path()}")
 
     def load(self):
-        files = os.listdir(self.get_data_dir_path())
-        return [self.file_load(filename) for filename in files]
+        data_dir_path = self.get_data_dir_path()
+        return [self.file_load(filename, data_dir_path=data_dir_path) for filename in os.listdir(data_dir_path)]
+
+    def file_load(self, filename: str, *, data_dir_path: str | None = None) -> ContentData:
+        from dateutil import parser
 
-    def file_load(self, filename: str) -> ContentData:
         file_id = filename[:3]
         name, _ = os.path.splitext(filename)
         title = name[3:].strip()
 
-        with open(os.path.join(self.get_data_dir_path(), filename), "r", encoding=UTF_8) as file:
+        with open(os.path.join(data_dir_path or self.get_data_dir_path(), filename), "r", encoding=UTF_8) as file:
             lines = file.readlines()
 
         body = "\n".join([line.strip() for line in lines[1:]])
@@ -53,10 +55,13 @@ class DirectoryExporter:
         return ContentData(id=file_id, title=title, body=body, date=date)
 
     def get_dir_path(self) -> str:
-        return os.path.join(ENV_VARIABLES.bin_dir, self.directory)
+        return os.path.join(self._config().bin_dir, self.directory)
 
     def get_file_path(self) -> str:
-        return os.path.join(self.get_dir_path(), f"{ENV_VARIABLES.data_file_prefix} - {self.directory}.json")
+        return os.path.join(self.get_dir_path(), f"{self._config().data_file_prefix} - {self.directory}.json")
 
     def get_data_dir_path(self) -> str:
-        return os.path.join(ENV_VARIABLES.data_dir, self.directory)
+        return os.path.join(self._config().data_dir, self.directory)
+
+    def _config(self) -> Config:
+        return self.config or get_config()
@@ -2,7 +2,7 @@ from unittest.mock import Mock, mock_open, patch
 
 import pytest
 
-from ai_assistant_manager.env_variables import ENV_VARIABLES
+from ai_assistant_manager.env_variables import ENV_VARIABLES, get_config, use_config
 
 from ..content_data import ContentData
 from .directory_exporter import DirectoryExporter
@@ -93,3 +93,16 @@ def test_get_data_dir_path(exporter: DirectoryExporter):
     result = exporter.get_data_dir_path()
 
     assert result == f"{ENV_VARIABLES.data_dir}/{example_directory}"
+
+
+def test_paths_follow_explicit_and_current_config():
+    tenant = get_config().replace(bin_dir="tenant_bin", data_dir="tenant_data", data_file_prefix="Tenant")
+
+    assert DirectoryExporter(example_directory, config=tenant).get_file_path() == (
+        f"tenant_bin/{example_directory}/Tenant - {example_directory}.json"
+    )
+
+    exporter = DirectoryExporter(example_directory)
+    with use_config(tenant):
+        assert exporter.get_data_dir_path() == f"tenant_data/{example_directory}"
+    assert exporter.get_data_dir_path() == f"{ENV_VARIABLES.data_dir}/{example_directory}"
@@ -3,7 +3,7 @@ import shutil
 
 from loguru import logger
 
-from ai_assistant_manager.env_variables import ENV_VARIABLES
+from ai_assistant_manager.env_variables import Config, get_config
 
 from ..exporter import create_dir, does_data_exist
 
@@ -17,12 +17,14 @@ class FilesExporter:
         bin_dir: str | None = None,
         data_dir: str | None = None,
         data_file_prefix: str | None = None,
+        config: Config | None = None,
     ) -> None:
+        config = config or get_config()
         self.file_name = file_name
         self.directory = directory
-        self.bin_dir = bin_dir if bin_dir else ENV_VARIABLES.bin_dir
-        self.data_dir = data_dir if data_dir else ENV_VARIABLES.data_dir
-        self.data_file_prefix = data_file_prefix if data_file_prefix else ENV_VARIABLES.data_file_prefix
+        self.bin_dir = bin_dir if bin_dir else config.bin_dir
+        self.data_dir = data_dir if data_dir else config.data_dir
+        self.data_file_prefix = data_file_prefix if data_file_prefix else config.data_file_prefix
 
     def export(self):
         if does_data_exist(self.get_file_path()):
@@ -0,0 +1,57 @@
+import math
+import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+Distribution = Callable[[random.Random], float]
+
+
+def constant(seconds: float) -> Distribution:
+    return lambda _rng: seconds
+
+
+def uniform(low: float, high: float) -> Distribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> Distribution:
+    """
+    Long-tailed latency: half of the samples fall below `median`.
+    """
+    mu = math.log(median) if median > 0 else 0.0
+    return lambda rng: rng.lognormvariate(mu, sigma) if median > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class ToolCallScenario:
+    """
+    When the latest user message contains `trigger` (case-insensitive) and the
+    assistant has a function tool called `name`, the run stops in requires_action
+    with a call to that function.
+    """
+
+    trigger: str
+    name: str
+    arguments: dict = field(default_factory=dict)
+
+
+def default_response(question: str) -> str:
+    return f"This is a fake response to: {question}"
+
+
+@dataclass
+class FakeApiConfig:
+    latency: Distribution = field(default_factory=lambda: constant(0.0))
+    run_duration: Distribution = field(default_factory=lambda: constant(0.0))
+    vector_store_duration: Distribution = field(default_factory=lambda: constant(0.0))
+    batch_duration: Distribution = field(default_factory=lambda: constant(0.0))
+    poll_after_ms: int = 10
+    rate_limit_probability: float = 0.0
+    retry_after_in_seconds: float = 0.0
+    failed_file_probability: float = 0.0
+    run_failure_probability: float = 0.0
+    citations_per_message: int = 1
+    tool_calls: list[ToolCallScenario] = field(default_factory=list)
+    response: Callable[[str], str] = default_response
+    rate_limit_headers: dict[str, str] = field(default_factory=dict)
+    seed: int | None = None
@@ -0,0 +1,355 @@
+import email
+import email.policy
+import json
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Self
+from urllib.parse import parse_qs, urlparse
+
+from openai import OpenAI
+
+from .fake_api_config import FakeApiConfig
+from .fake_api_state import FakeApiError, FakeApiState
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+ROUTES = [
+    ("POST", "/assistants", "create_assistant"),
+    ("GET", "/assistants", "list_assistants"),
+    ("GET", "/assistants/{assistant_id}", "get_assistant"),
+    ("POST", "/assistants/{assistant_id}", "update_assistant"),
+    ("DELETE", "/assistants/{assistant_id}", "delete_assistant"),
+    ("POST", "/threads", "create_thread"),
+    ("DELETE", "/threads/{thread_id}", "delete_thread"),
+    ("POST", "/threads/{thread_id}/messages", "create_message"),
+    ("GET", "/threads/{thread_id}/messages", "list_messages"),
+    ("POST", "/threads/{thread_id}/runs", "create_run"),
+    ("GET", "/threads/{thread_id}/runs/{run_id}", "get_run"),
+    ("POST", "/threads/{thread_id}/runs/{run_id}/submit_tool_outputs", "submit_tool_outputs"),
+    ("POST", "/threads/{thread_id}/runs/{run_id}/cancel", "cancel_run"),
+    ("POST", "/files", "create_file"),
+    ("GET", "/files", "list_files"),
+    ("GET", "/files/{file_id}", "get_file"),
+    ("GET", "/files/{file_id}/content", "get_file_content"),
+    ("DELETE", "/files/{file_id}", "delete_file"),
+    ("POST", "/vector_stores", "create_vector_store"),
+    ("GET", "/vector_stores", "list_vector_stores"),
+    ("GET", "/vector_stores/{vector_store_id}", "get_vector_store"),
+    ("DELETE", "/vector_stores/{vector_store_id}", "delete_vector_store"),
+    ("POST", "/vector_stores/{vector_store_id}/files", "create_vector_store_file"),
+    ("GET", "/vector_stores/{vector_store_id}/files", "list_vector_store_files"),
+    ("DELETE", "/vector_stores/{vector_store_id}/files/{file_id}", "delete_vector_store_file"),
+    ("POST", "/batches", "create_batch"),
+    ("GET", "/batches/{batch_id}", "get_batch"),
+    ("POST", "/batches/{batch_id}/cancel", "cancel_batch"),
+]
+
+
+def compile_route(template: str) -> re.Pattern:
+    return re.compile("^/v1" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", template) + "$")
+
+
+COMPILED_ROUTES = [(method, compile_route(template), template, handler) for method, template, handler in ROUTES]
+
+
+def to_json(value):
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items() if not key.startswith("_")}
+    if isinstance(value, list):
+        return [to_json(item) for item in value]
+    return value
+
+
+def paginate(items: list[dict], query: dict[str, str]) -> dict:
+    limit = min(int(query.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    ordered = sorted(items, key=lambda item: item["_sequence"], reverse=query.get("order", "desc") == "desc")
+    ids = [item["id"] for item in ordered]
+
+    if after := query.get("after"):
+        ordered = ordered[ids.index(after) + 1 :] if after in ids else []
+    elif before := query.get("before"):
+        ordered = ordered[: ids.index(before)] if before in ids else []
+
+    page = ordered[:limit]
+    return {
+        "object": "list",
+        "data": to_json(page),
+        "first_id": page[0]["id"] if page else None,
+        "last_id": page[-1]["id"] if page else None,
+        "has_more": len(ordered) > limit,
+    }
+
+
+class FakeApiRequestHandler(BaseHTTPRequestHandler):
+    server: "FakeApiHttpServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self, method: str):
+        fake_server: FakeOpenAIServer = self.server.fake_server
+        config = fake_server.config
+        parsed_url = urlparse(self.path)
+        body = self._read_body()
+
+        time.sleep(fake_server.state.sample(config.latency))
+
+        route = next(
+            (
+                (template, handler, match.groupdict())
+                for route_method, pattern, template, handler in COMPILED_ROUTES
+                if route_method == method and (match := pattern.match(parsed_url.path))
+            ),
+            None,
+        )
+        if not route:
+            return self._send_error(FakeApiError(404, f"Unknown route {method} {parsed_url.path}"))
+
+        template, handler, path_parameters = route
+        fake_server.count_request(f"{method} {template}")
+
+        if fake_server.state.chance(config.rate_limit_probability):
+            return self._send_error(
+                FakeApiError(429, "Injected rate limit.", error_type="rate_limit_exceeded"),
+                headers={"retry-after": str(config.retry_after_in_seconds)},
+            )
+
+        query = {key: values[-1] for key, values in parse_qs(parsed_url.query).items()}
+        try:
+            result = getattr(self, f"_{handler}")(fake_server.state, body, query, **path_parameters)
+        except FakeApiError as e:
+            return self._send_error(e)
+
+        if isinstance(result, bytes):
+            return self._send(200, result, content_type="application/octet-stream")
+
+        headers = {"openai-poll-after-ms": str(config.poll_after_ms)} if handler == "get_run" else {}
+        self._send(200, json.dumps(result).encode(), headers=headers)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("content-length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json(self, body: bytes) -> dict:
+        return json.loads(body) if body else {}
+
+    def _send_error(self, error: FakeApiError, *, headers: dict | None = None):
+        payload = {"error": {"message": error.message, "type": error.error_type, "param": None, "code": None}}
+        self._send(error.status_code, json.dumps(payload).encode(), headers=headers)
+
+    def _send(self, status_code: int, payload: bytes, *, content_type="application/json", headers=None):
+        self.send_response(status_code)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(payload)))
+        for key, value in {**self.server.fake_server.config.rate_limit_headers, **(headers or {})}.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Route handlers
+
+    def _create_assistant(self, state: FakeApiState, body, _query):
+        return to_json(state.create_assistant(self._json(body)))
+
+    def _list_assistants(self, state: FakeApiState, _body, query):
+        return paginate(state.list_assistants(), query)
+
+    def _get_assistant(self, state: FakeApiState, _body, _query, *, assistant_id):
+        return to_json(state.get_assistant(assistant_id))
+
+    def _update_assistant(self, state: FakeApiState, body, _query, *, assistant_id):
+        return to_json(state.update_assistant(assistant_id, self._json(body)))
+
+    def _delete_assistant(self, state: FakeApiState, _body, _query, *, assistant_id):
+        return state.delete_assistant(assistant_id)
+
+    def _create_thread(self, state: FakeApiState, body, _query):
+        return to_json(state.create_thread(self._json(body)))
+
+    def _delete_thread(self, state: FakeApiState, _body, _query, *, thread_id):
+        return state.delete_thread(thread_id)
+
+    def _create_message(self, state: FakeApiState, body, _query, *, thread_id):
+        return to_json(state.create_message(thread_id, self._json(body)))
+
+    def _list_messages(self, state: FakeApiState, _body, query, *, thread_id):
+        return paginate(state.list_messages(thread_id, run_id=query.get("run_id")), query)
+
+    def _create_run(self, state: FakeApiState, body, _query, *, thread_id):
+        return to_json(state.create_run(thread_id, self._json(body)))
+
+    def _get_run(self, state: FakeApiState, _body, _query, *, thread_id, run_id):
+        return to_json(state.get_run(thread_id, run_id))
+
+    def _submit_tool_outputs(self, state: FakeApiState, body, _query, *, thread_id, run_id):
+        return to_json(state.submit_tool_outputs(thread_id, run_id, self._json(body)))
+
+    def _cancel_run(self, state: FakeApiState, _body, _query, *, thread_id, run_id):
+        return to_json(state.cancel_run(thread_id, run_id))
+
+    def _create_file(self, state: FakeApiState, body, _query):
+        message = email.message_from_bytes(
+            f"content-type: {self.headers['content-type']}\r\n\r\n".encode() + body, policy=email.policy.HTTP
+        )
+        fields = {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+        if "file" not in fields:
+            raise FakeApiError(400, "Missing file.")
+
+        purpose = fields["purpose"].get_payload(decode=True).decode() if "purpose" in fields else "assistants"
+        return to_json(
+            state.create_file(
+                fields["file"].get_filename() or "upload", purpose, fields["file"].get_payload(decode=True)
+            )
+        )
+
+    def _list_files(self, state: FakeApiState, _body, query):
+        files = [file for file in state.list_files() if not query.get("purpose") or file["purpose"] == query["purpose"]]
+        return paginate(files, {"limit": str(MAX_PAGE_SIZE), **query})
+
+    def _get_file(self, state: FakeApiState, _body, _query, *, file_id):
+        return to_json(state.get_file(file_id))
+
+    def _get_file_content(self, state: FakeApiState, _body, _query, *, file_id):
+        return state.get_file_content(file_id)
+
+    def _delete_file(self, state: FakeApiState, _body, _query, *, file_id):
+        return state.delete_file(file_id)
+
+    def _create_vector_store(self, state: FakeApiState, body, _query):
+        return to_json(state.create_vector_store(self._json(body)))
+
+    def _list_vector_stores(self, state: FakeApiState, _body, query):
+        return paginate(state.list_vector_stores(), query)
+
+    def _get_vector_store(self, state: FakeApiState, _body, _query, *, vector_store_id):
+        return to_json(state.get_vector_store(vector_store_id))
+
+    def _delete_vector_store(self, state: FakeApiState, _body, _query, *, vector_store_id):
+        return state.delete_vector_store(vector_store_id)
+
+    def _create_vector_store_file(self, state: FakeApiState, body, _query, *, vector_store_id):
+        return to_json(state.create_vector_store_file(vector_store_id, self._json(body)))
+
+    def _list_vector_store_files(self, state: FakeApiState, _body, query, *, vector_store_id):
+        return paginate(state.list_vector_store_files(vector_store_id), query)
+
+    def _delete_vector_store_file(self, state: FakeApiState, _body, _query, *, vector_store_id, file_id):
+        return state.delete_vector_store_file(vector_store_id, file_id)
+
+    def _create_batch(self, state: FakeApiState, body, _query):
+        return to_json(state.create_batch(self._json(body)))
+
+    def _get_batch(self, state: FakeApiState, _body, _query, *, batch_id):
+        return to_json(state.get_batch(batch_id))
+
+    def _cancel_batch(self, state: FakeApiState, _body, _query, *, batch_id):
+        return to_json(state.cancel_batch(batch_id))
+
+
+class FakeApiHttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+    fake_server: "FakeOpenAIServer"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.open_connections: set[socket.socket] = set()
+        self._connections_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self.open_connections.add(request)
+        super().process_request(request, client_address)
+
+    def shutdown_request(self, request):
+        with self._connections_lock:
+            self.open_connections.discard(request)
+        super().shutdown_request(request)
+
+    def close_open_connections(self):
+        with self._connections_lock:
+            connections = list(self.open_connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class FakeOpenAIServer:
+    """
+    Local stand-in for the OpenAI Assistants and Batch APIs. Point a real OpenAI client at
+    `base_url` to run AssistantService and Chat offline:
+
+        with FakeOpenAIServer(FakeApiConfig(run_duration=uniform(0.1, 0.5))) as server:
+            client = OpenAIClient(server.build_openai_client())
+    """
+
+    def __init__(self, config: FakeApiConfig | None = None, *, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeApiConfig()
+        self.state = FakeApiState(self.config)
+        self.request_counts: Counter = Counter()
+        self._http_server = FakeApiHttpServer((host, port), FakeApiRequestHandler)
+        self._http_server.fake_server = self
+        self._thread: threading.Thread | None = None
+        self._counts_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._http_server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> Self:
+        if self._thread:
+            return self
+
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever, kwargs={"poll_interval": 0.05}, name="fake-openai-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if not self._thread:
+            return
+
+        self._http_server.shutdown()
+        self._http_server.close_open_connections()
+        self._http_server.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def count_request(self, route: str):
+        with self._counts_lock:
+            self.request_counts[route] += 1
+
+    def reset_request_counts(self):
+        with self._counts_lock:
+            self.request_counts.clear()
+
+    def total_requests(self) -> int:
+        with self._counts_lock:
+            return sum(self.request_counts.values())
+
+    def build_openai_client(self, **kwargs) -> OpenAI:
+        return OpenAI(base_url=self.base_url, api_key="fake-api-key", **{"timeout": 30, **kwargs})
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *_exc_info):
+        self.stop()
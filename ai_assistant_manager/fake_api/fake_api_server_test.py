@@ -0,0 +1,182 @@
+import random
+
+import pytest
+from openai import NotFoundError, RateLimitError
+
+from ..assistants.assistant_service import AssistantService
+from ..chats.chat import Chat, RequiresActionException
+from ..clients.openai_api import OpenAIClient
+from .fake_api_config import FakeApiConfig, ToolCallScenario, constant, lognormal, uniform
+from .fake_api_server import FakeOpenAIServer
+
+WEATHER_TOOLS = [
+    {"type": "function", "function": {"name": "get_weather", "parameters": {"type": "object", "properties": {}}}},
+    {"type": "file_search"},
+]
+
+
+@pytest.fixture(name="data_dir")
+def build_data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "bin" / "files").mkdir(parents=True)
+    (tmp_path / "bin" / "files" / "Fake - about.txt").write_text("About the fake assistant")
+    (tmp_path / "bin" / "files" / "Fake - faq.txt").write_text("Frequently asked questions")
+    return tmp_path
+
+
+def start_server(**config) -> FakeOpenAIServer:
+    return FakeOpenAIServer(FakeApiConfig(seed=1, **config)).start()
+
+
+def test_distributions():
+    rng = random.Random(0)
+
+    assert constant(0.5)(rng) == 0.5
+    assert 1 <= uniform(1, 2)(rng) <= 2
+    assert lognormal(0.1, 0.5)(rng) > 0
+    assert lognormal(0, 0.5)(rng) == 0
+
+
+def test_provision_and_chat(data_dir):  # pylint: disable=unused-argument
+    with start_server(run_duration=constant(0.02)) as server:
+        client = OpenAIClient(server.build_openai_client())
+        service = AssistantService(client, prompt="You are fake", assistant_name="Fake")
+
+        assistant_id = service.get_assistant_id()
+        chat = Chat(client, assistant_id)
+        chat.start()
+        response = chat.send_user_message("What is this?")
+
+        assert response.message.startswith("This is a fake response to: What is this?")
+        assert response.message.endswith("[*1]")
+        assert response.annotation_files[0] in ["Fake - about.txt", "Fake - faq.txt"]
+        assert response.usage.total_tokens == response.token_count > 0
+        assert service.get_assistant_id() == assistant_id
+        assert server.request_counts["POST /files"] == 2
+
+        service.delete_assistant()
+
+        assert server.state.assistants == {}
+        assert server.state.vector_stores == {}
+        assert server.state.files == {}
+
+
+def test_tool_call_scenario(data_dir):  # pylint: disable=unused-argument
+    scenario = ToolCallScenario("weather", "get_weather", {"location": "London"})
+    with start_server(tool_calls=[scenario]) as server:
+        client = OpenAIClient(server.build_openai_client())
+        service = AssistantService(client, prompt="Weather", assistant_name="Fake", tools=WEATHER_TOOLS)
+        chat = Chat(client, service.get_assistant_id())
+        chat.start()
+
+        with pytest.raises(RequiresActionException) as action:
+            chat.send_user_message("What is the weather?")
+
+        assert action.value.data.name == "get_weather"
+        assert action.value.data.arguments == {"location": "London"}
+
+        server.reset_request_counts()
+        response = chat.submit_tool_outputs(action.value.data.run_id, action.value.data.tool_call_id, "Rainy")
+
+        assert "Rainy" in response.message
+        assert response.annotation_files
+        assert server.request_counts["GET /threads/{thread_id}/messages"] == 1
+
+
+def test_tool_call_from_ask_completes_on_its_throwaway_thread(data_dir):  # pylint: disable=unused-argument
+    scenario = ToolCallScenario("weather", "get_weather", {"location": "London"})
+    with start_server(tool_calls=[scenario]) as server:
+        client = OpenAIClient(server.build_openai_client())
+        service = AssistantService(client, prompt="Weather", assistant_name="Fake", tools=WEATHER_TOOLS)
+        chat = Chat(client, service.get_assistant_id())
+        chat.start()
+
+        with pytest.raises(RequiresActionException) as action:
+            chat.ask("What is the weather?")
+
+        data = action.value.data
+        assert data.thread_id != chat.thread_id
+        assert data.thread_id in server.state.threads
+
+        response = chat.submit_tool_outputs(data.run_id, data.tool_call_id, "Rainy", thread_id=data.thread_id)
+
+        assert "Rainy" in response.message
+        assert data.thread_id not in server.state.threads
+        assert set(server.state.threads) == {chat.thread_id}
+
+
+def test_failed_vector_store_files_are_recreated(data_dir):  # pylint: disable=unused-argument
+    with start_server(failed_file_probability=0.5) as server:
+        client = OpenAIClient(server.build_openai_client())
+        service = AssistantService(client, prompt="Fake", assistant_name="Fake")
+
+        [vector_store_id] = service.create_vector_stores()
+
+        files = server.state.vector_store_files[vector_store_id].values()
+        assert len(files) == 2
+        assert all(file["status"] == "completed" for file in files)
+
+
+def test_rate_limit_injection():
+    with start_server(rate_limit_probability=1.0) as server:
+        client = OpenAIClient(server.build_openai_client(max_retries=0))
+
+        with pytest.raises(RateLimitError):
+            client.threads_create()
+
+
+def test_run_failure_injection(data_dir):  # pylint: disable=unused-argument
+    with start_server(run_failure_probability=1.0) as server:
+        client = OpenAIClient(server.build_openai_client())
+        service = AssistantService(client, prompt="Fake", assistant_name="Fake")
+        chat = Chat(client, service.get_assistant_id())
+        chat.start()
+
+        with pytest.raises(RuntimeError, match="Run failed with status: failed"):
+            chat.send_user_message("Hello")
+
+
+def test_pagination_and_not_found():
+    with start_server() as server:
+        open_ai = server.build_openai_client()
+        for index in range(25):
+            open_ai.beta.assistants.create(model="gpt-4o", name=f"assistant {index}")
+
+        first_page = open_ai.beta.assistants.list()
+
+        assert len(first_page.data) == 20
+        assert first_page.has_more
+        assert len(list(open_ai.beta.assistants.list())) == 25
+        with pytest.raises(NotFoundError):
+            open_ai.beta.assistants.delete("asst_missing")
+
+
+def test_latency_and_request_counts():
+    with start_server(latency=constant(0.01)) as server:
+        client = OpenAIClient(server.build_openai_client())
+
+        client.threads_create()
+        client.threads_create()
+
+        assert server.request_counts["POST /threads"] == 2
+        assert server.total_requests() == 2
+        server.reset_request_counts()
+        assert server.total_requests() == 0
+
+
+def test_runs_are_indexed_by_thread():
+    with start_server() as server:
+        client = OpenAIClient(server.build_openai_client())
+        assistant_id = client.assistants_create("Indexed", "prompt", []).id
+        chats = [Chat(client, assistant_id) for _ in range(2)]
+        for chat in chats:
+            chat.start()
+            chat.send_user_message("Hello")
+
+        assert {thread_id: list(runs) for thread_id, runs in server.state.thread_runs.items()} == {
+            chat.thread_id: [chat.last_run_id] for chat in chats
+        }
+
+        client.threads_delete(chats[0].thread_id)
+
+        assert list(server.state.thread_runs) == [chats[1].thread_id]
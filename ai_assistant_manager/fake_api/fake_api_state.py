@@ -0,0 +1,654 @@
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+
+from .fake_api_config import FakeApiConfig
+
+CITATION_MARKER = "【4:{index}†source】"
+TERMINAL_RUN_STATUSES = {"completed", "failed", "cancelled", "expired", "incomplete"}
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "cancelled", "expired"}
+BATCH_ENDPOINTS = {"/v1/chat/completions"}
+
+
+class FakeApiError(Exception):
+    def __init__(self, status_code: int, message: str, *, error_type: str = "invalid_request_error"):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.error_type = error_type
+
+
+def new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeApiState:
+    """
+    In-memory model of the Assistants API objects used by OpenAIClient: assistants,
+    threads, messages, runs, files, vector stores and batches. Runs, vector stores
+    and batches move through their lifecycles based on elapsed time sampled from
+    the FakeApiConfig.
+    """
+
+    def __init__(self, config: FakeApiConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.assistants: dict[str, dict] = {}
+        self.threads: dict[str, dict] = {}
+        self.messages: dict[str, list[dict]] = {}
+        self.runs: dict[str, dict] = {}
+        self.thread_runs: dict[str, dict[str, dict]] = {}
+        self.files: dict[str, dict] = {}
+        self.file_contents: dict[str, bytes] = {}
+        self.vector_stores: dict[str, dict] = {}
+        self.vector_store_files: dict[str, dict[str, dict]] = {}
+        self.batches: dict[str, dict] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+
+    def sample(self, distribution) -> float:
+        with self._lock:
+            return max(0.0, distribution(self.rng))
+
+    def chance(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self.rng.random() < probability
+
+    def _new_object(self, prefix: str, object_type: str, **fields) -> dict:
+        return {
+            "id": new_id(prefix),
+            "object": object_type,
+            "created_at": int(time.time()),
+            "_sequence": next(self._sequence),
+            **fields,
+        }
+
+    # Assistants
+
+    def create_assistant(self, body: dict) -> dict:
+        with self._lock:
+            assistant = self._new_object(
+                "asst",
+                "assistant",
+                name=body.get("name"),
+                description=body.get("description"),
+                model=body.get("model"),
+                instructions=body.get("instructions"),
+                tools=body.get("tools") or [],
+                tool_resources=body.get("tool_resources") or {},
+                metadata=body.get("metadata") or {},
+                temperature=1.0,
+                top_p=1.0,
+                response_format="auto",
+            )
+            self.assistants[assistant["id"]] = assistant
+            return assistant
+
+    def list_assistants(self) -> list[dict]:
+        with self._lock:
+            return list(self.assistants.values())
+
+    def get_assistant(self, assistant_id: str) -> dict:
+        return self._get(self.assistants, assistant_id, "assistant")
+
+    def update_assistant(self, assistant_id: str, body: dict) -> dict:
+        with self._lock:
+            assistant = self._get(self.assistants, assistant_id, "assistant")
+            for key in ["name", "description", "model", "instructions", "tools", "tool_resources", "metadata"]:
+                if key in body:
+                    assistant[key] = body[key]
+            return assistant
+
+    def delete_assistant(self, assistant_id: str) -> dict:
+        with self._lock:
+            self._get(self.assistants, assistant_id, "assistant")
+            del self.assistants[assistant_id]
+            return {"id": assistant_id, "object": "assistant.deleted", "deleted": True}
+
+    # Threads and messages
+
+    def create_thread(self, body: dict) -> dict:
+        with self._lock:
+            thread = self._new_object("thread", "thread", metadata=body.get("metadata") or {}, tool_resources=None)
+            self.threads[thread["id"]] = thread
+            self.messages[thread["id"]] = []
+            self.thread_runs[thread["id"]] = {}
+            for message in body.get("messages") or []:
+                self.create_message(thread["id"], message)
+            return thread
+
+    def delete_thread(self, thread_id: str) -> dict:
+        with self._lock:
+            self._get(self.threads, thread_id, "thread")
+            del self.threads[thread_id]
+            del self.messages[thread_id]
+            del self.thread_runs[thread_id]
+            return {"id": thread_id, "object": "thread.deleted", "deleted": True}
+
+    def create_message(self, thread_id: str, body: dict, *, run_id: str | None = None, annotations=None) -> dict:
+        with self._lock:
+            self._get(self.threads, thread_id, "thread")
+            self._ensure_thread_unlocked(thread_id)
+            content = body.get("content", "")
+            if isinstance(content, list):
+                content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+
+            message = self._new_object(
+                "msg",
+                "thread.message",
+                thread_id=thread_id,
+                role=body.get("role", "user"),
+                content=[{"type": "text", "text": {"value": content, "annotations": annotations or []}}],
+                assistant_id=body.get("assistant_id"),
+                run_id=run_id,
+                attachments=[],
+                metadata=body.get("metadata") or {},
+                status="completed",
+                completed_at=int(time.time()),
+                incomplete_at=None,
+                incomplete_details=None,
+            )
+            self.messages[thread_id].append(message)
+            return message
+
+    def list_messages(self, thread_id: str, *, run_id: str | None = None) -> list[dict]:
+        with self._lock:
+            self._get(self.threads, thread_id, "thread")
+            self._advance_thread_runs(thread_id)
+            messages = self.messages[thread_id]
+            return [message for message in messages if not run_id or message["run_id"] == run_id]
+
+    def _ensure_thread_unlocked(self, thread_id: str):
+        for run in self.thread_runs[thread_id].values():
+            self._advance_run(run)
+            if run["status"] not in TERMINAL_RUN_STATUSES:
+                raise FakeApiError(400, f"Can't add messages to {thread_id} while a run {run['id']} is active.")
+
+    # Runs
+
+    def create_run(self, thread_id: str, body: dict) -> dict:
+        with self._lock:
+            self._get(self.threads, thread_id, "thread")
+            self._ensure_thread_unlocked(thread_id)
+            assistant = self.get_assistant(body.get("assistant_id"))
+
+            run = self._new_object(
+                "run",
+                "thread.run",
+                thread_id=thread_id,
+                assistant_id=assistant["id"],
+                status="queued",
+                required_action=None,
+                last_error=None,
+                expires_at=None,
+                started_at=None,
+                cancelled_at=None,
+                failed_at=None,
+                completed_at=None,
+                model=body.get("model") or assistant["model"],
+                instructions=body.get("instructions") or assistant["instructions"],
+                tools=body.get("tools") or assistant["tools"],
+                tool_choice=body.get("tool_choice") or "auto",
+                truncation_strategy=body.get("truncation_strategy") or {"type": "auto", "last_messages": None},
+                max_prompt_tokens=body.get("max_prompt_tokens"),
+                max_completion_tokens=body.get("max_completion_tokens"),
+                parallel_tool_calls=True,
+                response_format="auto",
+                usage=None,
+                incomplete_details=None,
+                metadata=body.get("metadata") or {},
+                temperature=1.0,
+                top_p=1.0,
+                _started=time.monotonic(),
+                _duration=self.sample(self.config.run_duration),
+                _tool_call=self._match_tool_call(thread_id, assistant),
+                _tool_outputs=[],
+            )
+            self.runs[run["id"]] = run
+            self.thread_runs[thread_id][run["id"]] = run
+            return run
+
+    def get_run(self, thread_id: str, run_id: str) -> dict:
+        with self._lock:
+            run = self._get(self.runs, run_id, "run")
+            if run["thread_id"] != thread_id:
+                raise FakeApiError(404, f"No run found with id '{run_id}'.")
+            self._advance_run(run)
+            return run
+
+    def submit_tool_outputs(self, thread_id: str, run_id: str, body: dict) -> dict:
+        with self._lock:
+            run = self.get_run(thread_id, run_id)
+            if run["status"] != "requires_action":
+                raise FakeApiError(400, f"Runs in status {run['status']} do not accept tool outputs.")
+
+            run["_tool_outputs"].extend(output.get("output", "") for output in body.get("tool_outputs") or [])
+            run["_tool_call"] = None
+            run["required_action"] = None
+            run["status"] = "in_progress"
+            run["_started"] = time.monotonic()
+            run["_duration"] = self.sample(self.config.run_duration)
+            return run
+
+    def cancel_run(self, thread_id: str, run_id: str) -> dict:
+        with self._lock:
+            run = self.get_run(thread_id, run_id)
+            if run["status"] in TERMINAL_RUN_STATUSES:
+                raise FakeApiError(400, f"Cannot cancel run with status '{run['status']}'.")
+
+            run["status"] = "cancelled"
+            run["cancelled_at"] = int(time.time())
+            run["required_action"] = None
+            return run
+
+    def _match_tool_call(self, thread_id: str, assistant: dict) -> dict | None:
+        user_messages = [message for message in self.messages[thread_id] if message["role"] == "user"]
+        if not user_messages:
+            return None
+
+        question = user_messages[-1]["content"][0]["text"]["value"].lower()
+        function_names = {tool["function"]["name"] for tool in assistant["tools"] if tool.get("type") == "function"}
+
+        for scenario in self.config.tool_calls:
+            if scenario.trigger.lower() in question and scenario.name in function_names:
+                return {
+                    "id": new_id("call"),
+                    "type": "function",
+                    "function": {"name": scenario.name, "arguments": json.dumps(scenario.arguments)},
+                }
+        return None
+
+    def _advance_thread_runs(self, thread_id: str):
+        for run in self.thread_runs[thread_id].values():
+            self._advance_run(run)
+
+    def _advance_run(self, run: dict):
+        if run["status"] in TERMINAL_RUN_STATUSES or run["status"] == "requires_action":
+            return
+
+        elapsed = time.monotonic() - run["_started"]
+        run["started_at"] = run["started_at"] or run["created_at"]
+
+        if run["_tool_call"] and elapsed >= run["_duration"] / 2:
+            run["status"] = "requires_action"
+            run["required_action"] = {
+                "type": "submit_tool_outputs",
+                "submit_tool_outputs": {"tool_calls": [run["_tool_call"]]},
+            }
+            return
+
+        if elapsed < run["_duration"]:
+            run["status"] = "in_progress"
+            return
+
+        if self.chance(self.config.run_failure_probability):
+            run["status"] = "failed"
+            run["failed_at"] = int(time.time())
+            run["last_error"] = {"code": "server_error", "message": "Injected run failure."}
+            return
+
+        self._complete_run(run)
+
+    def _complete_run(self, run: dict):
+        thread_messages = self._prompt_messages(run)
+        question = next(
+            (
+                message["content"][0]["text"]["value"]
+                for message in reversed(thread_messages)
+                if message["role"] == "user"
+            ),
+            "",
+        )
+        text = self.config.response(question)
+        if run["_tool_outputs"]:
+            text = f"{text} {' '.join(run['_tool_outputs'])}"
+
+        text, annotations = self._add_citations(text, run)
+
+        prompt_tokens = estimate_tokens(run["instructions"] or "") + sum(
+            estimate_tokens(message["content"][0]["text"]["value"]) for message in thread_messages
+        )
+        if run["max_prompt_tokens"]:
+            prompt_tokens = min(prompt_tokens, run["max_prompt_tokens"])
+        completion_tokens = estimate_tokens(text)
+        incomplete_details = None
+        if run["max_completion_tokens"] and completion_tokens > run["max_completion_tokens"]:
+            completion_tokens = run["max_completion_tokens"]
+            text = text[: completion_tokens * 4]
+            annotations = [annotation for annotation in annotations if annotation["end_index"] <= len(text)]
+            incomplete_details = {"reason": "max_completion_tokens"}
+
+        self.messages[run["thread_id"]].append(
+            self._new_object(
+                "msg",
+                "thread.message",
+                thread_id=run["thread_id"],
+                role="assistant",
+                content=[{"type": "text", "text": {"value": text, "annotations": annotations}}],
+                assistant_id=run["assistant_id"],
+                run_id=run["id"],
+                attachments=[],
+                metadata={},
+                status="incomplete" if incomplete_details else "completed",
+                completed_at=None if incomplete_details else int(time.time()),
+                incomplete_at=int(time.time()) if incomplete_details else None,
+                incomplete_details=incomplete_details,
+            )
+        )
+
+        run["status"] = "incomplete" if incomplete_details else "completed"
+        run["incomplete_details"] = incomplete_details
+        run["completed_at"] = None if incomplete_details else int(time.time())
+        run["usage"] = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _prompt_messages(self, run: dict) -> list[dict]:
+        messages = [message for message in self.messages[run["thread_id"]] if message["run_id"] != run["id"]]
+        truncation_strategy = run["truncation_strategy"] or {}
+        if truncation_strategy.get("type") == "last_messages" and truncation_strategy.get("last_messages"):
+            return messages[-truncation_strategy["last_messages"] :]
+        return messages
+
+    def _add_citations(self, text: str, run: dict) -> tuple[str, list[dict]]:
+        assistant = self.assistants.get(run["assistant_id"])
+        vector_store_ids = (
+            ((assistant or {}).get("tool_resources") or {}).get("file_search", {}).get("vector_store_ids", [])
+        )
+        file_ids = [
+            file_id
+            for vector_store_id in vector_store_ids
+            for file_id, file in self.vector_store_files.get(vector_store_id, {}).items()
+            if file["status"] == "completed"
+        ]
+
+        annotations = []
+        for index, file_id in enumerate(file_ids[: self.config.citations_per_message]):
+            marker = CITATION_MARKER.format(index=index)
+            start_index = len(text)
+            text = f"{text}{marker}"
+            annotations.append(
+                {
+                    "type": "file_citation",
+                    "text": marker,
+                    "start_index": start_index,
+                    "end_index": start_index + len(marker),
+                    "file_citation": {"file_id": file_id},
+                }
+            )
+        return text, annotations
+
+    # Files
+
+    def create_file(self, filename: str, purpose: str, content: bytes) -> dict:
+        with self._lock:
+            file = self._new_object(
+                "file",
+                "file",
+                bytes=len(content),
+                filename=filename,
+                purpose=purpose,
+                status="processed",
+                status_details=None,
+            )
+            self.files[file["id"]] = file
+            self.file_contents[file["id"]] = content
+            return file
+
+    def list_files(self) -> list[dict]:
+        with self._lock:
+            return list(self.files.values())
+
+    def get_file(self, file_id: str) -> dict:
+        return self._get(self.files, file_id, "file")
+
+    def get_file_content(self, file_id: str) -> bytes:
+        with self._lock:
+            self._get(self.files, file_id, "file")
+            return self.file_contents[file_id]
+
+    def delete_file(self, file_id: str) -> dict:
+        with self._lock:
+            self._get(self.files, file_id, "file")
+            del self.files[file_id]
+            del self.file_contents[file_id]
+            return {"id": file_id, "object": "file", "deleted": True}
+
+    # Vector stores
+
+    def create_vector_store(self, body: dict) -> dict:
+        with self._lock:
+            vector_store = self._new_object(
+                "vs",
+                "vector_store",
+                name=body.get("name"),
+                status="in_progress",
+                usage_bytes=0,
+                file_counts={},
+                last_active_at=int(time.time()),
+                metadata=body.get("metadata") or {},
+                expires_after=None,
+                expires_at=None,
+                _started=time.monotonic(),
+                _duration=self.sample(self.config.vector_store_duration),
+            )
+            self.vector_stores[vector_store["id"]] = vector_store
+            self.vector_store_files[vector_store["id"]] = {}
+            for file_id in body.get("file_ids") or []:
+                self._add_vector_store_file(vector_store, file_id)
+            self._refresh_vector_store(vector_store)
+            return vector_store
+
+    def list_vector_stores(self) -> list[dict]:
+        with self._lock:
+            for vector_store in self.vector_stores.values():
+                self._refresh_vector_store(vector_store)
+            return list(self.vector_stores.values())
+
+    def get_vector_store(self, vector_store_id: str) -> dict:
+        with self._lock:
+            vector_store = self._get(self.vector_stores, vector_store_id, "vector store")
+            self._refresh_vector_store(vector_store)
+            return vector_store
+
+    def delete_vector_store(self, vector_store_id: str) -> dict:
+        with self._lock:
+            self._get(self.vector_stores, vector_store_id, "vector store")
+            del self.vector_stores[vector_store_id]
+            del self.vector_store_files[vector_store_id]
+            return {"id": vector_store_id, "object": "vector_store.deleted", "deleted": True}
+
+    def create_vector_store_file(self, vector_store_id: str, body: dict) -> dict:
+        with self._lock:
+            vector_store = self.get_vector_store(vector_store_id)
+            vector_store_file = self._add_vector_store_file(vector_store, body.get("file_id"))
+            vector_store["status"] = "in_progress"
+            vector_store["_started"] = time.monotonic()
+            vector_store["_duration"] = self.sample(self.config.vector_store_duration)
+            self._refresh_vector_store(vector_store)
+            return vector_store_file
+
+    def list_vector_store_files(self, vector_store_id: str) -> list[dict]:
+        with self._lock:
+            self.get_vector_store(vector_store_id)
+            return list(self.vector_store_files[vector_store_id].values())
+
+    def delete_vector_store_file(self, vector_store_id: str, file_id: str) -> dict:
+        with self._lock:
+            vector_store = self.get_vector_store(vector_store_id)
+            self._get(self.vector_store_files[vector_store_id], file_id, "vector store file")
+            del self.vector_store_files[vector_store_id][file_id]
+            self._refresh_vector_store(vector_store)
+            return {"id": file_id, "object": "vector_store.file.deleted", "deleted": True}
+
+    def _add_vector_store_file(self, vector_store: dict, file_id: str) -> dict:
+        file = self.get_file(file_id)
+        failed = self.chance(self.config.failed_file_probability)
+        vector_store_file = {
+            "id": file_id,
+            "object": "vector_store.file",
+            "created_at": int(time.time()),
+            "_sequence": next(self._sequence),
+            "vector_store_id": vector_store["id"],
+            "status": "failed" if failed else "completed",
+            "usage_bytes": 0 if failed else file["bytes"],
+            "last_error": {"code": "server_error", "message": "Injected file failure."} if failed else None,
+            "chunking_strategy": None,
+        }
+        self.vector_store_files[vector_store["id"]][file_id] = vector_store_file
+        return vector_store_file
+
+    def _refresh_vector_store(self, vector_store: dict):
+        files = self.vector_store_files[vector_store["id"]].values()
+        ready = time.monotonic() - vector_store["_started"] >= vector_store["_duration"]
+        completed = sum(1 for file in files if file["status"] == "completed")
+        failed = sum(1 for file in files if file["status"] == "failed")
+
+        vector_store["status"] = "completed" if ready else "in_progress"
+        vector_store["usage_bytes"] = sum(file["usage_bytes"] for file in files)
+        vector_store["file_counts"] = {
+            "in_progress": 0 if ready else len(files),
+            "completed": completed if ready else 0,
+            "failed": failed if ready else 0,
+            "cancelled": 0,
+            "total": len(files),
+        }
+
+    # Batches
+
+    def create_batch(self, body: dict) -> dict:
+        with self._lock:
+            input_file = self.get_file(body.get("input_file_id"))
+            if input_file["purpose"] != "batch":
+                raise FakeApiError(400, "The input file must be uploaded with purpose 'batch'.")
+            if body.get("endpoint") not in BATCH_ENDPOINTS:
+                raise FakeApiError(400, f"Unsupported batch endpoint '{body.get('endpoint')}'.")
+
+            batch = self._new_object(
+                "batch",
+                "batch",
+                endpoint=body["endpoint"],
+                input_file_id=input_file["id"],
+                completion_window=body.get("completion_window", "24h"),
+                status="validating",
+                output_file_id=None,
+                error_file_id=None,
+                errors=None,
+                in_progress_at=None,
+                completed_at=None,
+                cancelled_at=None,
+                request_counts={"total": 0, "completed": 0, "failed": 0},
+                metadata=body.get("metadata") or {},
+                _started=time.monotonic(),
+                _duration=self.sample(self.config.batch_duration),
+            )
+            self.batches[batch["id"]] = batch
+            return batch
+
+    def get_batch(self, batch_id: str) -> dict:
+        with self._lock:
+            batch = self._get(self.batches, batch_id, "batch")
+            self._advance_batch(batch)
+            return batch
+
+    def cancel_batch(self, batch_id: str) -> dict:
+        with self._lock:
+            batch = self.get_batch(batch_id)
+            if batch["status"] in TERMINAL_BATCH_STATUSES:
+                raise FakeApiError(400, f"Cannot cancel batch with status '{batch['status']}'.")
+
+            batch["status"] = "cancelled"
+            batch["cancelled_at"] = int(time.time())
+            return batch
+
+    def _advance_batch(self, batch: dict):
+        if batch["status"] in TERMINAL_BATCH_STATUSES:
+            return
+
+        if time.monotonic() - batch["_started"] < batch["_duration"]:
+            batch["status"] = "in_progress"
+            batch["in_progress_at"] = batch["in_progress_at"] or int(time.time())
+            return
+
+        lines = self.file_contents[batch["input_file_id"]].decode().splitlines()
+        outputs, errors = [], []
+        for line in filter(str.strip, lines):
+            request = json.loads(line)
+            result = self._run_batch_request(request)
+            (errors if result["error"] or result["response"]["status_code"] != 200 else outputs).append(result)
+
+        if outputs:
+            batch["output_file_id"] = self._batch_file(batch, "output", outputs)
+        if errors:
+            batch["error_file_id"] = self._batch_file(batch, "error", errors)
+
+        batch["status"] = "completed"
+        batch["in_progress_at"] = batch["in_progress_at"] or int(time.time())
+        batch["completed_at"] = int(time.time())
+        batch["request_counts"] = {
+            "total": len(outputs) + len(errors),
+            "completed": len(outputs),
+            "failed": len(errors),
+        }
+
+    def _run_batch_request(self, request: dict) -> dict:
+        result = {"id": new_id("batch_req"), "custom_id": request.get("custom_id"), "response": None, "error": None}
+        body = request.get("body") or {}
+        messages = body.get("messages") or []
+
+        if request.get("url") not in BATCH_ENDPOINTS or not messages:
+            result["error"] = {"code": "invalid_request", "message": "Request needs a supported url and messages."}
+            return result
+        if self.chance(self.config.run_failure_probability):
+            result["response"] = {
+                "status_code": 500,
+                "request_id": new_id("req"),
+                "body": {"error": {"message": "Injected request failure.", "type": "server_error"}},
+            }
+            return result
+
+        question = next((message["content"] for message in reversed(messages) if message["role"] == "user"), "")
+        text = self.config.response(question)
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        completion_tokens = estimate_tokens(text)
+        if body.get("max_completion_tokens"):
+            completion_tokens = min(completion_tokens, body["max_completion_tokens"])
+
+        result["response"] = {
+            "status_code": 200,
+            "request_id": new_id("req"),
+            "body": {
+                "id": new_id("chatcmpl"),
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        }
+        return result
+
+    def _batch_file(self, batch: dict, kind: str, results: list[dict]) -> str:
+        content = "".join(json.dumps(result) + "\n" for result in results).encode()
+        return self.create_file(f"{batch['id']}_{kind}.jsonl", "batch_output", content)["id"]
+
+    def _get(self, objects: dict, object_id: str, name: str) -> dict:
+        with self._lock:
+            if object_id not in objects:
+                raise FakeApiError(404, f"No {name} found with id '{object_id}'.")
+            return objects[object_id]
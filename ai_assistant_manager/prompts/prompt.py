@@ -1,14 +1,23 @@
+from collections.abc import Iterable, Mapping
 from datetime import datetime
 
-from ai_assistant_manager.encoding import UTF_8
+from .prompt_template import load_template
 
 SAMPLE_PROMPT_PATH = "ai_assistant_manager/prompts/sample_prompt.md"
 SAMPLE_PROMPT_PATH_WITH_TOOLS = "ai_assistant_manager/prompts/sample_prompt_with_tool_call.md"
 
-CURRENT_DATE_VARIABLE = "{{CURRENT_DATE}}"
 
+def get_prompt(*, prompt_path: str = SAMPLE_PROMPT_PATH, variables: Mapping[str, object] | None = None) -> str:
+    return load_template(prompt_path).render(_with_defaults(variables))
 
-def get_prompt(*, prompt_path: str = SAMPLE_PROMPT_PATH):
-    with open(prompt_path, "r", encoding=UTF_8) as prompt:
-        current_date = datetime.today().date().isoformat()
-        return prompt.read().replace(CURRENT_DATE_VARIABLE, current_date)
+
+def get_prompts(variables_list: Iterable[Mapping[str, object]], *, prompt_path: str = SAMPLE_PROMPT_PATH) -> list[str]:
+    """
+    Renders one prompt per variables mapping (e.g. per tenant) from a single
+    parsed template.
+    """
+    return load_template(prompt_path).render_many(_with_defaults(variables) for variables in variables_list)
+
+
+def _with_defaults(variables: Mapping[str, object] | None) -> dict[str, object]:
+    return {"CURRENT_DATE": datetime.today().date().isoformat(), **(variables or {})}
@@ -0,0 +1,87 @@
+import os
+import re
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+from ai_assistant_manager.encoding import UTF_8
+
+VARIABLE_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A prompt parsed once into literal text and variable slots. Rendering joins
+    the parts in a single pass; variables without a value are left untouched.
+    """
+
+    literals: tuple[str, ...]
+    variables: tuple[str, ...]
+    placeholders: tuple[str, ...]
+
+    @classmethod
+    def parse(cls, text: str) -> "PromptTemplate":
+        literals = []
+        variables = []
+        placeholders = []
+        position = 0
+
+        for match in VARIABLE_PATTERN.finditer(text):
+            literals.append(text[position : match.start()])
+            variables.append(match.group(1))
+            placeholders.append(match.group(0))
+            position = match.end()
+
+        literals.append(text[position:])
+        return cls(tuple(literals), tuple(variables), tuple(placeholders))
+
+    @property
+    def variable_names(self) -> frozenset[str]:
+        return frozenset(self.variables)
+
+    def render(self, variables: Mapping[str, object] | None = None, *, strict: bool = False) -> str:
+        variables = variables or {}
+        if strict and (missing := self.variable_names - variables.keys()):
+            raise KeyError(f"Missing prompt variables: {', '.join(sorted(missing))}")
+
+        parts = [self.literals[0]]
+        for index, name in enumerate(self.variables):
+            parts.append(str(variables[name]) if name in variables else self.placeholders[index])
+            parts.append(self.literals[index + 1])
+
+        return "".join(parts)
+
+    def render_many(self, variables_list: Iterable[Mapping[str, object]], *, strict: bool = False) -> list[str]:
+        return [self.render(variables, strict=strict) for variables in variables_list]
+
+
+_cache: dict[str, tuple[int, int, PromptTemplate]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_template(template_path: str) -> PromptTemplate:
+    """
+    Returns the parsed template for `template_path`, rereading the file only
+    when its modification time or size has changed.
+    """
+    path = os.path.abspath(template_path)
+    stat = os.stat(path)
+
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+    with open(path, "r", encoding=UTF_8) as file:
+        template = PromptTemplate.parse(file.read())
+
+    with _cache_lock:
+        _cache[path] = (stat.st_mtime_ns, stat.st_size, template)
+
+    return template
+
+
+def clear_template_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from .prompt_template import PromptTemplate, clear_template_cache, load_template
+
+
+def test_parse_and_render():
+    template = PromptTemplate.parse("Hello {{NAME}}, today is {{ CURRENT_DATE }}. Bye {{NAME}}!")
+
+    assert template.variable_names == {"NAME", "CURRENT_DATE"}
+    assert template.render({"NAME": "Ada", "CURRENT_DATE": "2024-01-01"}) == "Hello Ada, today is 2024-01-01. Bye Ada!"
+
+
+def test_render_does_not_rescan_values():
+    template = PromptTemplate.parse("{{A}} {{B}}")
+
+    assert template.render({"A": "{{B}}", "B": "b"}) == "{{B}} b"
+
+
+def test_missing_variables_are_left_or_raise():
+    template = PromptTemplate.parse("Hi {{ NAME }} from {{COMPANY}}")
+
+    assert template.render({"NAME": "Ada"}) == "Hi Ada from {{COMPANY}}"
+    with pytest.raises(KeyError, match="COMPANY"):
+        template.render({"NAME": "Ada"}, strict=True)
+
+
+def test_render_many():
+    template = PromptTemplate.parse("Tenant {{TENANT}}")
+
+    assert template.render_many([{"TENANT": "a"}, {"TENANT": "b"}]) == ["Tenant a", "Tenant b"]
+
+
+def test_load_template_caches_by_mtime(tmp_path):
+    clear_template_cache()
+    template_path = tmp_path / "prompt.md"
+    template_path.write_text("Version {{VERSION}}")
+
+    first = load_template(str(template_path))
+
+    assert load_template(str(template_path)) is first
+
+    template_path.write_text("Changed {{VERSION}}")
+    os.utime(template_path, ns=(0, 1))
+
+    assert load_template(str(template_path)).render({"VERSION": 2}) == "Changed 2"
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from .prompt import SAMPLE_PROMPT_PATH, get_prompt
+from .prompt import SAMPLE_PROMPT_PATH, get_prompt, get_prompts
 
 
 def test_get_prompt():
@@ -9,3 +9,16 @@ def test_get_prompt():
     prompt = get_prompt(prompt_path=SAMPLE_PROMPT_PATH)
     assert isinstance(prompt, str)
     assert current_date in prompt
+
+
+def test_get_prompt_with_variables():
+    prompt = get_prompt(prompt_path=SAMPLE_PROMPT_PATH, variables={"CURRENT_DATE": "2000-01-01"})
+
+    assert "The current date is 2000-01-01." in prompt
+
+
+def test_get_prompts():
+    prompts = get_prompts([{"CURRENT_DATE": "2000-01-01"}, {}], prompt_path=SAMPLE_PROMPT_PATH)
+
+    assert "2000-01-01" in prompts[0]
+    assert prompts[1] == get_prompt(prompt_path=SAMPLE_PROMPT_PATH)
@@ -0,0 +1,260 @@
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Self
+
+from ai_assistant_manager.encoding import UTF_8
+
+from ..exporters.content_data import ContentData
+from .context_passage import ContextPassage
+
+MAGIC = b"BM25IDX1"
+HEADER = struct.Struct("<8sIIIfff6I")
+TERM_COLUMNS = 4
+PASSAGE_COLUMNS = 4
+RECORD_COLUMNS = 6
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def load_content_data(file_path: str) -> list[ContentData]:
+    """
+    Reads the JSON written by DirectoryExporter back into ContentData records.
+    """
+    with open(file_path, encoding=UTF_8) as file:
+        return [ContentData(**record) for record in json.load(file).values()]
+
+
+def split_passages(body: str, *, passage_words: int) -> list[str]:
+    """
+    Groups a body's lines into passages of roughly `passage_words` words, so a
+    hit points at the part of a document that matched rather than all of it.
+    """
+    passages, lines, words = [], [], 0
+    for line in filter(str.strip, body.splitlines()):
+        lines.append(line)
+        words += len(line.split())
+        if words >= passage_words:
+            passages.append("\n".join(lines))
+            lines, words = [], 0
+    if lines:
+        passages.append("\n".join(lines))
+    return passages
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    content_id: str
+    title: str
+    date: str
+    text: str
+    score: float
+
+
+def write_index(
+    records: Iterable[ContentData],
+    file_path: str,
+    *,
+    passage_words: int = 120,
+    k1: float = 1.2,
+    b: float = 0.75,
+):
+    """
+    Writes a BM25 index over the records' passages (title included) as one
+    little-endian file: a fixed header, a sorted term table with document
+    frequencies, postings as parallel passage-id and term-frequency arrays,
+    passage and record tables, and a UTF-8 string blob. Every section is a
+    flat uint32 array, so BM25Index can read it straight out of a memory map.
+    """
+    strings = bytearray()
+
+    def add_string(text: str) -> tuple[int, int]:
+        encoded = text.encode(UTF_8)
+        strings.extend(encoded)
+        return len(strings) - len(encoded), len(encoded)
+
+    record_table, passage_table = array("I"), array("I")
+    postings: dict[str, list[tuple[int, int]]] = {}
+    total_length = 0
+
+    for record_index, record in enumerate(records):
+        for value in (record.id, record.title, record.date):
+            record_table.extend(add_string(value))
+
+        for text in split_passages(record.body, passage_words=passage_words):
+            passage_id = len(passage_table) // PASSAGE_COLUMNS
+            counts = Counter(tokenize(f"{record.title}\n{text}"))
+            length = sum(counts.values())
+            total_length += length
+            passage_table.extend((record_index, *add_string(text), length))
+            for term, count in counts.items():
+                postings.setdefault(term, []).append((passage_id, count))
+
+    term_table, passage_ids, frequencies = array("I"), array("I"), array("I")
+    for term in sorted(postings, key=lambda term: term.encode(UTF_8)):
+        term_postings = postings[term]
+        term_table.extend((*add_string(term), len(passage_ids), len(term_postings)))
+        for passage_id, count in term_postings:
+            passage_ids.append(passage_id)
+            frequencies.append(count)
+
+    sections = [term_table, passage_ids, frequencies, passage_table, record_table]
+    if sys.byteorder == "big":
+        for section in sections:
+            section.byteswap()
+
+    passage_count = len(passage_table) // PASSAGE_COLUMNS
+    offsets, offset = [], HEADER.size
+    for section in [*sections, strings]:
+        offsets.append(offset)
+        offset += len(section) * getattr(section, "itemsize", 1)
+
+    header = HEADER.pack(
+        MAGIC,
+        len(term_table) // TERM_COLUMNS,
+        passage_count,
+        len(record_table) // RECORD_COLUMNS,
+        k1,
+        b,
+        total_length / passage_count if passage_count else 0.0,
+        *offsets,
+    )
+    with open(file_path, "wb") as file:
+        file.write(header)
+        for section in sections:
+            section.tofile(file)
+        file.write(strings)
+
+
+class BM25Index:
+    """
+    Read-only BM25 index written by `write_index`. The file is memory-mapped and
+    its tables are read in place, so opening is cheap and large corpora are
+    paged in on demand; terms are found by binary search over the sorted term
+    table. Answers lookup-style queries locally, or supplies the passages for a
+    small context attached to a message instead of a file_search round trip.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise ValueError(f"Not a BM25 index: {file_path}")
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            self.term_count,
+            self.passage_count,
+            self.record_count,
+            self.k1,
+            self.b,
+            self.average_length,
+            *offsets,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a BM25 index: {file_path}")
+
+        view = memoryview(self._mmap)
+        self._terms = self._section(view, offsets[0], offsets[1])
+        self._passage_ids = self._section(view, offsets[1], offsets[2])
+        self._frequencies = self._section(view, offsets[2], offsets[3])
+        self._passages = self._section(view, offsets[3], offsets[4])
+        self._records = self._section(view, offsets[4], offsets[5])
+        self._strings = view[offsets[5] :]
+
+    def search(self, query: str, *, limit: int = 5) -> list[SearchHit]:
+        scores = Counter()
+        for term in set(tokenize(query)):
+            index = self._find_term(term.encode(UTF_8))
+            if index is None:
+                continue
+
+            start, document_frequency = self._terms[index * TERM_COLUMNS + 2 : index * TERM_COLUMNS + 4]
+            idf = math.log(1 + (self.passage_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            for position in range(start, start + document_frequency):
+                passage_id = self._passage_ids[position]
+                frequency = self._frequencies[position]
+                length = self._passages[passage_id * PASSAGE_COLUMNS + 3]
+                norm = self.k1 * (1 - self.b + self.b * length / self.average_length)
+                scores[passage_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [self._hit(passage_id, score) for passage_id, score in best]
+
+    def passages(self, query: str, *, limit: int = 3, max_characters: int = 2000) -> list[ContextPassage]:
+        """
+        Top passages for `query` within a character budget; usable directly as a
+        BatchEvaluator context provider.
+        """
+        passages, remaining = [], max_characters
+        for hit in self.search(query, limit=limit):
+            if len(hit.text) > remaining:
+                break
+            passages.append(ContextPassage(hit.title, hit.text))
+            remaining -= len(hit.text)
+        return passages
+
+    def close(self):
+        for section in (self._terms, self._passage_ids, self._frequencies, self._passages, self._records):
+            if isinstance(section, memoryview):
+                section.release()
+        self._strings.release()
+        self._mmap.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _find_term(self, term: bytes) -> int | None:
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self._string(*self._terms[middle * TERM_COLUMNS : middle * TERM_COLUMNS + 2])
+            if candidate == term:
+                return middle
+            if candidate < term:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _hit(self, passage_id: int, score: float) -> SearchHit:
+        record_index, text_offset, text_length, _ = self._passages[
+            passage_id * PASSAGE_COLUMNS : (passage_id + 1) * PASSAGE_COLUMNS
+        ]
+        record = self._records[record_index * RECORD_COLUMNS : (record_index + 1) * RECORD_COLUMNS]
+        content_id, title, date = (self._string(record[i], record[i + 1]).decode(UTF_8) for i in range(0, 6, 2))
+        return SearchHit(
+            content_id=content_id,
+            title=title,
+            date=date,
+            text=self._string(text_offset, text_length).decode(UTF_8),
+            score=round(score, 6),
+        )
+
+    def _string(self, offset: int, length: int) -> bytes:
+        return bytes(self._strings[offset : offset + length])
+
+    @staticmethod
+    def _section(view: memoryview, start: int, end: int):
+        section = view[start:end].cast("I")
+        if sys.byteorder == "big":
+            section = array("I", section)
+            section.byteswap()
+        return section
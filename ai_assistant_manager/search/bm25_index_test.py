@@ -0,0 +1,119 @@
+import json
+import math
+from collections import Counter
+from dataclasses import asdict
+
+import pytest
+
+from ..exporters.content_data import ContentData
+from .bm25_index import HEADER, BM25Index, load_content_data, split_passages, tokenize, write_index
+from .context_passage import ContextPassage
+
+RECORDS = [
+    ContentData(id="001", title="Saw Time", body="Sharpen the saw.\nRest and renewal matter.", date="2022-01-01"),
+    ContentData(
+        id="002", title="Deep Work", body="Focus without distraction.\nDeep focus compounds.", date="2022-02-01"
+    ),
+    ContentData(id="003", title="Café Notes", body="Espresso and renewal.", date="2022-03-01"),
+]
+
+
+@pytest.fixture(name="index")
+def build_index(tmp_path):
+    file_path = str(tmp_path / "content.bm25")
+    write_index(RECORDS, file_path)
+
+    with BM25Index(file_path) as index:
+        yield index
+
+
+def brute_force_score(query: str, document: str, documents: list[str], k1: float = 1.2, b: float = 0.75) -> float:
+    counts = Counter(tokenize(document))
+    average_length = sum(len(tokenize(text)) for text in documents) / len(documents)
+    score = 0.0
+    for term in set(tokenize(query)):
+        document_frequency = sum(term in tokenize(text) for text in documents)
+        if not document_frequency:
+            continue
+        idf = math.log(1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = k1 * (1 - b + b * sum(counts.values()) / average_length)
+        score += idf * counts[term] * (k1 + 1) / (counts[term] + norm)
+    return score
+
+
+def test_tokenize():
+    assert tokenize("Café, DEEP-work 42!") == ["café", "deep", "work", "42"]
+
+
+def test_split_passages():
+    body = "one two three\n\nfour five\nsix seven eight\nnine"
+
+    assert split_passages(body, passage_words=4) == ["one two three\nfour five", "six seven eight\nnine"]
+
+
+def test_search_ranks_matching_passage_first(index):
+    [best, *_] = index.search("deep focus")
+
+    assert best.content_id == "002"
+    assert best.title == "Deep Work"
+    assert best.date == "2022-02-01"
+    assert best.text == "Focus without distraction.\nDeep focus compounds."
+
+
+def test_search_scores_match_bm25(index):
+    documents = [f"{record.title}\n{record.body}" for record in RECORDS]
+
+    hits = index.search("renewal saw", limit=10)
+
+    expected = {
+        record.id: brute_force_score("renewal saw", document, documents) for record, document in zip(RECORDS, documents)
+    }
+    assert {hit.content_id: hit.score for hit in hits} == {
+        content_id: pytest.approx(score, rel=1e-5) for content_id, score in expected.items() if score
+    }
+    assert [hit.content_id for hit in hits] == ["001", "003"]
+
+
+def test_search_handles_unknown_terms_and_unicode(index):
+    assert index.search("unknown words") == []
+    assert [hit.content_id for hit in index.search("café")] == ["003"]
+
+
+def test_passages_respect_budget(index):
+    assert index.passages("renewal", max_characters=1000) == [
+        ContextPassage("Café Notes", "Espresso and renewal."),
+        ContextPassage("Saw Time", "Sharpen the saw.\nRest and renewal matter."),
+    ]
+    assert index.passages("renewal", max_characters=30) == [ContextPassage("Café Notes", "Espresso and renewal.")]
+
+
+def test_empty_index(tmp_path):
+    file_path = str(tmp_path / "empty.bm25")
+    write_index([], file_path)
+
+    with BM25Index(file_path) as index:
+        assert index.search("anything") == []
+
+
+def test_rejects_other_files(tmp_path):
+    file_path = tmp_path / "other.bm25"
+    file_path.write_bytes(b"x" * 128)
+
+    with pytest.raises(ValueError, match="Not a BM25 index"):
+        BM25Index(str(file_path))
+
+
+@pytest.mark.parametrize("size", [0, HEADER.size - 1])
+def test_rejects_files_shorter_than_header(tmp_path, size):
+    file_path = tmp_path / "short.bm25"
+    file_path.write_bytes(b"BM25IDX1\0\0\0\0"[:size])
+
+    with pytest.raises(ValueError, match="Not a BM25 index"):
+        BM25Index(str(file_path))
+
+
+def test_load_content_data(tmp_path):
+    file_path = tmp_path / "data.json"
+    file_path.write_text(json.dumps({record.title: asdict(record) for record in RECORDS}), encoding="utf-8")
+
+    assert load_content_data(str(file_path)) == RECORDS
@@ -0,0 +1,11 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ContextPassage:
+    source: str
+    text: str
+
+
+ContextProvider = Callable[[str], list[ContextPassage]]
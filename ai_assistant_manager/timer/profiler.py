@@ -0,0 +1,134 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import wraps
+
+from loguru import logger
+
+from ai_assistant_manager.encoding import UTF_8
+
+PROFILE_MODE_VARIABLE = "PROFILE_MODE"
+PROFILE_DIR_VARIABLE = "PROFILE_DIR"
+PSTATS = "pstats"
+COLLAPSED = "collapsed"
+PROFILE_MODES = [PSTATS, COLLAPSED]
+
+
+class StackSampler:
+    """
+    Samples the stack of every other thread each `interval_in_seconds` and
+    counts identical stacks, for flame graphs in the collapsed-stack format
+    (`frame;frame;frame count`). Unlike cProfile it covers worker threads and
+    adds no per-call overhead.
+    """
+
+    def __init__(self, *, interval_in_seconds: float = 0.005):
+        self.interval_in_seconds = interval_in_seconds
+        self.counts = Counter()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+    def write_collapsed(self, file_path: str):
+        with open(file_path, "w", encoding=UTF_8) as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def _run(self):
+        own_thread_id = threading.get_ident()
+        while not self._stopped.wait(self.interval_in_seconds):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread_id:
+                    self.counts[_collapse(frame)] += 1
+
+
+def _collapse(frame) -> str:
+    frames = []
+    while frame:
+        module = frame.f_globals.get("__name__", "?")
+        frames.append(f"{module}.{frame.f_code.co_qualname}".replace(" ", "_").replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+def profile_mode() -> str | None:
+    mode = os.getenv(PROFILE_MODE_VARIABLE, "").strip().lower()
+    if not mode:
+        return None
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"{PROFILE_MODE_VARIABLE} must be one of {PROFILE_MODES}, got {mode!r}")
+    return mode
+
+
+@contextmanager
+def profiled(name: str, *, mode: str | None = None, output_dir: str | None = None) -> Iterator[str | None]:
+    """
+    Profiles the block when `mode` (or the PROFILE_MODE environment variable) is
+    "pstats" (cProfile) or "collapsed" (stack sampling), writing
+    `<PROFILE_DIR>/<name>-<timestamp>.<mode>`; yields that path, or None when
+    profiling is off, in which case nothing else happens.
+    """
+    mode = mode or profile_mode()
+    if not mode:
+        yield None
+        return
+
+    output_dir = output_dir or os.getenv(PROFILE_DIR_VARIABLE, "profiles")
+    os.makedirs(output_dir, exist_ok=True)
+    file_path = os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.{mode}")
+    started_at = time.time()
+
+    if mode == PSTATS:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield file_path
+        finally:
+            profiler.disable()
+            profiler.dump_stats(file_path)
+            _log_written(name, mode, file_path, started_at)
+    else:
+        sampler = StackSampler().start()
+        try:
+            yield file_path
+        finally:
+            sampler.stop()
+            sampler.write_collapsed(file_path)
+            _log_written(name, mode, file_path, started_at)
+
+
+def _log_written(name: str, mode: str, file_path: str, started_at: float):
+    elapsed_time = round(time.time() - started_at, 4)
+    logger.debug(f"{name}: profiled in {elapsed_time} seconds, {mode} written to {file_path}")
+
+
+def profile(name: str):
+    """
+    Decorator form of `profiled`, checking PROFILE_MODE on each call.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not os.getenv(PROFILE_MODE_VARIABLE):
+                return func(*args, **kwargs)
+            with profiled(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
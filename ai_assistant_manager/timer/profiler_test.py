@@ -0,0 +1,79 @@
+import os
+import pstats
+import threading
+import time
+
+import pytest
+
+from .profiler import PROFILE_DIR_VARIABLE, PROFILE_MODE_VARIABLE, StackSampler, profile, profile_mode, profiled
+
+
+def busy_work(seconds: float = 0.1):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        sum(range(1000))
+
+
+def test_disabled_profiling_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_MODE_VARIABLE, raising=False)
+
+    with profiled("disabled", output_dir=str(tmp_path)) as file_path:
+        busy_work(0.01)
+
+    assert file_path is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_pstats_profile(tmp_path):
+    with profiled("flow", mode="pstats", output_dir=str(tmp_path)) as file_path:
+        busy_work()
+
+    assert file_path.endswith(".pstats")
+    functions = {function for _, _, function in pstats.Stats(file_path).stats}
+    assert "busy_work" in functions
+
+
+def test_collapsed_profile_includes_worker_threads(tmp_path):
+    with profiled("flow", mode="collapsed", output_dir=str(tmp_path)) as file_path:
+        worker = threading.Thread(target=busy_work, args=(0.2,))
+        worker.start()
+        worker.join()
+
+    with open(file_path, encoding="utf-8") as file:
+        lines = file.read().splitlines()
+
+    assert lines
+    assert any("profiler_test.busy_work" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_profile_decorator_reads_environment(tmp_path, monkeypatch):
+    @profile("decorated")
+    def flow():
+        busy_work(0.01)
+        return "done"
+
+    monkeypatch.setenv(PROFILE_DIR_VARIABLE, str(tmp_path))
+    monkeypatch.delenv(PROFILE_MODE_VARIABLE, raising=False)
+    assert flow() == "done"
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.setenv(PROFILE_MODE_VARIABLE, "pstats")
+    assert flow() == "done"
+    [file_name] = os.listdir(tmp_path)
+    assert file_name.startswith("decorated-")
+
+
+def test_invalid_profile_mode(monkeypatch):
+    monkeypatch.setenv(PROFILE_MODE_VARIABLE, "flamegraph")
+
+    with pytest.raises(ValueError, match="PROFILE_MODE must be one of"):
+        profile_mode()
+
+
+def test_stack_sampler_counts_stacks():
+    sampler = StackSampler(interval_in_seconds=0.001).start()
+    busy_work(0.05)
+    sampler.stop()
+
+    assert sum(sampler.counts.values()) > 0
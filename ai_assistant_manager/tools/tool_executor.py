@@ -0,0 +1,202 @@
+import json
+import multiprocessing
+import pickle
+import signal
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from typing import Self
+
+from loguru import logger
+
+from .tool_registry import ToolRegistry
+
+HARD_TIMEOUT_GRACE_IN_SECONDS = 2.0
+RESTART_CHECK_INTERVAL_IN_SECONDS = 0.05
+
+
+class ToolTimeoutError(Exception):
+    pass
+
+
+class ToolFailedError(Exception):
+    """
+    Raised in a worker in place of whatever the tool raised, so the parent only
+    handles exceptions it knows.
+    """
+
+
+def _limit_memory(memory_limit_in_bytes: int | None):
+    """
+    Runs once in each worker; caps its address space where the platform allows.
+    """
+    if not memory_limit_in_bytes:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit_in_bytes, memory_limit_in_bytes))
+
+
+def _raise_timeout(_signum, _frame):
+    raise ToolTimeoutError()
+
+
+def _call_tool(implementation, arguments: dict, timeout_in_seconds: float) -> str:
+    """
+    Runs in a worker. A SIGALRM timer interrupts tools that overrun, so the worker
+    survives and stays warm for the next call.
+    """
+    alarm = hasattr(signal, "setitimer")
+    if alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout_in_seconds)
+    try:
+        return implementation(**arguments)
+    except (ToolTimeoutError, MemoryError):
+        raise
+    except Exception as e:
+        raise ToolFailedError(str(e)) from e
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ToolExecutor:
+    """
+    Runs a registry's tools in a pool of warm worker processes, so a CPU-heavy
+    or hanging tool cannot stall the chat that called it. Each call gets a
+    wall-clock limit and each worker an address-space limit; timeouts, memory
+    errors and exceptions come back as a JSON error output that can be
+    submitted to the run like any other. At most `max_workers` calls are in
+    flight, so a call starts as soon as it is submitted and its hard deadline
+    does not include time spent queued. A tool that ignores its timeout gets
+    the pool restarted; other calls that were running on that pool are
+    resubmitted to the new one rather than reported as timeouts. Workers are spawned rather than forked, so they do not
+    inherit the caller's threads, locks or address space; implementations are
+    sent to them by pickling, so they must be module-level functions rather
+    than lambdas or closures.
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        *,
+        max_workers: int = 4,
+        timeout_in_seconds: float = 10.0,
+        memory_limit_in_bytes: int | None = 512 * 1024 * 1024,
+    ):
+        self.registry = registry
+        self.max_workers = max_workers
+        self.timeout_in_seconds = timeout_in_seconds
+        self.memory_limit_in_bytes = memory_limit_in_bytes
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._pool = None
+        self._picklable: set[str] = set()
+
+    def execute(self, name: str, arguments: Mapping[str, object] | None = None) -> str:
+        definition = self.registry.get(name)
+        if definition.implementation is None:
+            raise KeyError(f"No implementation bound for tool: {name}")
+        self._check_picklable(name, definition.implementation)
+
+        with self._slots:
+            while True:
+                pool = self._get_pool()
+                result = pool.apply_async(
+                    _call_tool, (definition.implementation, dict(arguments or {}), self.timeout_in_seconds)
+                )
+                deadline = time.monotonic() + self.timeout_in_seconds + HARD_TIMEOUT_GRACE_IN_SECONDS
+                while not result.ready() and self._current_pool() is pool and time.monotonic() < deadline:
+                    result.wait(RESTART_CHECK_INTERVAL_IN_SECONDS)
+
+                if result.ready():
+                    break
+                if (current_pool := self._current_pool()) is None:
+                    return self._error(name, "interrupted", f"Tool {name} was interrupted by the executor closing")
+                if current_pool is not pool:
+                    logger.info(f"Tool pool restarted while {name} was running, resubmitting it")
+                    self.stats["resubmitted"] += 1
+                    continue
+
+                logger.warning(f"Tool {name} ignored its timeout, restarting the tool pool")
+                self._restart(pool)
+                return self._error(name, "timeout", f"Tool {name} timed out after {self.timeout_in_seconds} seconds")
+
+        try:
+            output = result.get()
+        except ToolTimeoutError:
+            return self._error(name, "timeout", f"Tool {name} timed out after {self.timeout_in_seconds} seconds")
+        except MemoryError:
+            return self._error(name, "memory", f"Tool {name} exceeded its memory limit")
+        except ToolFailedError as e:
+            return self._error(name, "error", f"Tool {name} failed: {e}")
+
+        self.stats["completed"] += 1
+        return output
+
+    def warm(self) -> Self:
+        """
+        Starts the workers and waits until each has booted, rather than paying for
+        it on the first tool call.
+        """
+        pool = self._get_pool()
+        pool.map(abs, range(self.max_workers), chunksize=1)
+        return self
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.terminate()
+            pool.join()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._new_pool()
+            return self._pool
+
+    def _current_pool(self):
+        with self._lock:
+            return self._pool
+
+    def _new_pool(self):
+        return multiprocessing.get_context("spawn").Pool(
+            self.max_workers, initializer=_limit_memory, initargs=(self.memory_limit_in_bytes,)
+        )
+
+    def _restart(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = self._new_pool()
+        pool.terminate()
+        pool.join()
+        self.stats["restarts"] += 1
+
+    def _check_picklable(self, name: str, implementation):
+        if name in self._picklable:
+            return
+        try:
+            pickle.dumps(implementation)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError(
+                f"Tool {name} cannot run in a worker process: its implementation must be a picklable "
+                f"module-level function ({e})"
+            ) from e
+        self._picklable.add(name)
+
+    def _error(self, name: str, kind: str, message: str) -> str:
+        logger.warning(message)
+        self.stats[kind] += 1
+        return json.dumps({"error": message, "tool": name})
@@ -0,0 +1,141 @@
+import json
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .tool_executor import ToolExecutor
+from .tool_registry import ToolRegistry
+from .tools import SAMPLE_TOOLS_PATH
+from .weather import get_weather
+
+TOOL_NAMES = ["get_weather", "get_pid", "sleep_for", "ignore_timeout", "allocate", "fail"]
+
+
+def get_pid() -> str:
+    return str(os.getpid())
+
+
+def sleep_for(seconds: float) -> str:
+    time.sleep(seconds)
+    return "awake"
+
+
+def ignore_timeout(seconds: float) -> str:
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+    return "awake"
+
+
+def allocate(megabytes: int) -> str:
+    return str(len(bytearray(megabytes * 1024 * 1024)))
+
+
+def fail() -> str:
+    raise ValueError("broken tool")
+
+
+@pytest.fixture(name="executor")
+def build_executor(tmp_path):
+    tools = [
+        {"type": "function", "function": {"name": name, "parameters": {"type": "object", "properties": {}}}}
+        for name in TOOL_NAMES
+    ]
+    tools_path = tmp_path / "tools.json"
+    tools_path.write_text(json.dumps(tools))
+    implementations = {name: globals()[name] for name in TOOL_NAMES}
+    implementations["get_weather"] = get_weather
+    registry = ToolRegistry(str(tools_path), implementations=implementations)
+
+    with ToolExecutor(
+        registry, max_workers=1, timeout_in_seconds=0.5, memory_limit_in_bytes=256 * 1024 * 1024
+    ) as executor:
+        yield executor.warm()
+
+
+def test_execute_matches_in_process_dispatch():
+    registry = ToolRegistry(SAMPLE_TOOLS_PATH, implementations={"get_weather": get_weather})
+
+    with ToolExecutor(registry, max_workers=1) as executor:
+        assert executor.execute("get_weather", {"location": "London"}) == registry.dispatch(
+            "get_weather", {"location": "London"}
+        )
+
+
+def test_workers_are_reused(executor):
+    pid = executor.execute("get_pid")
+
+    assert pid != str(os.getpid())
+    assert executor.execute("get_pid") == pid
+
+
+def test_timeout_becomes_error_output_and_keeps_worker(executor):
+    pid = executor.execute("get_pid")
+
+    output = json.loads(executor.execute("sleep_for", {"seconds": 5}))
+
+    assert output == {"error": "Tool sleep_for timed out after 0.5 seconds", "tool": "sleep_for"}
+    assert executor.execute("get_pid") == pid
+    assert executor.stats["timeout"] == 1
+
+
+def test_tool_ignoring_timeout_restarts_pool(executor):
+    pid = executor.execute("get_pid")
+
+    output = json.loads(executor.execute("ignore_timeout", {"seconds": 30}))
+
+    assert "timed out" in output["error"]
+    assert executor.stats["restarts"] == 1
+    assert executor.execute("get_pid") != pid
+
+
+def test_queued_calls_do_not_count_towards_the_hard_timeout(executor):
+    with ThreadPoolExecutor(max_workers=8) as callers:
+        outputs = list(callers.map(lambda _: executor.execute("sleep_for", {"seconds": 0.3}), range(8)))
+
+    assert outputs == ["awake"] * 8
+    assert executor.stats["restarts"] == 0
+
+
+def test_restart_resubmits_other_calls(tmp_path):
+    tools = [{"type": "function", "function": {"name": name}} for name in ["sleep_for", "ignore_timeout"]]
+    tools_path = tmp_path / "tools.json"
+    tools_path.write_text(json.dumps(tools))
+    registry = ToolRegistry(str(tools_path), implementations={"sleep_for": sleep_for, "ignore_timeout": ignore_timeout})
+
+    with ToolExecutor(registry, max_workers=2, timeout_in_seconds=0.5) as executor, ThreadPoolExecutor(2) as callers:
+        executor.warm()
+        hung = callers.submit(executor.execute, "ignore_timeout", {"seconds": 30})
+        time.sleep(2.2)
+        sleeping = callers.submit(executor.execute, "sleep_for", {"seconds": 0.45})
+
+        assert "timed out" in json.loads(hung.result())["error"]
+        assert sleeping.result() == "awake"
+        assert executor.stats["resubmitted"] == 1
+
+
+def test_memory_limit_becomes_error_output(executor):
+    output = json.loads(executor.execute("allocate", {"megabytes": 1024}))
+
+    assert output["error"] == "Tool allocate exceeded its memory limit"
+    assert executor.execute("allocate", {"megabytes": 1}) == str(1024 * 1024)
+
+
+def test_exception_becomes_error_output(executor):
+    assert json.loads(executor.execute("fail")) == {"error": "Tool fail failed: broken tool", "tool": "fail"}
+
+
+def test_unbound_tool_raises(executor):
+    with pytest.raises(KeyError):
+        executor.execute("unknown")
+
+
+def test_unpicklable_implementation_raises(tmp_path):
+    tools_path = tmp_path / "tools.json"
+    tools_path.write_text(json.dumps([{"type": "function", "function": {"name": "closure"}}]))
+    registry = ToolRegistry(str(tools_path), implementations={"closure": lambda: "result"})
+
+    with ToolExecutor(registry, max_workers=1) as executor, pytest.raises(TypeError, match="picklable module-level"):
+        executor.execute("closure")
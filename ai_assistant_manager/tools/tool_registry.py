@@ -0,0 +1,167 @@
+import json
+import os
+import re
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from loguru import logger
+
+from ai_assistant_manager.encoding import UTF_8
+
+FUNCTION_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+
+
+class ToolSchemaError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ToolDefinition:
+    """
+    A validated, read-only tool schema. `name` is None for built-in tools such
+    as file_search.
+    """
+
+    type: str
+    name: str | None
+    schema: Mapping
+    implementation: Callable[..., str] | None = None
+
+    def to_dict(self) -> dict:
+        return _thaw(self.schema)
+
+
+class ToolRegistry:
+    """
+    Loads and validates tool schemas from a JSON file once, reloading only when
+    the file changes, and binds function tools to their Python implementations.
+    """
+
+    def __init__(
+        self,
+        tools_path: str,
+        *,
+        implementations: Mapping[str, Callable[..., str]] | None = None,
+        extra_tools: Iterable[dict] = (),
+    ):
+        self.tools_path = tools_path
+        self._implementations = dict(implementations or {})
+        self._extra_tools = [_validate_tool(tool) for tool in extra_tools]
+        self._lock = threading.Lock()
+        self._file_stamp: tuple[int, int] | None = None
+        self._definitions: tuple[ToolDefinition, ...] = ()
+        self._by_name: dict[str, ToolDefinition] = {}
+
+    @property
+    def definitions(self) -> tuple[ToolDefinition, ...]:
+        self._reload_if_changed()
+        return self._definitions
+
+    def tools(self) -> list[dict]:
+        """
+        Plain dict copies suitable for `assistants_create(tools=...)`.
+        """
+        return [definition.to_dict() for definition in self.definitions]
+
+    def get(self, name: str) -> ToolDefinition:
+        self._reload_if_changed()
+        if name not in self._by_name:
+            raise KeyError(f"Unknown tool: {name}")
+        return self._by_name[name]
+
+    def bind(self, name: str, implementation: Callable[..., str]):
+        with self._lock:
+            self._implementations[name] = implementation
+            self._file_stamp = None
+
+    def dispatch(self, name: str, arguments: Mapping[str, object] | None = None) -> str:
+        definition = self.get(name)
+        if definition.implementation is None:
+            raise KeyError(f"No implementation bound for tool: {name}")
+        return definition.implementation(**(arguments or {}))
+
+    def _reload_if_changed(self):
+        stat = os.stat(self.tools_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            if stamp == self._file_stamp:
+                return
+
+            with open(self.tools_path, "r", encoding=UTF_8) as file:
+                raw_tools = json.load(file)
+            if not isinstance(raw_tools, list):
+                raise ToolSchemaError(f"{self.tools_path} must contain a list of tools")
+
+            self._definitions = self._build_definitions([_validate_tool(tool) for tool in raw_tools])
+            self._by_name = {definition.name: definition for definition in self._definitions if definition.name}
+            self._file_stamp = stamp
+            logger.debug(f"Loaded {len(self._definitions)} tools from {self.tools_path}")
+
+    def _build_definitions(self, tools: list[dict]) -> tuple[ToolDefinition, ...]:
+        definitions = []
+        names = set()
+
+        for tool in tools + self._extra_tools:
+            name = tool["function"]["name"] if tool["type"] == "function" else None
+            if name in names:
+                raise ToolSchemaError(f"Duplicate tool name: {name}")
+            if name:
+                names.add(name)
+            definitions.append(
+                ToolDefinition(
+                    type=tool["type"], name=name, schema=_freeze(tool), implementation=self._implementations.get(name)
+                )
+            )
+
+        if unknown := self._implementations.keys() - names:
+            raise ToolSchemaError(f"Implementations bound to unknown tools: {', '.join(sorted(unknown))}")
+
+        return tuple(definitions)
+
+
+def _validate_tool(tool: dict) -> dict:
+    if not isinstance(tool, dict) or not isinstance(tool.get("type"), str):
+        raise ToolSchemaError(f"Tool must be an object with a 'type': {tool}")
+    if tool["type"] != "function":
+        return tool
+
+    function = tool.get("function")
+    if not isinstance(function, dict) or not FUNCTION_NAME_PATTERN.match(str(function.get("name", ""))):
+        raise ToolSchemaError(f"Function tool needs a valid 'function.name': {tool}")
+
+    parameters = function.get("parameters")
+    if parameters is not None and (not isinstance(parameters, dict) or parameters.get("type") != "object"):
+        raise ToolSchemaError(f"Parameters of '{function['name']}' must be a JSON schema object")
+
+    return tool
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+_registries: dict[str, ToolRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(tools_path: str) -> ToolRegistry:
+    path = os.path.abspath(tools_path)
+    with _registries_lock:
+        if path not in _registries:
+            _registries[path] = ToolRegistry(path)
+        return _registries[path]
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from ..assistants.assistant_service import RETRIEVAL_TOOLS
+from .tool_registry import ToolRegistry, ToolSchemaError, get_registry
+from .tools import SAMPLE_TOOLS_PATH
+from .weather import get_weather
+
+
+def write_tools(path, tools):
+    path.write_text(json.dumps(tools))
+    return str(path)
+
+
+def function_tool(name: str) -> dict:
+    return {"type": "function", "function": {"name": name, "parameters": {"type": "object", "properties": {}}}}
+
+
+def test_definitions_are_immutable_and_tools_are_copies():
+    registry = ToolRegistry(SAMPLE_TOOLS_PATH, extra_tools=RETRIEVAL_TOOLS)
+
+    [weather, file_search] = registry.definitions
+
+    assert weather.name == "get_weather"
+    assert file_search.name is None
+    with pytest.raises(TypeError):
+        weather.schema["type"] = "changed"
+
+    tools = registry.tools()
+    tools[0]["function"]["name"] = "changed"
+
+    assert registry.tools()[0]["function"]["name"] == "get_weather"
+    assert registry.tools()[1] == {"type": "file_search"}
+
+
+def test_dispatch_bound_implementation():
+    registry = ToolRegistry(SAMPLE_TOOLS_PATH, implementations={"get_weather": get_weather})
+
+    assert registry.dispatch("get_weather", {"location": "London"}) == get_weather("London")
+
+
+def test_dispatch_unknown_or_unbound():
+    registry = ToolRegistry(SAMPLE_TOOLS_PATH)
+
+    with pytest.raises(KeyError, match="No implementation"):
+        registry.dispatch("get_weather")
+    with pytest.raises(KeyError, match="Unknown tool"):
+        registry.dispatch("missing")
+
+
+def test_bind_unknown_tool_raises():
+    registry = ToolRegistry(SAMPLE_TOOLS_PATH)
+    registry.bind("missing", get_weather)
+
+    with pytest.raises(ToolSchemaError, match="missing"):
+        registry.tools()
+
+
+def test_reloads_on_file_change(tmp_path):
+    tools_path = write_tools(tmp_path / "tools.json", [function_tool("first")])
+    registry = ToolRegistry(tools_path)
+    definitions = registry.definitions
+
+    assert registry.definitions is definitions
+
+    write_tools(tmp_path / "tools.json", [function_tool("first"), function_tool("second")])
+    os.utime(tools_path, ns=(0, 1))
+
+    assert [definition.name for definition in registry.definitions] == ["first", "second"]
+
+
+@pytest.mark.parametrize(
+    "tools",
+    [
+        {"type": "function"},
+        [{"function": {}}],
+        [{"type": "function", "function": {"name": "bad name"}}],
+        [{"type": "function", "function": {"name": "tool", "parameters": {"type": "string"}}}],
+        [function_tool("duplicate"), function_tool("duplicate")],
+    ],
+)
+def test_invalid_schemas(tmp_path, tools):
+    registry = ToolRegistry(write_tools(tmp_path / "tools.json", tools))
+
+    with pytest.raises(ToolSchemaError):
+        registry.tools()
+
+
+def test_get_registry_is_shared():
+    assert get_registry(SAMPLE_TOOLS_PATH) is get_registry(os.path.abspath(SAMPLE_TOOLS_PATH))
@@ -1,8 +1,7 @@
-import json
+from .tool_registry import get_registry
 
 SAMPLE_TOOLS_PATH = "ai_assistant_manager/tools/tools.json"
 
 
-def get_tools(*, tools_path: str = SAMPLE_TOOLS_PATH):
-    with open(tools_path, "r") as file:
-        return json.load(file)
+def get_tools(*, tools_path: str = SAMPLE_TOOLS_PATH) -> list[dict]:
+    return get_registry(tools_path).tools()
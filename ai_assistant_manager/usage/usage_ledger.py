@@ -0,0 +1,108 @@
+import json
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+from ai_assistant_manager.encoding import UTF_8
+
+
+@dataclass(frozen=True)
+class RunUsage:
+    assistant_id: str
+    thread_id: str
+    run_id: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    duration_in_seconds: float
+    poll_count: int
+    last_messages: int | None = None
+    max_prompt_tokens: int | None = None
+    max_completion_tokens: int | None = None
+
+
+@dataclass
+class UsageTotals:
+    run_count: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    duration_in_seconds: float = 0.0
+    poll_count: int = 0
+
+    def add(self, usage: RunUsage):
+        self.run_count += 1
+        self.prompt_tokens += usage.prompt_tokens
+        self.completion_tokens += usage.completion_tokens
+        self.total_tokens += usage.total_tokens
+        self.duration_in_seconds += usage.duration_in_seconds
+        self.poll_count += usage.poll_count
+
+
+UsageSink = Callable[[RunUsage], None]
+
+
+class JsonlUsageSink:
+    """
+    Appends every recorded run to a JSON Lines file, one object per run.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def __call__(self, usage: RunUsage):
+        line = json.dumps(asdict(usage))
+        with self._lock, open(self.file_path, "a", encoding=UTF_8) as file:
+            file.write(f"{line}\n")
+
+
+class UsageLedger:
+    """
+    Records token usage, duration and poll count for every completed run.
+    Totals are aggregated in memory per assistant and per thread, and each run
+    is also forwarded to the optional sink (e.g. a JsonlUsageSink).
+    """
+
+    def __init__(self, *, sink: UsageSink | None = None, keep_runs: bool = True):
+        self.sink = sink
+        self.keep_runs = keep_runs
+        self.runs: list[RunUsage] = []
+        self.totals = UsageTotals()
+        self._assistant_totals: dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self._thread_totals: dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self._lock = threading.Lock()
+
+    def record(self, usage: RunUsage):
+        with self._lock:
+            if self.keep_runs:
+                self.runs.append(usage)
+            self.totals.add(usage)
+            self._assistant_totals[usage.assistant_id].add(usage)
+            self._thread_totals[usage.thread_id].add(usage)
+
+        if self.sink:
+            self.sink(usage)
+
+    def assistant_totals(self, assistant_id: str) -> UsageTotals:
+        with self._lock:
+            return UsageTotals(**asdict(self._assistant_totals.get(assistant_id, UsageTotals())))
+
+    def thread_totals(self, thread_id: str) -> UsageTotals:
+        with self._lock:
+            return UsageTotals(**asdict(self._thread_totals.get(thread_id, UsageTotals())))
+
+    def top_threads(self, n: int = 10, *, by: str = "total_tokens") -> list[tuple[str, UsageTotals]]:
+        return self._top(self._thread_totals, n, by)
+
+    def top_assistants(self, n: int = 10, *, by: str = "total_tokens") -> list[tuple[str, UsageTotals]]:
+        return self._top(self._assistant_totals, n, by)
+
+    def _top(self, totals: dict[str, UsageTotals], n: int, by: str) -> list[tuple[str, UsageTotals]]:
+        if by not in UsageTotals.__dataclass_fields__:
+            raise ValueError(f"Unknown usage field: {by}")
+
+        with self._lock:
+            ranked = sorted(totals.items(), key=lambda item: getattr(item[1], by), reverse=True)
+            return [(key, UsageTotals(**asdict(value))) for key, value in ranked[:n]]
@@ -0,0 +1,97 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from .usage_ledger import JsonlUsageSink, RunUsage, UsageLedger, UsageTotals
+
+
+def build_usage(*, assistant_id="assistant_id", thread_id="thread_id", run_id="run_id", prompt=10, completion=5):
+    return RunUsage(
+        assistant_id=assistant_id,
+        thread_id=thread_id,
+        run_id=run_id,
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        total_tokens=prompt + completion,
+        duration_in_seconds=1.5,
+        poll_count=3,
+    )
+
+
+def test_record_aggregates_totals():
+    ledger = UsageLedger()
+
+    ledger.record(build_usage(run_id="run_1"))
+    ledger.record(build_usage(run_id="run_2", prompt=20, completion=10))
+
+    assert ledger.totals == UsageTotals(
+        run_count=2, prompt_tokens=30, completion_tokens=15, total_tokens=45, duration_in_seconds=3.0, poll_count=6
+    )
+    assert ledger.assistant_totals("assistant_id").total_tokens == 45
+    assert ledger.thread_totals("thread_id").run_count == 2
+    assert len(ledger.runs) == 2
+
+
+def test_record_without_keeping_runs():
+    ledger = UsageLedger(keep_runs=False)
+
+    ledger.record(build_usage())
+
+    assert ledger.runs == []
+    assert ledger.totals.run_count == 1
+
+
+def test_record_forwards_to_sink():
+    sink = MagicMock()
+    ledger = UsageLedger(sink=sink)
+    usage = build_usage()
+
+    ledger.record(usage)
+
+    sink.assert_called_once_with(usage)
+
+
+def test_totals_for_unknown_keys_are_empty():
+    ledger = UsageLedger()
+
+    assert ledger.assistant_totals("missing") == UsageTotals()
+    assert ledger.thread_totals("missing") == UsageTotals()
+
+
+def test_top_threads():
+    ledger = UsageLedger()
+    ledger.record(build_usage(thread_id="small", prompt=1, completion=1))
+    ledger.record(build_usage(thread_id="large", prompt=100, completion=50))
+    ledger.record(build_usage(thread_id="medium", prompt=10, completion=5))
+
+    top_threads = ledger.top_threads(2)
+
+    assert [thread_id for thread_id, _ in top_threads] == ["large", "medium"]
+    assert top_threads[0][1].total_tokens == 150
+
+
+def test_top_assistants_by_prompt_tokens():
+    ledger = UsageLedger()
+    ledger.record(build_usage(assistant_id="a", prompt=5, completion=100))
+    ledger.record(build_usage(assistant_id="b", prompt=50, completion=1))
+
+    top_assistants = ledger.top_assistants(1, by="prompt_tokens")
+
+    assert [assistant_id for assistant_id, _ in top_assistants] == ["b"]
+
+
+def test_top_threads_unknown_field():
+    with pytest.raises(ValueError, match="Unknown usage field: tokens"):
+        UsageLedger().top_threads(by="tokens")
+
+
+def test_jsonl_usage_sink(tmp_path):
+    file_path = tmp_path / "usage.jsonl"
+    sink = JsonlUsageSink(str(file_path))
+
+    sink(build_usage(run_id="run_1"))
+    sink(build_usage(run_id="run_2"))
+
+    lines = file_path.read_text().splitlines()
+    assert [json.loads(line)["run_id"] for line in lines] == ["run_1", "run_2"]
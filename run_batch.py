@@ -0,0 +1,68 @@
+import argparse
+import json
+from dataclasses import asdict
+
+from loguru import logger
+
+from ai_assistant_manager.assistants.assistant_service import AssistantService
+from ai_assistant_manager.batch.batch_evaluation import BatchEvaluator
+from ai_assistant_manager.batch.batch_runner import BatchRunner, JsonlResultWriter, load_questions
+from ai_assistant_manager.clients.openai_api import OpenAIClient, build_openai_client
+from ai_assistant_manager.clients.rate_limiter import RateLimiter
+from ai_assistant_manager.env_variables import set_env_variables
+from ai_assistant_manager.prompts.prompt import get_prompt
+from ai_assistant_manager.search.bm25_index import BM25Index
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Send a JSONL file of questions to an assistant concurrently")
+    parser.add_argument("questions", help='JSONL file with one {"id": ..., "message": ...} per line')
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file the responses are streamed to")
+    parser.add_argument("--assistant-id", help="Existing assistant to question (default: provision from bin/)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Questions in flight at once")
+    parser.add_argument(
+        "--keep-threads", action="store_true", help="Keep each question's thread instead of deleting it"
+    )
+    parser.add_argument(
+        "--batch-api", action="store_true", help="Submit every question as one offline Batch API job instead"
+    )
+    parser.add_argument(
+        "--context-index", help="BM25 index (see write_index) whose passages ground each --batch-api question"
+    )
+    args = parser.parse_args()
+
+    if args.batch_api:
+        if not args.context_index:
+            parser.error("--batch-api needs --context-index, since batch requests cannot use file_search")
+        if args.assistant_id or args.keep_threads:
+            parser.error("--assistant-id and --keep-threads do not apply to --batch-api")
+    elif args.context_index:
+        parser.error("--context-index only applies to --batch-api")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    rate_limiter = RateLimiter()
+    client = OpenAIClient(build_openai_client(rate_limiter=rate_limiter), rate_limiter=rate_limiter)
+
+    if args.batch_api:
+        with BM25Index(args.context_index) as index, JsonlResultWriter(args.output) as writer:
+            runner = BatchEvaluator(client, prompt=get_prompt(), context_provider=index.passages)
+            summary = runner.run(load_questions(args.questions), on_result=writer)
+    else:
+        assistant_id = args.assistant_id or AssistantService(client, prompt=get_prompt()).get_assistant_id()
+        logger.info(f"Assistant ID: {assistant_id}")
+        runner = BatchRunner(client, assistant_id, concurrency=args.concurrency, keep_threads=args.keep_threads)
+
+        with JsonlResultWriter(args.output) as writer:
+            summary = runner.run(load_questions(args.questions), on_result=writer)
+
+    logger.info(f"Responses written to {args.output}")
+    print(json.dumps(asdict(summary), indent=2))
+
+
+if __name__ == "__main__":
+    set_env_variables()
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import sys
+import tempfile
+
+from loguru import logger
+
+from ai_assistant_manager.benchmarks.benchmark import compare_to_baseline, format_results, load_results, save_results
+from ai_assistant_manager.benchmarks.benchmark_suites import (
+    chat_benchmarks,
+    exporter_benchmarks,
+    provisioning_benchmarks,
+)
+from ai_assistant_manager.benchmarks.import_time import import_benchmarks
+
+SUITES = ["imports", "exporters", "provisioning", "chat"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the AI Assistant Manager benchmark suite")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="Suite to run (default: all)")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma separated exporter corpus sizes")
+    parser.add_argument("--file-counts", default="5,50", help="Comma separated retrieval file counts")
+    parser.add_argument("--turns", type=int, default=10, help="Chat turns to time")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a regression")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    suites = args.suite or SUITES
+    results = []
+
+    if "imports" in suites:
+        results += import_benchmarks()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if "exporters" in suites:
+            results += exporter_benchmarks(work_dir, [int(size) for size in args.sizes.split(",")])
+        if "provisioning" in suites:
+            results += provisioning_benchmarks(work_dir, [int(count) for count in args.file_counts.split(",")])
+        if "chat" in suites:
+            results += chat_benchmarks(work_dir, turns=args.turns)
+
+    save_results(results, args.output)
+    logger.info(f"Benchmark results written to {args.output}")
+
+    comparisons = (
+        compare_to_baseline(results, load_results(args.baseline), tolerance=args.tolerance) if args.baseline else []
+    )
+    print(format_results(results, comparisons))
+
+    return 1 if any(comparison.regressed for comparison in comparisons) else 0
+
+
+if __name__ == "__main__":
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    sys.exit(main())
@@ -9,8 +9,10 @@ from ai_assistant_manager.env_variables import set_env_variables
 from ai_assistant_manager.exporters.directory.directory_exporter import DirectoryExporter
 from ai_assistant_manager.exporters.files.files_exporter import FilesExporter
 from ai_assistant_manager.prompts.prompt import get_prompt
+from ai_assistant_manager.timer.profiler import profile
 
 
+@profile("run_end_to_end")
 def main():
     DirectoryExporter("directory").export()
     FilesExporter("about.txt").export()
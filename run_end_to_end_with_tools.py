@@ -6,28 +6,32 @@ from ai_assistant_manager.assistants.assistant_service import (
 )
 from ai_assistant_manager.chats.chat import Chat, RequiresActionException
 from ai_assistant_manager.clients.openai_api import OpenAIClient, build_openai_client
-from ai_assistant_manager.env_variables import ENV_VARIABLES, set_env_variables
+from ai_assistant_manager.env_variables import get_config, set_env_variables, use_config
 from ai_assistant_manager.exporters.directory.directory_exporter import DirectoryExporter
 from ai_assistant_manager.exporters.files.files_exporter import FilesExporter
 from ai_assistant_manager.prompts.prompt import SAMPLE_PROMPT_PATH_WITH_TOOLS, get_prompt
-from ai_assistant_manager.tools.tools import get_tools
+from ai_assistant_manager.timer.profiler import profile
+from ai_assistant_manager.tools.tool_registry import ToolRegistry
+from ai_assistant_manager.tools.tools import SAMPLE_TOOLS_PATH
 from ai_assistant_manager.tools.weather import get_weather
 
 assistant_name = "AI-Assistant-Manager-Tool-Test"
 
 
+@profile("run_end_to_end_with_tools")
 def main():
     DirectoryExporter("directory").export()
     FilesExporter("about.txt").export()
 
     logger.info(f"Building {assistant_name}")
 
-    tools_from_file = get_tools()
-    tools_from_file.extend(RETRIEVAL_TOOLS)
+    tool_registry = ToolRegistry(
+        SAMPLE_TOOLS_PATH, implementations={"get_weather": get_weather}, extra_tools=RETRIEVAL_TOOLS
+    )
 
     client = OpenAIClient(build_openai_client())
     service = AssistantService(
-        client, prompt=get_prompt(prompt_path=SAMPLE_PROMPT_PATH_WITH_TOOLS), tools=tools_from_file
+        client, prompt=get_prompt(prompt_path=SAMPLE_PROMPT_PATH_WITH_TOOLS), tools=tool_registry.tools()
     )
 
     logger.info("Removing existing assistant and category files")
@@ -47,7 +51,7 @@ def main():
         assert False
     except RequiresActionException as e:
         print(f"\n{service.assistant_name}:\nTOOL_CALL: {e.data}")
-        weather_result = get_weather(e.data.arguments["location"])
+        weather_result = tool_registry.dispatch(e.data.name, e.data.arguments)
         print(weather_result)
 
         chat_response = chat.submit_tool_outputs(e.data.run_id, e.data.tool_call_id, weather_result)
@@ -60,7 +64,7 @@ def main():
 if __name__ == "__main__":
     try:
         set_env_variables()
-        ENV_VARIABLES.assistant_name = assistant_name
-        main()
+        with use_config(get_config().replace(assistant_name=assistant_name)):
+            main()
     except Exception as e:
         logger.info(f"Error: {e}")